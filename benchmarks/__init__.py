@@ -0,0 +1,6 @@
+"""
+Benchmarks package for the Discord bot.
+Contains standalone performance scripts; run each module with ``python -m``.
+"""
+
+# This file makes the benchmarks directory a Python package
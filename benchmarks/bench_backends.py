@@ -0,0 +1,128 @@
+"""
+Storage Backend Benchmark
+Compares the legacy whole-file save, the JSON journal backend, the binary
+snapshot backend and the SQLite backend for per-bet persistence cost, cold open time and on-demand profile loads.
+
+Usage: python -m benchmarks.bench_backends [--users 1000000] [--batch 1000]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import format_table, make_profiles
+from storage.backends import BinaryBackend, JsonBackend
+from storage.snapshot import convert
+from storage.sqlite_backend import SQLiteBackend
+
+
+def make_records(user_ids, count: int, rng: random.Random, start_seq: int = 1):
+    """Build ``count`` bet records against random existing users."""
+    records = []
+    for n in range(start_seq, start_seq + count):
+        bet = rng.randint(10, 10_000)
+        payout = bet * 2 if rng.random() < 0.45 else 0
+        records.append({
+            'k': 'bet', 'u': rng.choice(user_ids), 'g': 'coinflip',
+            'b': bet, 'p': payout, 'x': 100 if payout else 0, 't': time.time(), 'n': n
+        })
+    return records
+
+
+async def time_writes(backend, user_ids, batch: int, rng: random.Random):
+    """Return (microseconds per record in one batch, ms for a single-record batch)."""
+    records = make_records(user_ids, batch, rng)
+    start = time.perf_counter()
+    await backend.write(records)
+    batched = (time.perf_counter() - start) / batch * 1e6
+
+    singles = 50
+    seq = batch + 1
+    start = time.perf_counter()
+    for _ in range(singles):
+        await backend.write(make_records(user_ids, 1, rng, seq))
+        seq += 1
+    single = (time.perf_counter() - start) / singles * 1000
+    return batched, single
+
+
+async def time_point_loads(backend, user_ids, rng: random.Random, count: int = 1000) -> float:
+    """Return microseconds per on-demand ``load_profile`` of a random user."""
+    sample = [rng.choice(user_ids) for _ in range(count)]
+    start = time.perf_counter()
+    for user_id in sample:
+        await backend.load_profile(user_id)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+async def run(users: int, batch: int):
+    rng = random.Random(42)
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = make_profiles(users)
+        user_ids = list(profiles)
+
+        legacy_path = os.path.join(tmp, 'legacy.json')
+        start = time.perf_counter()
+        with open(legacy_path, 'w') as f:
+            json.dump(profiles, f, indent=2)
+        legacy_save = time.perf_counter() - start
+
+        sqlite_path = os.path.join(tmp, 'bench.db')
+        sqlite = SQLiteBackend(sqlite_path)
+        sqlite.import_profiles(profiles.items())
+
+        del profiles
+        gc.collect()
+
+        # Legacy: every bet rewrote the whole file
+        rows.append(('legacy save_user_data', f"{legacy_save * 1e6:,.0f}", f"{legacy_save * 1000:,.0f}", '-', '-'))
+
+        json_backend = JsonBackend(legacy_path, journal_path=os.path.join(tmp, 'bench.journal'))
+        start = time.perf_counter()
+        json_backend.open()
+        json_open = time.perf_counter() - start
+        batched, single = await time_writes(json_backend, user_ids, batch, rng)
+        point = await time_point_loads(json_backend, user_ids, rng)
+        rows.append(('json journal', f"{batched:,.1f}", f"{single:,.2f}", f"{json_open:,.2f}", f"{point:,.1f}"))
+        del json_backend
+        gc.collect()
+
+        snapshot_path = os.path.join(tmp, 'bench.snap')
+        convert(legacy_path, snapshot_path)
+        binary = BinaryBackend(snapshot_path, journal_path=os.path.join(tmp, 'binary.journal'))
+        start = time.perf_counter()
+        binary.open()
+        binary_open = time.perf_counter() - start
+        batched, single = await time_writes(binary, user_ids, batch, rng)
+        point = await time_point_loads(binary, user_ids, rng)
+        rows.append(('binary snapshot', f"{batched:,.1f}", f"{single:,.2f}", f"{binary_open:,.2f}", f"{point:,.1f}"))
+        await binary.close()
+
+        start = time.perf_counter()
+        sqlite.open()
+        sqlite_open = time.perf_counter() - start
+        batched, single = await time_writes(sqlite, user_ids, batch, rng)
+        point = await time_point_loads(sqlite, user_ids, rng)
+        rows.append(('sqlite wal', f"{batched:,.1f}", f"{single:,.2f}", f"{sqlite_open:,.2f}", f"{point:,.1f}"))
+        await sqlite.close()
+
+    print(f"{users:,} users, batch of {batch:,} bets")
+    print(format_table(['path', 'us/bet (batched)', 'ms/flush (1 bet)', 'cold open s', 'us/profile load'], rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--batch', type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Blackjack Shoe Benchmark
+Plays hands as /blackjack originally did, building and shuffling a 312-string deck
+per hand and re-parsing ranks for every total, against the engine's bytearray shoe
+kept across hands, measuring latency, allocation and what an open hand keeps alive.
+
+Usage: python -m benchmarks.bench_blackjack [--hands 100000] [--open 1000] [--stand-on 17]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.common import format_table
+from engine import blackjack
+
+
+def legacy_hand_value(hand) -> int:
+    """The original BlackjackView.hand_value, parsing every card's rank."""
+    value = 0
+    aces = 0
+    for card in hand:
+        rank = card[:-1]
+        if rank in ['J', 'Q', 'K']:
+            value += 10
+        elif rank == 'A':
+            aces += 1
+            value += 11
+        else:
+            value += int(rank)
+    while value > 21 and aces > 0:
+        value -= 10
+        aces -= 1
+    return value
+
+
+def legacy_deal(rng: random.Random):
+    """The original /blackjack deal: a fresh six-deck shoe of strings per hand."""
+    suits = ['♠', '♥', '♦', '♣']
+    ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    deck = []
+    for _ in range(6):
+        for suit in suits:
+            for rank in ranks:
+                deck.append(f"{rank}{suit}")
+    rng.shuffle(deck)
+    return deck, [deck.pop(), deck.pop()], [deck.pop(), deck.pop()]
+
+
+def legacy_play(rng: random.Random, stand_on: int) -> str:
+    deck, player, dealer = legacy_deal(rng)
+    if legacy_hand_value(dealer) != 21 and legacy_hand_value(player) != 21:
+        while legacy_hand_value(player) < stand_on:
+            player.append(deck.pop())
+        if legacy_hand_value(player) <= 21:
+            while legacy_hand_value(dealer) < 17:
+                dealer.append(deck.pop())
+    return f"{' '.join(player)} ({legacy_hand_value(player)}) {' '.join(dealer)} ({legacy_hand_value(dealer)})"
+
+
+def shoe_play(shoe: blackjack.Shoe, stand_on: int) -> str:
+    hand = blackjack.deal(shoe, 100)
+    while hand.outcome is None and hand.player_value < stand_on:
+        hand.hit()
+    hand.stand()
+    return f"{hand.player} ({hand.player.total}) {hand.dealer} ({hand.dealer.total})"
+
+
+def per_hand_us(play, hands: int) -> float:
+    start = time.perf_counter()
+    for _ in range(hands):
+        play()
+    return (time.perf_counter() - start) / hands * 1_000_000
+
+
+def allocated_per_hand(play, hands: int) -> float:
+    """Mean peak bytes allocated while playing one hand."""
+    total = 0
+    tracemalloc.start()
+    for _ in range(hands):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        play()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return total / hands
+
+
+def retained_per_open_hand(deal, count: int) -> float:
+    """Bytes kept alive per hand waiting on the player's Hit or Stand, as a BlackjackView holds it."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    hands = [deal() for _ in range(count)]
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del hands
+    return retained / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hands', type=int, default=100_000)
+    parser.add_argument('--open', type=int, default=1_000, help="hands held open for the retained-memory column")
+    parser.add_argument('--stand-on', type=int, default=17, help="player hits below this total")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    shoe = blackjack.Shoe(rng)
+    cases = (
+        ('fresh string deck', lambda: legacy_play(rng, args.stand_on), lambda: legacy_deal(rng)),
+        # Every open hand in a channel shares the channel's shoe
+        ('persistent bytearray shoe', lambda: shoe_play(shoe, args.stand_on), lambda: blackjack.deal(shoe, 100)),
+    )
+    rows = []
+    for name, play, deal in cases:
+        latency = per_hand_us(play, args.hands)
+        allocated = allocated_per_hand(play, min(args.hands, 20_000))
+        retained = retained_per_open_hand(deal, args.open)
+        rows.append((name, f"{latency:.2f}", f"{1_000_000 / latency:,.0f}", f"{allocated:,.0f}", f"{retained:,.0f}"))
+    print(f"{args.hands:,} hands, player hits below {args.stand_on}; totals and card text rendered once per hand")
+    print(format_table(['shoe', 'µs/hand', 'hands/s', 'peak bytes/hand', 'bytes per open hand'], rows))
+
+
+if __name__ == '__main__':
+    main()
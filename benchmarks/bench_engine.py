@@ -0,0 +1,101 @@
+"""
+Game Engine Benchmark
+Plays every game straight through the headless engine, with no Discord objects
+or wallet, and reports rounds per second per game and across worker processes.
+
+Usage: python -m benchmarks.bench_engine [--rounds 1000000] [--workers 4] [--games slots blackjack]
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.common import format_table
+from engine import blackjack, coinflip, dice, race, roulette, slots
+
+BET = 100
+
+
+def play_blackjack(shoe: blackjack.Shoe, mode: str, stand_on: int = 17):
+    """Hit below ``stand_on``, then stand, as simulate_rtp's blackjack player does."""
+    hand = blackjack.deal(shoe, BET, mode)
+    while hand.outcome is None and hand.player_value < stand_on:
+        hand.hit()
+    return hand.stand()
+
+
+# name -> a zero-argument round function drawing from an RNG; blackjack deals from one persistent shoe
+GAMES: Dict[str, Callable[[random.Random], Callable[[], object]]] = {
+    'coinflip': lambda rng: partial(coinflip.flip, rng, BET, 'heads'),
+    'dice:d6': lambda rng: partial(dice.roll, rng, BET, 6, 1),
+    'roulette:red': lambda rng: partial(roulette.spin, rng, BET, 'red'),
+    'roulette:17': lambda rng: partial(roulette.spin, rng, BET, '17'),
+    'race:horse': lambda rng: partial(race.race, rng, BET, 'horse', 1),
+    'slots': lambda rng: partial(slots.spin, rng, BET),
+    'vslots': lambda rng: partial(slots.spin_visual, rng, BET),
+    'blackjack:easy': lambda rng: partial(play_blackjack, blackjack.Shoe(rng), 'easy'),
+    'blackjack:hard': lambda rng: partial(play_blackjack, blackjack.Shoe(rng), 'hard'),
+}
+
+
+def play(name: str, rounds: int, seed: int) -> Tuple[int, int, float]:
+    """Play ``rounds`` rounds of one game; returns rounds, total payout and seconds."""
+    game = GAMES[name](random.Random(seed))
+    paid = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        paid += game().payout
+    return rounds, paid, time.perf_counter() - start
+
+
+def play_parallel(name: str, rounds: int, workers: int, seed: int) -> Tuple[int, int, float]:
+    """Split ``rounds`` across ``workers`` processes, each with its own seeded RNG."""
+    share = rounds // workers
+    start = time.perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(play, [name] * workers, [share] * workers,
+                                [seed + i for i in range(workers)]))
+    return share * workers, sum(paid for _, paid, _ in results), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="rounds per game")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processes for the aggregate run; 1 skips it")
+    parser.add_argument('--games', nargs='+', help="only games whose name starts with one of these")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    names: List[str] = [name for name in GAMES if not args.games or name.startswith(tuple(args.games))]
+    rows = []
+    single_total = parallel_total = 0.0
+    for name in names:
+        rounds, paid, seconds = play(name, args.rounds, args.seed)
+        rate = rounds / seconds
+        single_total += rate
+        row = [name, f"{rate:,.0f}", f"{1_000_000 / rate:.2f}", f"{paid / (rounds * BET):.2%}"]
+        if args.workers > 1:
+            rounds, _, seconds = play_parallel(name, args.rounds, args.workers, args.seed)
+            parallel_rate = rounds / seconds
+            parallel_total += parallel_rate
+            row.append(f"{parallel_rate:,.0f}")
+        rows.append(row)
+
+    headers = ['game', 'rounds/s', 'µs/round', 'observed RTP']
+    if args.workers > 1:
+        headers.append(f'rounds/s x{args.workers}')
+    print(f"{args.rounds:,} rounds per game at ${BET} a round, seed {args.seed}")
+    print(format_table(headers, rows))
+    summary = f"Mean over games: {single_total / len(names):,.0f} rounds/s in one process"
+    if args.workers > 1:
+        summary += f", {parallel_total / len(names):,.0f} rounds/s across {args.workers} processes"
+    print(summary)
+
+
+if __name__ == '__main__':
+    main()
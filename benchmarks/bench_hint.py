@@ -0,0 +1,103 @@
+"""
+Blackjack Hint Benchmark
+Times the Hint button's solver on hands dealt from a persistent shoe: an uncached
+solve, a repeated click answered from cache, and the dealer solve without its
+subproblem memo, against the 50 ms response budget.
+
+Usage: python -m benchmarks.bench_hint [--hands 500] [--naive 50]
+"""
+
+import argparse
+import random
+import time
+from typing import List
+
+from benchmarks.common import format_table
+from engine import blackjack
+from engine.strategy import BUST, DEALER_STANDS_ON, POINTS, StrategySolver, shoe_signature
+
+BUDGET_MS = 50.0
+
+
+def naive_dealer_outcomes(upcard: int, signature) -> List[float]:
+    """Every dealer draw sequence walked separately, as a direct recursion would."""
+    counts = list(signature)
+
+    def draw(total, ace, left):
+        best = total + 10 if ace and total + 10 <= 21 else total
+        if best >= DEALER_STANDS_ON:
+            result = [0.0] * (BUST + 1)
+            result[BUST if best > 21 else best - DEALER_STANDS_ON] = 1.0
+            return result
+        result = [0.0] * (BUST + 1)
+        for value in range(1, 11):
+            count = counts[value]
+            if count:
+                counts[value] -= 1
+                for i, p in enumerate(draw(total + value, ace or value == 1, left - 1)):
+                    result[i] += count / left * p
+                counts[value] += 1
+        return result
+
+    natural = {1: 10, 10: 1}.get(upcard)
+    left = sum(counts)
+    holes = left - (counts[natural] if natural else 0)
+    outcomes = [0.0] * (BUST + 1)
+    for value in range(1, 11):
+        count = counts[value]
+        if count and value != natural:
+            counts[value] -= 1
+            for i, p in enumerate(draw(upcard + value, upcard == 1 or value == 1, left - 1)):
+                outcomes[i] += count / holes * p
+            counts[value] += 1
+    return outcomes
+
+
+def percentiles(samples: List[float]) -> tuple:
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)], samples[-1]
+
+
+def timed_ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--hands', type=int, default=500)
+    parser.add_argument('--naive', type=int, default=50, help="hands timed without the dealer memo")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    shoe = blackjack.Shoe(rng)
+    solver = StrategySolver()
+    cold, warm, naive = [], [], []
+    asked = 0
+    while asked < args.hands:
+        hand = blackjack.deal(shoe, 100)
+        if hand.outcome is None:
+            # Time the hint at the point the player is asked, before any hits
+            cold.append(timed_ms(lambda: solver.hint(hand)))
+            warm.append(timed_ms(lambda: solver.hint(hand)))
+            if len(naive) < args.naive:
+                upcard, signature = POINTS[hand.dealer.cards[0]], shoe_signature(hand)
+                naive.append(timed_ms(lambda: naive_dealer_outcomes(upcard, signature)))
+            asked += 1
+        hand.stand()
+
+    rows = []
+    for name, samples in (('solver, first click', cold), ('solver, repeat click', warm),
+                          ('dealer only, no memo', naive)):
+        p50, p99, worst = percentiles(samples)
+        rows.append((name, len(samples), f"{p50:.3f}", f"{p99:.3f}", f"{worst:.3f}",
+                     'yes' if p99 < BUDGET_MS else 'no'))
+    print(f"Hints on {args.hands:,} easy-mode hands from one persistent six-deck shoe")
+    print(format_table(['case', 'hints', 'p50 ms', 'p99 ms', 'max ms', f'p99 < {BUDGET_MS:.0f} ms'], rows))
+    print(f"Cache: {solver.stats()}")
+
+
+if __name__ == '__main__':
+    main()
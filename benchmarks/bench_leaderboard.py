@@ -0,0 +1,134 @@
+"""
+Leaderboard Query Benchmark
+Replays a busy server where every few bets someone runs /leaderboard, comparing
+the legacy scan-and-sort handler with the LeaderboardEngine with and without
+its page cache, then has several players page through the global board at once.
+
+Usage: python -m benchmarks.bench_leaderboard [--users 100000] [--guild 500] [--requests 2000] [--browsers 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import format_table, write_user_data
+from storage.backends import JsonBackend
+from storage.leaderboard import LeaderboardEngine
+from storage.membership import GuildIndex
+from storage.profile_store import ProfileStore
+
+GUILD_ID = 1
+
+
+async def user_name(guild_id, user_id: str) -> str:
+    return user_id
+
+
+async def replay(handler, store: ProfileStore, players, requests: int, bets_per_request: int) -> float:
+    """Mean µs per leaderboard request, with bets from guild players in between."""
+    rng = random.Random(3)
+    spent = 0.0
+    for _ in range(requests):
+        for _ in range(bets_per_request):
+            user_id = rng.choice(players)
+            await store.settle_bet(user_id, 'slots', 100, rng.choice((0, 0, 250)))
+        caller = rng.choice(players)
+        start = time.perf_counter()
+        await handler(caller)
+        spent += time.perf_counter() - start
+    return spent / requests * 1_000_000
+
+
+async def browse(handler, store: ProfileStore, players, browsers: int, flips: int) -> float:
+    """Mean µs per page flip with ``browsers`` players paging concurrently."""
+    rng = random.Random(5)
+    spent = 0.0
+    for flip in range(flips):
+        await store.settle_bet(rng.choice(players), 'slots', 100, rng.choice((0, 0, 250)))
+        start = time.perf_counter()
+        await asyncio.gather(*(handler(rng.randint(1, 50)) for _ in range(browsers)))
+        spent += time.perf_counter() - start
+    return spent / (flips * browsers) * 1_000_000
+
+
+async def run(users: int, guild_size: int, requests: int, bets_per_request: int, browsers: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'user_data.json')
+        write_user_data(path, users)
+        store = ProfileStore(JsonBackend(path, journal_path=os.path.join(tmp, 'user_data.journal')),
+                             flush_interval=3600, flush_threshold=10 ** 9)
+        store.load()
+        await store.get_rankings()
+
+        all_ids = [user_id for user_id, _ in await store.scan()]
+        players = random.Random(1).sample(all_ids, guild_size)
+        guild_index = GuildIndex(os.path.join(tmp, 'guild_index.json'))
+        for user_id in players:
+            guild_index.add(GUILD_ID, user_id)
+        members = set(players)
+
+        async def legacy(caller):
+            # The old handler: scan everything, filter to the guild, sort, slice, rescan for the caller
+            user_cash = [(uid, p.cash) for uid, p in await store.scan() if uid in members]
+            user_cash.sort(key=lambda x: x[1], reverse=True)
+            top = user_cash[:10]
+            rank = next((i + 1 for i, (uid, _) in enumerate(user_cash) if uid == caller), None)
+            return top, rank
+
+        def engine_handler(engine):
+            async def handler(caller):
+                page = await engine.page(GUILD_ID, 'cash')
+                rank = await engine.rank(GUILD_ID, 'cash', caller)
+                return page.lines, rank
+            return handler
+
+        uncached = LeaderboardEngine(store, guild_index, user_name, ttl=0)
+        cached = LeaderboardEngine(store, guild_index, user_name, ttl=30)
+        rows = []
+        for name, handler in (('legacy scan + sort', legacy),
+                              ('engine, no cache', engine_handler(uncached)),
+                              ('engine, cached', engine_handler(cached))):
+            us = await replay(handler, store, players, requests, bets_per_request)
+            rows.append((name, f"{us:,.1f}", f"{1_000_000 / us:,.0f}"))
+        stats = cached.stats()
+        rows[-1] += (f"{stats['hit_rate']:.0%}",)
+        rows[0] += ('-',)
+        rows[1] += ('-',)
+
+        async def legacy_flip(page):
+            # Without cursors every click re-sorted the whole table to slice one page
+            ranked = sorted(((uid, p.cash) for uid, p in await store.scan()), key=lambda x: x[1], reverse=True)
+            return ranked[(page - 1) * 10:page * 10]
+
+        async def engine_flip(page):
+            return (await cached.page(None, 'cash', page)).lines
+
+        flips = max(1, requests // 100)
+        flip_rows = []
+        for name, handler in (('legacy sort per click', legacy_flip), ('engine page cursor', engine_flip)):
+            us = await browse(handler, store, players, browsers, flips)
+            flip_rows.append((name, f"{us:,.1f}", f"{1_000_000 / us:,.0f}"))
+
+    print(f"{users:,} players, {guild_size:,} in the guild, {bets_per_request} guild bets per /leaderboard")
+    print(format_table(['handler', 'µs/request', 'requests/s', 'cache hit rate'], rows))
+    print()
+    print(f"{browsers} players flipping global pages 1-50 at once, one bet between rounds")
+    print(format_table(['handler', 'µs/flip', 'flips/s'], flip_rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    parser.add_argument('--guild', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--bets', type=int, default=5, help="guild bets between leaderboard requests")
+    parser.add_argument('--browsers', type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.guild, args.requests, args.bets, args.browsers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Leaderboard Request Micro-benchmark
+Times one complete /leaderboard request (top page plus the caller's rank) as
+originally written, re-reading user_data.json and sorting every profile, against
+the shared LeaderboardEngine both /leaderboard and !lb now call.
+
+Usage: python -m benchmarks.bench_leaderboard_request [--users 10000 100000] [--guild 500] [--requests 200]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import format_table, write_user_data
+from storage.backends import JsonBackend
+from storage.leaderboard import LeaderboardEngine
+from storage.membership import GuildIndex
+from storage.profile_store import ProfileStore
+
+GUILD_ID = 1
+
+
+async def user_name(guild_id, user_id: str) -> str:
+    return user_id
+
+
+def original_request(path: str, members, caller: str):
+    """The original handler: reload the file, filter, sort, slice and walk for the caller."""
+    with open(path, 'r') as f:
+        user_data = json.load(f)
+    user_cash = []
+    for user_id, profile in user_data.items():
+        if members is not None and user_id not in members:
+            continue
+        user_cash.append((user_id, profile['cash']))
+    user_cash.sort(key=lambda x: x[1], reverse=True)
+    lines = [f"{i + 1}. **{user_id}** - ${cash:,}" for i, (user_id, cash) in enumerate(user_cash[:10])]
+    rank = next((i + 1 for i, (user_id, _) in enumerate(user_cash) if user_id == caller), None)
+    return lines, rank
+
+
+async def engine_request(engine: LeaderboardEngine, guild_id, caller: str):
+    page = await engine.page(guild_id, 'cash')
+    rank = await engine.rank(guild_id, 'cash', caller)
+    return page.lines, rank
+
+
+def timed_ms(samples) -> float:
+    return sum(samples) / len(samples) * 1000
+
+
+async def run(users: int, guild_size: int, requests: int):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'user_data.json')
+        write_user_data(path, users)
+        store = ProfileStore(JsonBackend(path, journal_path=os.path.join(tmp, 'user_data.journal')),
+                             flush_interval=3600, flush_threshold=10 ** 9)
+        store.load()
+        await store.get_rankings()
+
+        all_ids = [user_id for user_id, _ in await store.scan()]
+        rng = random.Random(17)
+        players = rng.sample(all_ids, guild_size)
+        guild_index = GuildIndex(os.path.join(tmp, 'guild_index.json'))
+        for user_id in players:
+            guild_index.add(GUILD_ID, user_id)
+        members = set(players)
+        cold = LeaderboardEngine(store, guild_index, user_name, ttl=0)
+        warm = LeaderboardEngine(store, guild_index, user_name, ttl=3600)
+
+        original_count = max(1, min(requests, 20))
+        for scope, guild_id, scope_members in (('global', None, None), ('server', GUILD_ID, members)):
+            callers = [rng.choice(players) for _ in range(requests)]
+            original = []
+            for caller in callers[:original_count]:
+                start = time.perf_counter()
+                original_request(path, scope_members, caller)
+                original.append(time.perf_counter() - start)
+            results = [timed_ms(original)]
+            for engine in (cold, warm):
+                samples = []
+                for caller in callers:
+                    start = time.perf_counter()
+                    await engine_request(engine, guild_id, caller)
+                    samples.append(time.perf_counter() - start)
+                results.append(timed_ms(samples))
+            rows.append((f"{users:,}", scope, f"{results[0]:,.1f}", f"{results[1]:,.3f}",
+                         f"{results[2]:,.3f}", f"{results[0] / results[2]:,.0f}x"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--guild', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    for users in args.users:
+        rows.extend(asyncio.run(run(users, args.guild, args.requests)))
+    print(format_table(['users', 'scope', 'original ms', 'engine ms', 'engine cached ms', 'speedup'], rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Snapshot Loop Stall Benchmark
+Measures how long the event loop is blocked while a snapshot is written: the
+legacy on-loop save_user_data, the previous copy-then-write checkpoint and the
+copy-on-write checkpoint with the serialiser in a worker thread.
+
+Usage: python -m benchmarks.bench_loop_stall [--users 1000000] [--tick 0.001]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.common import format_table, write_user_data
+from storage.backends import JsonBackend
+
+
+async def measure_stalls(work, tick: float):
+    """Run ``work()`` while a heartbeat records how late each tick wakes up."""
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(tick)
+            stalls.append(time.perf_counter() - start - tick)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(tick * 5)
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await beat
+    return elapsed, stalls
+
+
+def summarise(name: str, elapsed: float, stalls) -> tuple:
+    stalls = sorted(stalls)
+    p99 = stalls[min(len(stalls) - 1, int(len(stalls) * 0.99))]
+    return (name, f"{elapsed:,.2f}", f"{statistics.median(stalls) * 1000:,.2f}",
+            f"{p99 * 1000:,.1f}", f"{stalls[-1] * 1000:,.1f}")
+
+
+async def run(users: int, tick: float):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'user_data.json')
+        write_user_data(path, users)
+        backend = JsonBackend(path, journal_path=os.path.join(tmp, 'user_data.journal'))
+        backend.open()
+        gc.collect()
+
+        async def legacy_save():
+            # save_user_data(): build dicts and json.dump(indent=2) on the loop
+            data = {uid: profile.to_dict() for uid, profile in backend._profiles.items()}
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2)
+
+        async def copy_then_write():
+            # The checkpoint before this change: copy every profile on the loop
+            snapshot = {uid: profile.to_dict() for uid, profile in backend._profiles.items()}
+            snapshot['__meta__'] = {'journal_seq': 0}
+
+            def write():
+                with open(f"{path}.tmp", 'w') as f:
+                    json.dump(snapshot, f, separators=(',', ':'))
+                os.replace(f"{path}.tmp", path)
+            await asyncio.to_thread(write)
+
+        async def copy_on_write():
+            # Force a checkpoint regardless of the journal size
+            backend._journal_records = 1
+            await backend.checkpoint()
+
+        for name, work in (('legacy save_user_data', legacy_save),
+                           ('copy then write', copy_then_write),
+                           ('copy-on-write thread', copy_on_write)):
+            gc.collect()
+            rows.append(summarise(name, *await measure_stalls(work, tick)))
+
+    print(f"{users:,} profiles, {tick * 1000:.0f} ms heartbeat")
+    print(format_table(['writer', 'total s', 'p50 stall ms', 'p99 stall ms', 'max stall ms'], rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--tick', type=float, default=0.001)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.tick))
+
+
+if __name__ == '__main__':
+    main()
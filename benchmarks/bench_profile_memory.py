@@ -0,0 +1,48 @@
+"""
+Profile Memory Benchmark
+Compares the tracemalloc footprint of legacy per-user dicts against slotted
+Profile objects with epoch timestamps and lazily created nested containers.
+
+Usage: python -m benchmarks.bench_profile_memory [--users 100000]
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from benchmarks.common import format_table, make_profiles
+from storage.profile import Profile
+
+
+def measure(build) -> int:
+    """Return the bytes still allocated by whatever ``build`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Both sides decode the same snapshot text, as startup does
+    text = json.dumps(make_profiles(args.users))
+    legacy = measure(lambda: json.loads(text))
+    slotted = measure(lambda: {uid: Profile.from_dict(p) for uid, p in json.loads(text).items()})
+
+    rows = []
+    for name, size in (('dict of dicts', legacy), ('Profile __slots__', slotted)):
+        rows.append((name, f"{size / 1024 / 1024:,.1f}", f"{size / args.users:,.0f}", f"{legacy / size:,.2f}x"))
+    print(f"{args.users:,} profiles")
+    print(format_table(['representation', 'MB', 'bytes/user', 'vs legacy'], rows))
+
+
+if __name__ == '__main__':
+    main()
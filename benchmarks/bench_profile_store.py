@@ -0,0 +1,77 @@
+"""
+Profile Store Startup Benchmark
+Compares startup time and peak RSS of five per-cog copies of user_data.json
+against the single shared ProfileStore.
+
+Usage: python -m benchmarks.bench_profile_store [--sizes 10000 100000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import format_table, peak_rss_mb, write_user_data
+
+# The five economy cogs that used to load their own copy
+LEGACY_COPIES = 5
+
+
+def run_child(mode: str, path: str):
+    """Load the data file the way ``mode`` does and print timing as JSON."""
+    from storage.backends import JsonBackend
+    from storage.profile_store import ProfileStore
+
+    start = time.perf_counter()
+    if mode == 'legacy':
+        copies = []
+        for _ in range(LEGACY_COPIES):
+            with open(path, 'r') as f:
+                copies.append(json.load(f))
+    else:
+        store = ProfileStore(JsonBackend(path, journal_path=os.devnull))
+        store.load()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'rss_mb': peak_rss_mb()}))
+
+
+def measure(mode: str, path: str) -> dict:
+    """Run one measurement in a fresh interpreter so RSS is not shared."""
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'benchmarks.bench_profile_store', '--child', mode, path],
+        text=True
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = os.path.join(tmp, f'user_data_{size}.json')
+            write_user_data(path, size)
+            file_mb = os.path.getsize(path) / (1024 * 1024)
+            for mode in ('legacy', 'shared'):
+                result = measure(mode, path)
+                rows.append((
+                    f"{size:,}", f"{file_mb:.1f}", mode,
+                    f"{result['seconds'] * 1000:.0f}", f"{result['rss_mb']:.1f}"
+                ))
+
+    print(format_table(['profiles', 'file MB', 'mode', 'startup ms', 'peak RSS MB'], rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Ranking Index Benchmark
+Compares the full sort plus linear scan /stats used to find one user's rank
+against rank, top-10 and update operations on the incrementally maintained index.
+
+Usage: python -m benchmarks.bench_ranking [--users 100000 1000000] [--queries 1000]
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import format_table, make_profiles
+from storage.profile import Profile
+from storage.ranking import RANKED_SCORES, RankIndex
+
+
+def per_op_us(fn, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - start) / count * 1_000_000
+
+
+def run(users: int, queries: int, rng: random.Random):
+    profiles = [(uid, Profile.from_dict(p)) for uid, p in make_profiles(users).items()]
+    user_ids = [uid for uid, _ in profiles]
+    targets = [rng.choice(user_ids) for _ in range(queries)]
+    rows = []
+
+    for category in ('cash', 'level'):
+        score = RANKED_SCORES[category]
+        legacy_count = max(1, min(queries, 20))
+
+        def legacy_rank(i):
+            # What /stats did: sort every profile, then walk the list
+            rankings = sorted(((uid, score(p)) for uid, p in profiles), key=lambda x: x[1], reverse=True)
+            next(n for n, (uid, _) in enumerate(rankings) if uid == targets[i])
+
+        start = time.perf_counter()
+        index = RankIndex(score)
+        index.build(profiles)
+        build_s = time.perf_counter() - start
+
+        updates = [(rng.choice(user_ids), Profile(cash=rng.randrange(10_000_000), level=rng.randrange(200),
+                                                 xp=rng.randrange(200_000))) for _ in range(queries)]
+        legacy_us = per_op_us(legacy_rank, legacy_count)
+        rank_us = per_op_us(lambda i: index.rank(targets[i]), queries)
+        top_us = per_op_us(lambda i: index.top(10), queries)
+        deep_us = per_op_us(lambda i: index.top(10, users // 2), queries)
+        update_us = per_op_us(lambda i: index.update(*updates[i]), queries)
+        rows.append((f"{users:,}", category, f"{build_s:,.2f}", f"{legacy_us / 1000:,.1f}",
+                     f"{rank_us:,.2f}", f"{top_us:,.2f}", f"{deep_us:,.2f}", f"{update_us:,.2f}",
+                     f"{legacy_us / rank_us:,.0f}x"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    rows = []
+    for users in args.users:
+        rows.extend(run(users, args.queries, rng))
+    print(format_table(['users', 'category', 'build s', 'legacy rank ms', 'rank µs', 'top-10 µs',
+                        'page at n/2 µs', 'update µs', 'rank speedup'], rows))
+
+
+if __name__ == '__main__':
+    main()
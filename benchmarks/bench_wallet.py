@@ -0,0 +1,119 @@
+"""
+Wallet Concurrency Benchmark
+Shows the double spend the old read-await-write handlers allowed, and compares
+transaction throughput of per-user locks against a single global lock.
+
+Usage: python -m benchmarks.bench_wallet [--users 1 10 100 1000] [--latency 0.005]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from contextlib import asynccontextmanager
+
+from benchmarks.common import format_table
+from storage.backends import JsonBackend
+from storage.profile_store import ProfileStore
+from storage.wallet import Wallet
+
+
+class GlobalLockWallet(Wallet):
+    """Baseline that funnels every user's transaction through one lock."""
+
+    def __init__(self, store: ProfileStore):
+        super().__init__(store)
+        self._global = asyncio.Lock()
+
+    @asynccontextmanager
+    async def transaction(self, user_id, hold=None):
+        async with self._global:
+            async with super().transaction(user_id, hold) as tx:
+                yield tx
+
+
+def make_store() -> ProfileStore:
+    # Start empty and never flush, so the backend never touches disk
+    path = os.path.join(tempfile.mkdtemp(), 'user_data.json')
+    store = ProfileStore(JsonBackend(path, journal_path=os.devnull), flush_interval=3600,
+                         flush_threshold=10 ** 9)
+    store.load()
+    return store
+
+
+async def double_spend(concurrent: int, latency: float):
+    """Fire ``concurrent`` all-in bets from one user and return final cash."""
+    # Legacy handler shape: check cash, await Discord, then settle
+    store = make_store()
+
+    async def legacy_bet():
+        profile = await store.get_user_profile('1')
+        bet = profile['cash']
+        if bet <= 0:
+            return
+        await asyncio.sleep(latency)
+        await store.settle_bet('1', 'coinflip', bet, 0)
+
+    await asyncio.gather(*(legacy_bet() for _ in range(concurrent)))
+    legacy_cash = (await store.get_user_profile('1'))['cash']
+
+    store = make_store()
+    wallet = Wallet(store)
+
+    async def wallet_bet():
+        async with wallet.transaction('1') as tx:
+            bet = tx.available
+            if bet <= 0:
+                return
+            tx.reserve(bet)
+            await asyncio.sleep(latency)
+            await tx.settle('coinflip', 0)
+
+    await asyncio.gather(*(wallet_bet() for _ in range(concurrent)))
+    return legacy_cash, (await store.get_user_profile('1'))['cash']
+
+
+async def throughput(wallet_cls, users: int, per_user: int, latency: float) -> float:
+    """Transactions per second with ``users`` each running ``per_user`` bets."""
+    store = make_store()
+    wallet = wallet_cls(store)
+    rng = random.Random(7)
+
+    async def player(user_id: str):
+        for _ in range(per_user):
+            async with wallet.transaction(user_id) as tx:
+                tx.reserve(10)
+                await asyncio.sleep(latency)  # the Discord round trip inside a handler
+                await tx.settle('coinflip', 20 if rng.random() < 0.5 else 0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(player(str(uid)) for uid in range(users)))
+    return users * per_user / (time.perf_counter() - start)
+
+
+async def run(user_counts, per_user: int, latency: float):
+    legacy_cash, wallet_cash = await double_spend(5, latency)
+    print(f"5 concurrent all-in bets on $1,000: legacy final cash ${legacy_cash:,}, wallet final cash ${wallet_cash:,}")
+
+    rows = []
+    for users in user_counts:
+        global_tps = await throughput(GlobalLockWallet, users, per_user, latency)
+        wallet_tps = await throughput(Wallet, users, per_user, latency)
+        rows.append((f"{users:,}", f"{global_tps:,.0f}", f"{wallet_tps:,.0f}", f"{wallet_tps / global_tps:,.1f}x"))
+    print(f"{per_user} transactions per user, {latency * 1000:.0f} ms awaited inside each")
+    print(format_table(['users', 'global lock tx/s', 'per-user tx/s', 'speedup'], rows))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--per-user', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.per_user, args.latency))
+
+
+if __name__ == '__main__':
+    main()
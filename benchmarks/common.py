@@ -0,0 +1,65 @@
+"""
+Benchmark Helpers
+Shared fixtures for generating synthetic user data and measuring resources.
+"""
+
+import json
+import random
+import resource
+import sys
+from datetime import datetime, timedelta
+
+
+def make_profile(rng: random.Random) -> dict:
+    """Build one realistic-looking legacy profile dict."""
+    wins = rng.randint(0, 200)
+    losses = rng.randint(0, 200)
+    xp = (wins * 100) + rng.randint(0, 999)
+    total_bet = rng.randint(0, 5_000_000)
+    last_daily = None
+    if rng.random() < 0.3:
+        last_daily = (datetime(2025, 5, 1) + timedelta(minutes=rng.randint(0, 40000))).isoformat()
+    return {
+        'cash': rng.randint(0, 10_000_000),
+        'level': xp // 1000,
+        'xp': xp,
+        'wins': wins,
+        'losses': losses,
+        'total_bet': total_bet,
+        'total_won': rng.randint(0, total_bet + 1),
+        'last_daily': last_daily,
+        'last_work': None,
+        'achievements': {},
+        'items': {},
+        'boosts': {}
+    }
+
+
+def make_profiles(count: int, seed: int = 1234) -> dict:
+    """Build ``count`` profiles keyed by Discord-style snowflake strings."""
+    rng = random.Random(seed)
+    base = 100_000_000_000_000_000
+    return {str(base + i): make_profile(rng) for i in range(count)}
+
+
+def write_user_data(path: str, count: int, seed: int = 1234):
+    """Write a legacy pretty-printed ``user_data.json`` with ``count`` profiles."""
+    with open(path, 'w') as f:
+        json.dump(make_profiles(count, seed), f, indent=2)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def format_table(headers, rows) -> str:
+    """Render a small fixed-width results table."""
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    lines = ["  ".join(str(h).ljust(w) for h, w in zip(headers, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    for row in rows:
+        lines.append("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
+    return "\n".join(lines)
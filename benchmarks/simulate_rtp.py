@@ -0,0 +1,317 @@
+"""
+RTP Simulator
+Monte Carlo return-to-player of every game, drawing outcomes in NumPy batches and
+paying them with the engine's own paytables, with confidence intervals, the exact RTP
+where the outcome space is small enough to enumerate, a replay of blackjack through
+the engine's own hands to confirm the batched model, and a baseline check for CI.
+
+Usage: python -m benchmarks.simulate_rtp [--rounds 100000000] [--games slots blackjack] [--engine-rounds 200000] [--check benchmarks/rtp_baseline.json]
+"""
+
+import argparse
+import itertools
+import json
+import random
+import sys
+import time
+from statistics import NormalDist
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("The RTP simulator needs NumPy: pip install .[bench]")
+
+from benchmarks.common import format_table
+from engine import blackjack
+from engine.blackjack import BLACKJACK_PAYOUTS, result_payout
+from engine.dice import DICE_SIDES
+from engine.race import RACE_CONFIG
+from engine.roulette import ROULETTE_NUMBERS, roulette_payout_ratio
+from engine.slots import SLOT_REEL, VISUAL_SLOT_REEL, slots_payout, visual_slots_payout
+from utils.sampling import AliasSampler
+
+ROULETTE_BETS = ('red', 'black', 'green', '1st', '2nd', '1st12', '2nd12', '3rd12', '0', '00', '17')
+
+# Blackjack shoe by rank: A, 2-9, then 10/J/Q/K, which all count 10
+RANK_VALUES = np.array([11, 2, 3, 4, 5, 6, 7, 8, 9, 10], dtype=np.int16)
+SHOE = np.array([4 * 6] * 9 + [16 * 6], dtype=np.int16)
+
+# How far an exact RTP may move before --check calls it a paytable change
+EXACT_TOLERANCE = 1e-9
+
+
+class Game:
+    """One bet type: draws ``size`` rounds at once and returns each round's gross payout.
+
+    ``reference``, when set, plays ``rounds`` rounds one at a time through
+    the engine's own classes from a ``random.Random``, yielding each gross
+    payout, so a batched model can be checked against the real game.
+    """
+
+    def __init__(self, name: str, play: Callable, exact: Optional[float] = None,
+                 reference: Optional[Callable[[random.Random, int], Iterator[int]]] = None):
+        self.name = name
+        self.play = play
+        self.exact = exact
+        self.reference = reference
+
+
+def table_game(name: str, probabilities: np.ndarray, payouts: np.ndarray, draw: Callable, bet: int) -> Game:
+    """A game whose outcomes can be enumerated: ``draw`` picks outcome indices, ``payouts`` pays them."""
+    return Game(name, lambda generator, size: payouts[draw(generator, size)],
+                exact=float(probabilities @ payouts) / bet)
+
+
+def uniform_game(name: str, outcomes: int, payout: Callable[[int], int], bet: int) -> Game:
+    payouts = np.array([payout(i) for i in range(outcomes)], dtype=np.int64)
+    return table_game(name, np.full(outcomes, 1 / outcomes), payouts,
+                      lambda generator, size: generator.integers(0, outcomes, size), bet)
+
+
+def reel_game(name: str, reel: AliasSampler, payout: Callable[[List[str]], int], bet: int) -> Game:
+    """Three independent reels; every symbol combination is paid once up front."""
+    n = len(reel)
+    probabilities = np.array([reel.probability(item) for item in reel.items])
+    payouts = np.zeros(n ** 3, dtype=np.int64)
+    odds = np.zeros(n ** 3)
+    for i, j, k in itertools.product(range(n), repeat=3):
+        combo = i * n * n + j * n + k
+        payouts[combo] = payout([reel.items[i], reel.items[j], reel.items[k]])
+        odds[combo] = probabilities[i] * probabilities[j] * probabilities[k]
+
+    def draw(generator, size):
+        return (reel.sample_indices(generator, size) * n + reel.sample_indices(generator, size)) * n \
+            + reel.sample_indices(generator, size)
+
+    return table_game(name, odds, payouts, draw, bet)
+
+
+def blackjack_game(name: str, mode: str, stand_on: int, bet: int) -> Game:
+    """/blackjack with a player who hits below ``stand_on``.
+
+    Each hand gets a full six-deck shoe; the bot deals a persistent shoe down
+    to the cut card, which moves a fixed strategy's RTP by far less than the
+    interval. Payouts come from the engine by result, and ``reference``
+    replays the same player through :class:`engine.blackjack.BlackjackHand`
+    on a persistent shoe so the two can be compared.
+    """
+    paid = {result: result_payout(bet, mode, result)
+            for result in ('dealer_blackjack', 'blackjack', 'bust', 'dealer_bust', 'win', 'push', 'lose')}
+
+    def play(generator, size):
+        counts = np.tile(SHOE, (size, 1))
+        left = np.full(size, int(SHOE.sum()), dtype=np.int16)
+
+        def deal(totals, aces, rows):
+            u = (generator.random(len(rows)) * left[rows]).astype(np.int16)
+            ranks = (counts[rows].cumsum(axis=1) > u[:, None]).argmax(axis=1)
+            counts[rows, ranks] -= 1
+            left[rows] -= 1
+            totals[rows] += RANK_VALUES[ranks]
+            aces[rows] += ranks == 0
+            # An ace drops from 11 to 1 only while the hand would bust
+            soft = rows[(totals[rows] > 21) & (aces[rows] > 0)]
+            totals[soft] -= 10
+            aces[soft] -= 1
+
+        everyone = np.arange(size)
+        player, player_aces = np.zeros(size, dtype=np.int16), np.zeros(size, dtype=np.int16)
+        dealer, dealer_aces = np.zeros(size, dtype=np.int16), np.zeros(size, dtype=np.int16)
+        for totals, aces in ((player, player_aces), (player, player_aces), (dealer, dealer_aces), (dealer, dealer_aces)):
+            deal(totals, aces, everyone)
+
+        payouts = np.full(size, paid['lose'], dtype=np.int64)
+        # Dealer blackjack beats everything, including a player blackjack
+        payouts[dealer == 21] = paid['dealer_blackjack']
+        payouts[(player == 21) & (dealer != 21)] = paid['blackjack']
+        playing = (player != 21) & (dealer != 21)
+
+        rows = np.flatnonzero(playing & (player < stand_on))
+        while rows.size:
+            deal(player, player_aces, rows)
+            rows = rows[player[rows] < stand_on]
+        payouts[playing & (player > 21)] = paid['bust']
+        standing = playing & (player <= 21)
+
+        rows = np.flatnonzero(standing & (dealer < 17))
+        while rows.size:
+            deal(dealer, dealer_aces, rows)
+            rows = rows[dealer[rows] < 17]
+
+        payouts[standing & (dealer > 21)] = paid['dealer_bust']
+        payouts[standing & (dealer <= 21) & (player > dealer)] = paid['win']
+        payouts[standing & (dealer <= 21) & (player == dealer)] = paid['push']
+        return payouts
+
+    def reference(rng, rounds):
+        shoe = blackjack.Shoe(rng)
+        for _ in range(rounds):
+            hand = blackjack.deal(shoe, bet, mode)
+            while hand.outcome is None and hand.player_value < stand_on:
+                hand.hit()
+            yield hand.stand().payout
+
+    return Game(name, play, reference=reference)
+
+
+def build_games(bet: int, stand_on: int) -> List[Game]:
+    games = [
+        reel_game('slots', SLOT_REEL, lambda symbols: slots_payout(symbols, bet)[0], bet),
+        reel_game('vslots', VISUAL_SLOT_REEL, lambda symbols: visual_slots_payout(symbols, bet)[0], bet),
+    ]
+    for prediction in ROULETTE_BETS:
+        ratios = [roulette_payout_ratio(prediction, result) for result in ROULETTE_NUMBERS]
+        games.append(uniform_game(f'roulette:{prediction}', len(ROULETTE_NUMBERS),
+                                  lambda i, ratios=ratios: bet * ratios[i] + bet if ratios[i] else 0, bet))
+    for racer_type, config in RACE_CONFIG.items():
+        # Every racer is equally likely, so betting on #1 stands for any prediction
+        games.append(uniform_game(f'race:{racer_type}', config['count'],
+                                  lambda i, odds=config['odds']: bet * odds + bet if i == 0 else 0, bet))
+    for sides in DICE_SIDES:
+        games.append(uniform_game(f'dice:d{sides}', sides,
+                                  lambda i, sides=sides: bet * sides + bet if i == 0 else 0, bet))
+    games.append(uniform_game('coinflip', 2, lambda i: bet + bet if i == 0 else 0, bet))
+    for mode in BLACKJACK_PAYOUTS:
+        games.append(blackjack_game(f'blackjack:{mode}', mode, stand_on, bet))
+    return games
+
+
+def simulate(game: Game, rounds: int, chunk: int, bet: int, generator) -> Dict[str, float]:
+    """Mean and variance of the return per unit bet over ``rounds`` rounds."""
+    total = 0.0
+    squares = 0.0
+    done = 0
+    start = time.perf_counter()
+    while done < rounds:
+        size = min(chunk, rounds - done)
+        returns = game.play(generator, size) / bet
+        total += float(returns.sum())
+        squares += float(np.square(returns).sum())
+        done += size
+    mean = total / rounds
+    variance = max(squares / rounds - mean * mean, 0.0) * rounds / max(rounds - 1, 1)
+    return {'rounds': rounds, 'rtp': mean, 'variance': variance, 'seconds': time.perf_counter() - start}
+
+
+def replay(game: Game, rounds: int, bet: int, rng: random.Random) -> Dict[str, float]:
+    """Mean and variance of the return per unit bet over ``rounds`` rounds of the game's engine reference."""
+    total = 0.0
+    squares = 0.0
+    start = time.perf_counter()
+    for payout in game.reference(rng, rounds):
+        total += payout / bet
+        squares += (payout / bet) ** 2
+    mean = total / rounds
+    variance = max(squares / rounds - mean * mean, 0.0) * rounds / max(rounds - 1, 1)
+    return {'rounds': rounds, 'rtp': mean, 'variance': variance, 'seconds': time.perf_counter() - start}
+
+
+def cross_check(results: Dict[str, dict], references: Dict[str, dict], z: float) -> List[str]:
+    """Problems where a batched model and the engine replaying the same player disagree."""
+    problems = []
+    for name, reference in references.items():
+        result = results[name]
+        half_width = z * (result['variance'] / result['rounds'] + reference['variance'] / reference['rounds']) ** 0.5
+        if abs(result['rtp'] - reference['rtp']) > half_width:
+            problems.append(f"{name}: simulated {result['rtp']:.6f} and engine {reference['rtp']:.6f} "
+                            f"differ by more than {half_width:.6f}")
+    return problems
+
+
+def check(results: Dict[str, dict], games: Dict[str, Game], baseline: Dict[str, float], z: float) -> List[str]:
+    """Problems that should fail a CI run: changed exact RTPs, or simulations off their exact or baseline value."""
+    problems = []
+    for name, result in results.items():
+        game = games[name]
+        half_width = z * (result['variance'] / result['rounds']) ** 0.5
+        if game.exact is not None and abs(result['rtp'] - game.exact) > half_width:
+            problems.append(f"{name}: simulated {result['rtp']:.6f} is outside the interval around exact {game.exact:.6f}")
+        expected = baseline.get(name)
+        if expected is None:
+            problems.append(f"{name}: not in the baseline")
+        elif game.exact is not None:
+            if abs(game.exact - expected) > EXACT_TOLERANCE:
+                problems.append(f"{name}: exact RTP changed from {expected:.6f} to {game.exact:.6f}")
+        elif abs(result['rtp'] - expected) > half_width:
+            problems.append(f"{name}: RTP {result['rtp']:.6f} ± {half_width:.6f} no longer covers baseline {expected:.6f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=100_000_000, help="rounds per game")
+    parser.add_argument('--chunk', type=int, default=1_000_000, help="rounds drawn per NumPy batch")
+    parser.add_argument('--games', nargs='+', help="only games whose name starts with one of these")
+    parser.add_argument('--bet', type=int, default=100, help="stake per round; payouts round down per bet")
+    parser.add_argument('--stand-on', type=int, default=17, help="blackjack player hits below this total")
+    parser.add_argument('--engine-rounds', type=int, default=200_000,
+                        help="rounds replayed through the engine for games with a reference; 0 skips it")
+    parser.add_argument('--confidence', type=float, default=0.99)
+    parser.add_argument('--seed', type=int, default=20240601)
+    parser.add_argument('--check', metavar='BASELINE', help="exit 1 if results drift from this baseline file")
+    parser.add_argument('--write-baseline', metavar='PATH', help="save exact (else simulated) RTPs as the new baseline")
+    args = parser.parse_args()
+
+    games = {game.name: game for game in build_games(args.bet, args.stand_on)
+             if not args.games or game.name.startswith(tuple(args.games))}
+    generator = np.random.default_rng(args.seed)
+    z = NormalDist().inv_cdf(0.5 + args.confidence / 2)
+
+    results = {}
+    rows = []
+    for name, game in games.items():
+        result = results[name] = simulate(game, args.rounds, args.chunk, args.bet, generator)
+        half_width = z * (result['variance'] / result['rounds']) ** 0.5
+        rows.append((
+            name,
+            f"{result['rtp']:.4%}",
+            f"±{half_width:.4%}",
+            f"{game.exact:.4%}" if game.exact is not None else '-',
+            f"{1 - (game.exact if game.exact is not None else result['rtp']):+.2%}",
+            f"{result['variance']:,.2f}",
+            f"{result['rounds'] / result['seconds']:,.0f}",
+        ))
+    print(f"{args.rounds:,} rounds per game at ${args.bet} a round, {args.confidence:.0%} confidence intervals")
+    print(format_table(['game', 'RTP', 'interval', 'exact RTP', 'house edge', 'variance', 'rounds/s'], rows))
+    for name, result in results.items():
+        rtp = games[name].exact if games[name].exact is not None else result['rtp']
+        if rtp > 1:
+            print(f"WARN {name}: pays back {rtp:.2%} of every bet; the house loses money on it")
+
+    problems = []
+    if args.engine_rounds > 0:
+        rng = random.Random(args.seed)
+        references = {name: replay(game, args.engine_rounds, args.bet, rng)
+                      for name, game in games.items() if game.reference is not None}
+        if references:
+            print(f"Engine replay: {args.engine_rounds:,} rounds per game through the engine's own classes")
+            print(format_table(['game', 'simulated RTP', 'engine RTP', 'difference', 'rounds/s'], [
+                (name, f"{results[name]['rtp']:.4%}", f"{reference['rtp']:.4%}",
+                 f"{reference['rtp'] - results[name]['rtp']:+.4%}",
+                 f"{reference['rounds'] / reference['seconds']:,.0f}")
+                for name, reference in references.items()]))
+            problems += cross_check(results, references, z)
+
+    if args.write_baseline:
+        baseline = {name: games[name].exact if games[name].exact is not None else result['rtp']
+                    for name, result in results.items()}
+        with open(args.write_baseline, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"Wrote baseline for {len(baseline)} games to {args.write_baseline}")
+
+    if args.check:
+        with open(args.check, 'r') as f:
+            baseline = json.load(f)
+        problems += check(results, games, baseline, z)
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    if args.check:
+        print(f"All {len(results)} games match {args.check}")
+
+
+if __name__ == '__main__':
+    main()
@@ -18,6 +18,15 @@ from commands.leaderboard import LeaderboardCommands
 from commands.visual_slots import VisualSlotsCommands
 from commands.traditional import TraditionalCommands
 from commands.handlers import EnhancedHandlers
+from storage.backends import create_backend
+from storage.economy import EconomyStats
+from storage.history import LeaderboardHistory
+from storage.leaderboard import LeaderboardEngine
+from storage.membership import GuildIndex
+from storage.profile_store import ProfileStore
+from storage.wallet import Wallet
+from utils.avatars import AvatarCache
+from utils.cards import CARDS_AVAILABLE, CardRenderer
 
 class DiscordBot(commands.Bot):
     """Main Discord bot class with slash command support."""
@@ -28,22 +37,109 @@ class DiscordBot(commands.Bot):
         intents = discord.Intents.default()
         intents.message_content = True
         intents.guilds = True
+        intents.members = BotConfig.MEMBERS_INTENT
         
         # Initialize the bot
         super().__init__(
             command_prefix=BotConfig.COMMAND_PREFIX,
             intents=intents,
             help_command=None,  # We'll create our own help command
-            case_insensitive=True
+            case_insensitive=True,
+            # Names come from profiles, so full member lists are opt-in
+            chunk_guilds_at_startup=BotConfig.CHUNK_GUILDS
         )
         
         self.logger = logging.getLogger(__name__)
         self.start_time = datetime.utcnow()
         
+        # Shared profile store used by every economy cog
+        backend = create_backend(
+            BotConfig.STORAGE_BACKEND,
+            path=BotConfig.USER_DATA_FILE,
+            snapshot_path=BotConfig.SNAPSHOT_FILE,
+            journal_path=BotConfig.JOURNAL_FILE,
+            compact_interval=BotConfig.COMPACT_INTERVAL,
+            compact_records=BotConfig.COMPACT_RECORDS,
+            sqlite_path=BotConfig.SQLITE_FILE
+        )
+        self.profile_store = ProfileStore(
+            backend,
+            flush_interval=BotConfig.FLUSH_INTERVAL,
+            flush_threshold=BotConfig.FLUSH_THRESHOLD,
+            cache_size=BotConfig.PROFILE_CACHE_SIZE,
+            cache_bytes=int(BotConfig.PROFILE_CACHE_MB * 1024 * 1024),
+            rank_min_games=BotConfig.LEADERBOARD_MIN_GAMES
+        )
+        self.profile_store.load()
+        self.wallet = Wallet(self.profile_store)
+        
+        # Money supply, house edge and activity figures for the owner economy report
+        self.economy = EconomyStats(self.profile_store, BotConfig.ECONOMY_STATS_FILE)
+        self.economy.load()
+        
+        # Players seen in each guild, for server-scoped leaderboards
+        self.guild_index = GuildIndex(BotConfig.GUILD_INDEX_FILE, save_interval=BotConfig.GUILD_INDEX_SAVE_INTERVAL)
+        self.guild_index.load()
+        
+        # Periodic leaderboard snapshots for rank-change arrows
+        self.leaderboard_history = LeaderboardHistory(
+            self.profile_store,
+            self.guild_index,
+            BotConfig.LEADERBOARD_HISTORY_FILE,
+            interval=BotConfig.LEADERBOARD_HISTORY_INTERVAL,
+            retention=BotConfig.LEADERBOARD_HISTORY_DAYS * 86400,
+            depth=BotConfig.LEADERBOARD_HISTORY_DEPTH
+        )
+        self.leaderboard_history.load()
+        
+        # Cached leaderboard pages built from the ranking and guild indexes
+        self.leaderboards = LeaderboardEngine(
+            self.profile_store,
+            self.guild_index,
+            self.display_name,
+            ttl=BotConfig.LEADERBOARD_CACHE_TTL,
+            history=self.leaderboard_history
+        )
+        
+        # Image leaderboard cards, when Pillow is installed
+        self.avatars = AvatarCache(
+            BotConfig.AVATAR_CACHE_DIR,
+            memory_bytes=int(BotConfig.AVATAR_MEMORY_MB * 1024 * 1024),
+            disk_bytes=int(BotConfig.AVATAR_CACHE_MB * 1024 * 1024)
+        )
+        self.cards = None
+        if BotConfig.LEADERBOARD_CARDS and CARDS_AVAILABLE:
+            self.cards = CardRenderer(self.avatars, workers=BotConfig.CARD_WORKERS)
+        elif BotConfig.LEADERBOARD_CARDS:
+            self.logger.warning("Pillow is not installed (pip install .[cards]); leaderboard cards are disabled")
+        
+    async def display_name(self, guild_id, user_id: str) -> str:
+        """Best known name for a user: cached member or user, then the stored name, then a mention."""
+        guild = self.get_guild(guild_id) if guild_id else None
+        user = (guild.get_member(int(user_id)) if guild else None) or self.get_user(int(user_id))
+        if user:
+            return user.display_name
+        profile = await self.profile_store.get_user_profile(user_id)
+        return profile.display_name or f"<@{user_id}>"
+    
+    async def remember_user(self, user):
+        """Keep the name and avatar on a player's profile current."""
+        await self.profile_store.remember_identity(
+            str(user.id),
+            user.global_name or user.name,
+            user.avatar.key if user.avatar else None
+        )
+        
     async def setup_hook(self):
         """Setup hook called when the bot is starting up."""
         self.logger.info("Setting up bot...")
         
+        # Start background persistence for the profile store
+        self.profile_store.start()
+        self.leaderboard_history.start()
+        self.economy.start()
+        self.guild_index.start()
+        
         # Add command cogs
         await self.add_cog(BasicCommands(self))
         await self.add_cog(AdvancedCommands(self))
@@ -61,6 +157,21 @@ class DiscordBot(commands.Bot):
         except Exception as e:
             self.logger.error(f"Failed to sync slash commands: {e}")
     
+    async def close(self):
+        """Flush pending profile changes before disconnecting."""
+        self.logger.info("Shutting down, flushing profile store...")
+        try:
+            await self.leaderboard_history.close()
+            await self.economy.close()
+            await self.profile_store.close()
+        finally:
+            # Saved whatever happened above; without the members intent it cannot be rebuilt
+            await self.guild_index.close()
+            await self.avatars.close()
+            if self.cards is not None:
+                self.cards.close()
+            await super().close()
+    
     async def on_ready(self):
         """Event triggered when the bot is ready and connected."""
         if self.user:
@@ -73,6 +184,50 @@ class DiscordBot(commands.Bot):
             name=f"{len(self.guilds)} servers | /help"
         )
         await self.change_presence(activity=activity, status=discord.Status.online)
+        
+        if BotConfig.MEMBERS_INTENT:
+            await self.sync_guild_index()
+    
+    async def sync_guild_index(self):
+        """Reconcile the guild index with the member lists of chunked guilds."""
+        players = (await self.profile_store.get_rankings())['cash']
+        for guild in self.guilds:
+            if not guild.chunked:
+                continue
+            present = {str(member.id) for member in guild.members}
+            for user_id in list(self.guild_index.members(guild.id) - present):
+                self.guild_index.discard(guild.id, user_id)
+            for user_id in present:
+                if user_id in players:
+                    self.guild_index.add(guild.id, user_id)
+    
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Remember the guilds players use slash commands in."""
+        if interaction.guild is not None and interaction.type == discord.InteractionType.application_command:
+            self.guild_index.add(interaction.guild.id, str(interaction.user.id))
+    
+    async def on_command(self, ctx):
+        """Remember the guilds players use prefix commands in."""
+        if ctx.guild is not None:
+            self.guild_index.add(ctx.guild.id, str(ctx.author.id))
+    
+    async def on_app_command_completion(self, interaction: discord.Interaction, command):
+        """Record who ran a slash command once it has created or updated their profile."""
+        await self.remember_user(interaction.user)
+    
+    async def on_command_completion(self, ctx):
+        """Record who ran a prefix command once it has created or updated their profile."""
+        await self.remember_user(ctx.author)
+    
+    async def on_member_join(self, member):
+        """Re-index returning players; only fires with MEMBERS_INTENT."""
+        players = (await self.profile_store.get_rankings())['cash']
+        if str(member.id) in players:
+            self.guild_index.add(member.guild.id, str(member.id))
+    
+    async def on_member_remove(self, member):
+        """Drop players who leave; only fires with MEMBERS_INTENT."""
+        self.guild_index.discard(member.guild.id, str(member.id))
     
     async def on_guild_join(self, guild):
         """Event triggered when the bot joins a new guild."""
@@ -88,6 +243,7 @@ class DiscordBot(commands.Bot):
     async def on_guild_remove(self, guild):
         """Event triggered when the bot leaves a guild."""
         self.logger.info(f"Left guild: {guild.name} (ID: {guild.id})")
+        self.guild_index.drop_guild(guild.id)
         
         # Update bot status
         activity = discord.Activity(
@@ -248,6 +248,9 @@ class BasicCommands(commands.Cog):
             "`/leaderboard cash` - Top richest players",
             "`/leaderboard level` - Highest level players", 
             "`/leaderboard wins` - Most wins leaderboard",
+            "`/leaderboard winrate` - Best win rate (minimum games apply)",
+            "`/leaderboard profit` - Highest net profit (minimum games apply)",
+            "`/leaderboard biggestwin` - Biggest single-bet wins",
             "`/stats [user]` - Detailed gambling statistics",
             "`/slot_info` - Slot machine symbol information"
         ]
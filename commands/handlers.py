@@ -348,6 +348,59 @@ class EnhancedHandlers(commands.Cog):
         embed.add_field(name="CPU Usage", value=f"{cpu_usage}%", inline=True)
         embed.add_field(name="Uptime", value=str(datetime.utcnow() - self.bot.start_time).split('.')[0], inline=True)
         
+        # Profile cache info
+        cache = self.bot.profile_store.cache_stats()
+        embed.add_field(name="Cached Profiles", value=f"{cache['entries']:,}/{cache['max_entries']:,} ({cache['bytes'] / 1024 / 1024:.1f} MB)", inline=True)
+        embed.add_field(name="Cache Hit Rate", value=f"{cache['hit_rate']:.1%} ({cache['hits']:,} hits, {cache['misses']:,} misses)", inline=True)
+        embed.add_field(name="Evictions", value=f"{cache['evictions']:,} ({cache['dirty']:,} dirty, {cache['writeback']:,} awaiting write)", inline=True)
+
+        await ctx.send(embed=embed)
+
+    @commands.command(name='economy', hidden=True)
+    @commands.is_owner()
+    async def economy_command(self, ctx):
+        """Show money supply, wealth distribution and house profit (owner only)."""
+        report = self.bot.economy.report()
+        embed = discord.Embed(
+            title="🏦 Economy",
+            color=discord.Color.gold(),
+            timestamp=datetime.utcnow()
+        )
+
+        # Money supply and distribution
+        if report['players'] is None:
+            embed.add_field(name="Players", value="Still counting balances, try again shortly", inline=False)
+        else:
+            percentiles = report['percentiles']
+            embed.add_field(name="Players", value=f"{report['players']:,}", inline=True)
+            embed.add_field(name="Cash in Circulation", value=f"${report['circulation']:,}", inline=True)
+            embed.add_field(name="Mean Balance", value=f"${report['mean']:,.0f}", inline=True)
+            embed.add_field(
+                name=f"Balance Percentiles (±{report['accuracy']:.0%})",
+                value="\n".join(f"p{p}: ${value:,.0f}" for p, value in percentiles.items() if value is not None) or "No players",
+                inline=True
+            )
+            embed.add_field(name="Gini Coefficient", value=f"{report['gini']:.3f}", inline=True)
+
+        # Activity
+        activity = [f"Today: {report['active_today']:,}"]
+        if report['active_yesterday'] is not None:
+            activity.append(f"Yesterday: {report['active_yesterday']:,}")
+            activity.append(f"7-day average: {report['active_week_avg']:,.0f}")
+        embed.add_field(name="Daily Active Gamblers", value="\n".join(activity), inline=True)
+
+        # House profit per game
+        games = [
+            f"**{game}**: ${profit:,} of ${wagered:,} ({profit / wagered:.1%}, {bets:,} bets)"
+            for game, bets, wagered, profit in report['games'] if wagered
+        ]
+        embed.add_field(
+            name=f"House Profit: ${report['house_profit']:,}",
+            value="\n".join(games) or "No bets settled yet",
+            inline=False
+        )
+        embed.set_footer(text=f"Game totals since {datetime.utcfromtimestamp(report['since']):%Y-%m-%d}")
+
         await ctx.send(embed=embed)
 
 async def setup(bot):
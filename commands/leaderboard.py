@@ -7,269 +7,292 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import List, Optional
-import json
-import os
-from datetime import datetime
+import io
+
+from storage.history import PERIODS, format_rank_change
+
+# Title and colour of each leaderboard category
+LEADERBOARD_STYLES = {
+    'cash': ("💰 Cash Leaderboard", discord.Color.gold()),
+    'level': ("⭐ Level Leaderboard", discord.Color.purple()),
+    'wins': ("🏆 Wins Leaderboard", discord.Color.green()),
+    'win_rate': ("🎯 Win Rate Leaderboard", discord.Color.teal()),
+    'profit': ("📈 Net Profit Leaderboard", discord.Color.dark_green()),
+    'biggest_win': ("💎 Biggest Win Leaderboard", discord.Color.blue()),
+}
+
+# Words accepted for each category by the prefix command
+LEADERBOARD_ALIASES = {
+    'cash': ('cash', 'money', 'balance'),
+    'level': ('level', 'levels', 'xp'),
+    'wins': ('wins', 'win'),
+    'win_rate': ('winrate', 'rate', 'wr'),
+    'profit': ('profit', 'net'),
+    'biggest_win': ('biggestwin', 'bigwin', 'jackpot'),
+}
+
+# Boards that only rank players with enough settled bets
+MIN_GAMES_CATEGORIES = ('win_rate', 'profit')
+
+# Rank-change look-backs offered by the period option
+PERIOD_LABELS = {
+    'day': "since yesterday",
+    'week': "since last week",
+    'month': "since last month",
+}
+
+PERIOD_CHOICES = [app_commands.Choice(name=label.capitalize(), value=period) for period, label in PERIOD_LABELS.items()]
+
+
+def resolve_category(name: str) -> Optional[str]:
+    """Map a typed category such as ``money`` or ``wr`` to its leaderboard category."""
+    name = name.lower()
+    return next((category for category, aliases in LEADERBOARD_ALIASES.items() if name in aliases), None)
+
+
+async def rank_fields(engine, user_id: str) -> List[tuple]:
+    """``(name, value)`` stats fields with a user's global cash and level rank.
+
+    Ranks are index lookups in the shared engine, and the change since
+    yesterday comes from its history snapshots.
+    """
+    fields = []
+    for category, name in (('cash', "🏆 Cash Rank"), ('level', "⭐ Level Rank")):
+        rank = await engine.rank(None, category, user_id)
+        value = f"#{rank}" if rank else "#N/A"
+        if rank and engine.history is not None:
+            previous = engine.history.previous_rank(None, category, user_id, PERIODS['day'])
+            if previous:
+                value = f"{value} {format_rank_change(previous, rank)}".rstrip()
+        fields.append((name, value))
+    return fields
+
+
+class LeaderboardView(discord.ui.View):
+    """Previous/next/jump-to-me paging over one leaderboard.
+
+    The view only remembers a page number; each page is a slice of the
+    ranking index served (usually from cache) by the LeaderboardEngine,
+    so flipping pages never re-sorts anything. Given a CardRenderer the
+    page is shown as a PNG card instead of text lines.
+    """
+    
+    def __init__(self, engine, guild_id, category, user_id, scope_label=None, page=1, period=None, cards=None):
+        super().__init__(timeout=180)
+        self.engine = engine
+        self.guild_id = guild_id
+        self.category = category
+        self.user_id = user_id
+        self.scope_label = scope_label
+        self.page = page
+        self.period = period
+        self.cards = cards
+        self.total = 0
+        self.attachment = None
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only the player who opened the leaderboard can flip its pages."""
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message("Run the leaderboard command to browse your own copy!", ephemeral=True)
+            return False
+        return True
+    
+    async def render(self) -> discord.Embed:
+        """Build the embed for the current page and update the buttons."""
+        # A File can only be uploaded once, and a page without rows has no card
+        self.attachment = None
+        page = await self.engine.page(self.guild_id, self.category, self.page, self.period)
+        self.total = page.total
+        title, color = LEADERBOARD_STYLES[self.category]
+        min_games = self.engine.store.rank_min_games
+        
+        if not page.lines:
+            description = "No players found with gambling data."
+            if self.category in MIN_GAMES_CATEGORIES:
+                description = f"No players have played {min_games} games yet."
+            return discord.Embed(
+                title=title,
+                description=description,
+                color=discord.Color.orange()
+            )
+        
+        labels = [label for label in (self.scope_label, PERIOD_LABELS.get(self.period)) if label]
+        embed = discord.Embed(
+            title=f"{title} ({' • '.join(labels)})" if labels else title,
+            description="\n".join(page.lines),
+            color=color
+        )
+        if self.cards is not None:
+            png = await self.render_card(page, embed.title)
+            self.attachment = discord.File(io.BytesIO(png), filename="leaderboard.png")
+            embed.description = None
+            embed.set_image(url="attachment://leaderboard.png")
+        
+        # Add user's ranking if it is not on this page
+        user_rank = await self.engine.rank(self.guild_id, self.category, str(self.user_id))
+        if user_rank and not page.start < user_rank <= page.start + len(page.rows):
+            score = await self.engine.score(self.category, str(self.user_id))
+            embed.add_field(
+                name="Your Ranking",
+                value=f"#{user_rank} - {await self.engine.describe(self.category, str(self.user_id), score)}",
+                inline=False
+            )
+        
+        pages = self.engine.page_of(page.total)
+        footer = f"Page {self.page}/{pages} • {page.total:,} players"
+        if self.category in MIN_GAMES_CATEGORIES:
+            footer += f" • min {min_games} games"
+        if self.period and not page.compared:
+            footer += f" • no history {PERIOD_LABELS[self.period]} yet"
+        embed.set_footer(text=footer)
+        self.previous_page.disabled = self.page <= 1
+        self.next_page.disabled = self.page >= pages
+        self.jump_to_me.disabled = user_rank is None or self.engine.page_of(user_rank) == self.page
+        return embed
+    
+    async def render_card(self, page, title: str) -> bytes:
+        """PNG card of the page, reused by the renderer while its rows are unchanged."""
+        rows, user_ids = [], []
+        for rank, (user_id, score) in enumerate(page.rows, page.start + 1):
+            profile = await self.engine.store.get_user_profile(user_id)
+            name = await self.engine.name_of(self.guild_id, user_id)
+            value = await self.engine.describe(self.category, user_id, score)
+            rows.append((rank, name, value, profile.avatar_hash))
+            user_ids.append(user_id)
+        key = (self.guild_id, self.category, self.page)
+        # Emoji are not in the card font, so the title drops its icon
+        return await self.cards.card(key, title.split(" ", 1)[-1], rows, user_ids)
+    
+    async def show(self, interaction: discord.Interaction, page: int):
+        self.page = max(1, page)
+        if self.cards is None:
+            embed = await self.render()
+            await interaction.response.edit_message(embed=embed, view=self)
+            return
+        # Rendering a card can wait on avatar downloads; answer within Discord's 3 seconds first
+        await interaction.response.defer()
+        embed = await self.render()
+        attachments = [self.attachment] if self.attachment is not None else []
+        await interaction.edit_original_response(embed=embed, attachments=attachments, view=self)
+    
+    @discord.ui.button(label='Previous', style=discord.ButtonStyle.secondary, emoji='◀️')
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1)
+    
+    @discord.ui.button(label='Next', style=discord.ButtonStyle.secondary, emoji='▶️')
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
+    
+    @discord.ui.button(label='Me', style=discord.ButtonStyle.primary, emoji='📍')
+    async def jump_to_me(self, interaction: discord.Interaction, button: discord.ui.Button):
+        user_rank = await self.engine.rank(self.guild_id, self.category, str(self.user_id))
+        await self.show(interaction, self.engine.page_of(user_rank) if user_rank else self.page)
+
 
 class LeaderboardCommands(commands.Cog):
     """Leaderboard and statistics command cog."""
     
     def __init__(self, bot):
         self.bot = bot
-        self.user_data = {}
-        self.load_user_data()
+        self.store = bot.profile_store
+        self.leaderboards = bot.leaderboards
         
-    def load_user_data(self):
-        """Load user data from file if it exists."""
-        try:
-            if os.path.exists('user_data.json'):
-                with open('user_data.json', 'r') as f:
-                    self.user_data = json.load(f)
-        except Exception:
-            self.user_data = {}
-    
-    def save_user_data(self):
-        """Save user data to file."""
-        try:
-            with open('user_data.json', 'w') as f:
-                json.dump(self.user_data, f, indent=2)
-        except Exception:
-            pass
-    
-    def get_user_profile(self, user_id: str):
+    async def get_user_profile(self, user_id: str):
         """Get or create user profile."""
-        if user_id not in self.user_data:
-            self.user_data[user_id] = {
-                'cash': 1000,
-                'level': 0,
-                'xp': 0,
-                'wins': 0,
-                'losses': 0,
-                'total_bet': 0,
-                'total_won': 0,
-                'last_daily': None,
-                'last_work': None,
-                'achievements': {},
-                'items': {},
-                'boosts': {}
-            }
-        return self.user_data[user_id]
+        return await self.store.get_user_profile(user_id)
+
+    async def send_leaderboard(self, interaction: discord.Interaction, scope: str, category: str,
+                               period: Optional[str] = None, card: bool = False):
+        """Reply with page 1 of a leaderboard and buttons to browse the rest."""
+        guild_id = interaction.guild.id if scope == "server" and interaction.guild else None
+        # Without Pillow the bot has no card renderer and answers with text
+        view = LeaderboardView(self.leaderboards, guild_id, category, interaction.user.id,
+                               'Server' if guild_id else 'Global', period=period,
+                               cards=self.bot.cards if card else None)
+        if card:
+            # Avatars may need downloading; don't let the interaction time out
+            await interaction.response.defer()
+        embed = await view.render()
+        kwargs = {'file': view.attachment} if view.attachment else {}
+        if card:
+            await interaction.followup.send(embed=embed, view=view if view.total else discord.utils.MISSING, **kwargs)
+        else:
+            await interaction.response.send_message(embed=embed, view=view if view.total else None)
 
     # Leaderboard command group
     leaderboard_group = app_commands.Group(name="leaderboard", description="View leaderboards and rankings")
     
     @leaderboard_group.command(name="cash", description="View the richest players")
-    @app_commands.describe(scope="Show server or global leaderboard")
+    @app_commands.describe(scope="Show server or global leaderboard", period="Show rank changes over this period",
+                           card="Reply with an image card instead of text")
     @app_commands.choices(scope=[
         app_commands.Choice(name="Server Only", value="server"),
         app_commands.Choice(name="Global", value="global")
-    ])
-    async def leaderboard_cash(self, interaction: discord.Interaction, scope: str = "server"):
+    ], period=PERIOD_CHOICES)
+    async def leaderboard_cash(self, interaction: discord.Interaction, scope: str = "server",
+                               period: Optional[str] = None, card: bool = False):
         """Show cash leaderboard."""
-        self.load_user_data()
-        
-        # Get all users with their cash amounts
-        user_cash = []
-        for user_id, profile in self.user_data.items():
-            try:
-                user = self.bot.get_user(int(user_id))
-                if user:
-                    # If server scope, only include users from this server
-                    if scope == "server" and interaction.guild:
-                        member = interaction.guild.get_member(int(user_id))
-                        if not member:
-                            continue
-                    
-                    user_cash.append((user, profile['cash']))
-            except (ValueError, KeyError):
-                continue
-        
-        # Sort by cash (descending)
-        user_cash.sort(key=lambda x: x[1], reverse=True)
-        
-        # Take top 10
-        top_users = user_cash[:10]
-        
-        if not top_users:
-            embed = discord.Embed(
-                title="💰 Cash Leaderboard",
-                description="No players found with gambling data.",
-                color=discord.Color.orange()
-            )
-            await interaction.response.send_message(embed=embed)
-            return
-        
-        embed = discord.Embed(
-            title=f"💰 Cash Leaderboard ({'Server' if scope == 'server' else 'Global'})",
-            color=discord.Color.gold()
-        )
-        
-        description_lines = []
-        for i, (user, cash) in enumerate(top_users):
-            medal = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else f"{i+1}."
-            description_lines.append(f"{medal} **{user.display_name}** - ${cash:,}")
-        
-        embed.description = "\n".join(description_lines)
-        
-        # Add user's ranking if not in top 10
-        user_rank = None
-        for i, (user, cash) in enumerate(user_cash):
-            if user.id == interaction.user.id:
-                user_rank = i + 1
-                break
-        
-        if user_rank and user_rank > 10:
-            embed.add_field(
-                name="Your Ranking",
-                value=f"#{user_rank} - ${self.get_user_profile(str(interaction.user.id))['cash']:,}",
-                inline=False
-            )
-        
-        await interaction.response.send_message(embed=embed)
+        await self.send_leaderboard(interaction, scope, 'cash', period, card)
     
     @leaderboard_group.command(name="level", description="View highest level players")
-    @app_commands.describe(scope="Show server or global leaderboard")
+    @app_commands.describe(scope="Show server or global leaderboard", period="Show rank changes over this period",
+                           card="Reply with an image card instead of text")
     @app_commands.choices(scope=[
         app_commands.Choice(name="Server Only", value="server"),
         app_commands.Choice(name="Global", value="global")
-    ])
-    async def leaderboard_level(self, interaction: discord.Interaction, scope: str = "server"):
+    ], period=PERIOD_CHOICES)
+    async def leaderboard_level(self, interaction: discord.Interaction, scope: str = "server",
+                                period: Optional[str] = None, card: bool = False):
         """Show level leaderboard."""
-        self.load_user_data()
-        
-        # Get all users with their levels
-        user_levels = []
-        for user_id, profile in self.user_data.items():
-            try:
-                user = self.bot.get_user(int(user_id))
-                if user:
-                    # If server scope, only include users from this server
-                    if scope == "server" and interaction.guild:
-                        member = interaction.guild.get_member(int(user_id))
-                        if not member:
-                            continue
-                    
-                    user_levels.append((user, profile['level'], profile['xp']))
-            except (ValueError, KeyError):
-                continue
-        
-        # Sort by level first, then XP (descending)
-        user_levels.sort(key=lambda x: (x[1], x[2]), reverse=True)
-        
-        # Take top 10
-        top_users = user_levels[:10]
-        
-        if not top_users:
-            embed = discord.Embed(
-                title="⭐ Level Leaderboard",
-                description="No players found with gambling data.",
-                color=discord.Color.orange()
-            )
-            await interaction.response.send_message(embed=embed)
-            return
-        
-        embed = discord.Embed(
-            title=f"⭐ Level Leaderboard ({'Server' if scope == 'server' else 'Global'})",
-            color=discord.Color.purple()
-        )
-        
-        description_lines = []
-        for i, (user, level, xp) in enumerate(top_users):
-            medal = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else f"{i+1}."
-            description_lines.append(f"{medal} **{user.display_name}** - Level {level} ({xp:,} XP)")
-        
-        embed.description = "\n".join(description_lines)
-        
-        # Add user's ranking if not in top 10
-        user_rank = None
-        for i, (user, level, xp) in enumerate(user_levels):
-            if user.id == interaction.user.id:
-                user_rank = i + 1
-                break
-        
-        if user_rank and user_rank > 10:
-            profile = self.get_user_profile(str(interaction.user.id))
-            embed.add_field(
-                name="Your Ranking",
-                value=f"#{user_rank} - Level {profile['level']} ({profile['xp']:,} XP)",
-                inline=False
-            )
-        
-        await interaction.response.send_message(embed=embed)
+        await self.send_leaderboard(interaction, scope, 'level', period, card)
     
     @leaderboard_group.command(name="wins", description="View players with most wins")
-    @app_commands.describe(scope="Show server or global leaderboard")
+    @app_commands.describe(scope="Show server or global leaderboard", period="Show rank changes over this period",
+                           card="Reply with an image card instead of text")
     @app_commands.choices(scope=[
         app_commands.Choice(name="Server Only", value="server"),
         app_commands.Choice(name="Global", value="global")
-    ])
-    async def leaderboard_wins(self, interaction: discord.Interaction, scope: str = "server"):
+    ], period=PERIOD_CHOICES)
+    async def leaderboard_wins(self, interaction: discord.Interaction, scope: str = "server",
+                               period: Optional[str] = None, card: bool = False):
         """Show wins leaderboard."""
-        self.load_user_data()
-        
-        # Get all users with their win counts
-        user_wins = []
-        for user_id, profile in self.user_data.items():
-            try:
-                user = self.bot.get_user(int(user_id))
-                if user:
-                    # If server scope, only include users from this server
-                    if scope == "server" and interaction.guild:
-                        member = interaction.guild.get_member(int(user_id))
-                        if not member:
-                            continue
-                    
-                    total_games = profile['wins'] + profile['losses']
-                    win_rate = (profile['wins'] / total_games * 100) if total_games > 0 else 0
-                    user_wins.append((user, profile['wins'], win_rate))
-            except (ValueError, KeyError):
-                continue
-        
-        # Sort by wins (descending)
-        user_wins.sort(key=lambda x: x[1], reverse=True)
-        
-        # Take top 10
-        top_users = user_wins[:10]
-        
-        if not top_users:
-            embed = discord.Embed(
-                title="🏆 Wins Leaderboard",
-                description="No players found with gambling data.",
-                color=discord.Color.orange()
-            )
-            await interaction.response.send_message(embed=embed)
-            return
-        
-        embed = discord.Embed(
-            title=f"🏆 Wins Leaderboard ({'Server' if scope == 'server' else 'Global'})",
-            color=discord.Color.green()
-        )
-        
-        description_lines = []
-        for i, (user, wins, win_rate) in enumerate(top_users):
-            medal = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else f"{i+1}."
-            description_lines.append(f"{medal} **{user.display_name}** - {wins:,} wins ({win_rate:.1f}%)")
-        
-        embed.description = "\n".join(description_lines)
-        
-        # Add user's ranking if not in top 10
-        user_rank = None
-        for i, (user, wins, win_rate) in enumerate(user_wins):
-            if user.id == interaction.user.id:
-                user_rank = i + 1
-                break
-        
-        if user_rank and user_rank > 10:
-            profile = self.get_user_profile(str(interaction.user.id))
-            total_games = profile['wins'] + profile['losses']
-            user_win_rate = (profile['wins'] / total_games * 100) if total_games > 0 else 0
-            embed.add_field(
-                name="Your Ranking",
-                value=f"#{user_rank} - {profile['wins']:,} wins ({user_win_rate:.1f}%)",
-                inline=False
-            )
-        
-        await interaction.response.send_message(embed=embed)
+        await self.send_leaderboard(interaction, scope, 'wins', period, card)
+    
+    @leaderboard_group.command(name="winrate", description="View players with the best win rate")
+    @app_commands.describe(scope="Show server or global leaderboard", period="Show rank changes over this period",
+                           card="Reply with an image card instead of text")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Server Only", value="server"),
+        app_commands.Choice(name="Global", value="global")
+    ], period=PERIOD_CHOICES)
+    async def leaderboard_win_rate(self, interaction: discord.Interaction, scope: str = "server",
+                                   period: Optional[str] = None, card: bool = False):
+        """Show win rate leaderboard."""
+        await self.send_leaderboard(interaction, scope, 'win_rate', period, card)
+    
+    @leaderboard_group.command(name="profit", description="View players with the highest net profit")
+    @app_commands.describe(scope="Show server or global leaderboard", period="Show rank changes over this period",
+                           card="Reply with an image card instead of text")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Server Only", value="server"),
+        app_commands.Choice(name="Global", value="global")
+    ], period=PERIOD_CHOICES)
+    async def leaderboard_profit(self, interaction: discord.Interaction, scope: str = "server",
+                                 period: Optional[str] = None, card: bool = False):
+        """Show net profit leaderboard."""
+        await self.send_leaderboard(interaction, scope, 'profit', period, card)
+    
+    @leaderboard_group.command(name="biggestwin", description="View the biggest single-bet wins")
+    @app_commands.describe(scope="Show server or global leaderboard", period="Show rank changes over this period",
+                           card="Reply with an image card instead of text")
+    @app_commands.choices(scope=[
+        app_commands.Choice(name="Server Only", value="server"),
+        app_commands.Choice(name="Global", value="global")
+    ], period=PERIOD_CHOICES)
+    async def leaderboard_biggest_win(self, interaction: discord.Interaction, scope: str = "server",
+                                      period: Optional[str] = None, card: bool = False):
+        """Show biggest win leaderboard."""
+        await self.send_leaderboard(interaction, scope, 'biggest_win', period, card)
 
     # Statistics command
     @app_commands.command(name="stats", description="View detailed gambling statistics")
@@ -277,7 +300,7 @@ class LeaderboardCommands(commands.Cog):
     async def stats(self, interaction: discord.Interaction, user: Optional[discord.Member] = None):
         """View detailed statistics."""
         target_user = user or interaction.user
-        profile = self.get_user_profile(str(target_user.id))
+        profile = await self.get_user_profile(str(target_user.id))
         
         embed = discord.Embed(
             title=f"📊 {target_user.display_name}'s Statistics",
@@ -304,26 +327,10 @@ class LeaderboardCommands(commands.Cog):
         # Net profit with color coding
         profit_color = "🟢" if net_profit >= 0 else "🔴"
         embed.add_field(name=f"{profit_color} Net Profit", value=f"${net_profit:,}", inline=True)
+        embed.add_field(name="🏅 Biggest Win", value=f"${profile['biggest_win']:,}", inline=True)
         
-        # Calculate rankings
-        self.load_user_data()
-        
-        # Cash ranking
-        cash_rankings = sorted(
-            [(uid, data['cash']) for uid, data in self.user_data.items()],
-            key=lambda x: x[1], reverse=True
-        )
-        cash_rank = next((i+1 for i, (uid, _) in enumerate(cash_rankings) if uid == str(target_user.id)), "N/A")
-        
-        # Level ranking
-        level_rankings = sorted(
-            [(uid, data['level'], data['xp']) for uid, data in self.user_data.items()],
-            key=lambda x: (x[1], x[2]), reverse=True
-        )
-        level_rank = next((i+1 for i, (uid, _, _) in enumerate(level_rankings) if uid == str(target_user.id)), "N/A")
-        
-        embed.add_field(name="🏆 Cash Rank", value=f"#{cash_rank}", inline=True)
-        embed.add_field(name="⭐ Level Rank", value=f"#{level_rank}", inline=True)
+        for name, value in await rank_fields(self.leaderboards, str(target_user.id)):
+            embed.add_field(name=name, value=value, inline=True)
         
         embed.set_thumbnail(url=target_user.display_avatar.url)
         embed.set_footer(text=f"Statistics for {target_user.display_name}")
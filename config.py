@@ -34,6 +34,35 @@ class BotConfig:
     COMMAND_COOLDOWN: int = int(os.getenv("COMMAND_COOLDOWN", "3"))  # seconds
     MAX_COMMAND_LENGTH: int = int(os.getenv("MAX_COMMAND_LENGTH", "2000"))
     
+    # Storage settings
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "json").lower()  # json, binary or sqlite
+    SQLITE_FILE: str = os.getenv("SQLITE_FILE", "user_data.db")
+    USER_DATA_FILE: str = os.getenv("USER_DATA_FILE", "user_data.json")
+    SNAPSHOT_FILE: str = os.getenv("SNAPSHOT_FILE", "user_data.snap")
+    FLUSH_INTERVAL: float = float(os.getenv("FLUSH_INTERVAL", "5"))  # seconds
+    FLUSH_THRESHOLD: int = int(os.getenv("FLUSH_THRESHOLD", "100"))  # dirty users
+    JOURNAL_FILE: str = os.getenv("JOURNAL_FILE", "user_data.journal")
+    COMPACT_INTERVAL: float = float(os.getenv("COMPACT_INTERVAL", "600"))  # seconds
+    COMPACT_RECORDS: int = int(os.getenv("COMPACT_RECORDS", "100000"))  # journal records
+    PROFILE_CACHE_SIZE: int = int(os.getenv("PROFILE_CACHE_SIZE", "50000"))  # resident profiles
+    PROFILE_CACHE_MB: float = float(os.getenv("PROFILE_CACHE_MB", "0"))  # 0 = no memory cap
+    LEADERBOARD_CACHE_TTL: float = float(os.getenv("LEADERBOARD_CACHE_TTL", "30"))  # seconds
+    LEADERBOARD_MIN_GAMES: int = int(os.getenv("LEADERBOARD_MIN_GAMES", "10"))  # bets before win-rate/profit ranking
+    LEADERBOARD_HISTORY_FILE: str = os.getenv("LEADERBOARD_HISTORY_FILE", "leaderboard_history.json")
+    LEADERBOARD_HISTORY_INTERVAL: float = float(os.getenv("LEADERBOARD_HISTORY_INTERVAL", "3600"))  # seconds
+    LEADERBOARD_HISTORY_DAYS: float = float(os.getenv("LEADERBOARD_HISTORY_DAYS", "31"))  # retention
+    LEADERBOARD_HISTORY_DEPTH: int = int(os.getenv("LEADERBOARD_HISTORY_DEPTH", "100"))  # ranks captured per board
+    LEADERBOARD_CARDS: bool = os.getenv("LEADERBOARD_CARDS", "true").lower() == "true"  # needs Pillow: pip install .[cards]
+    CARD_WORKERS: int = int(os.getenv("CARD_WORKERS", "2"))
+    AVATAR_CACHE_DIR: str = os.getenv("AVATAR_CACHE_DIR", "avatar_cache")
+    AVATAR_CACHE_MB: float = float(os.getenv("AVATAR_CACHE_MB", "256"))  # on disk
+    AVATAR_MEMORY_MB: float = float(os.getenv("AVATAR_MEMORY_MB", "16"))
+    ECONOMY_STATS_FILE: str = os.getenv("ECONOMY_STATS_FILE", "economy_stats.json")
+    GUILD_INDEX_FILE: str = os.getenv("GUILD_INDEX_FILE", "guild_index.json")
+    GUILD_INDEX_SAVE_INTERVAL: float = float(os.getenv("GUILD_INDEX_SAVE_INTERVAL", "60"))  # seconds
+    MEMBERS_INTENT: bool = os.getenv("MEMBERS_INTENT", "false").lower() == "true"  # privileged; enables join/leave tracking
+    CHUNK_GUILDS: bool = os.getenv("CHUNK_GUILDS", "false").lower() == "true"  # download full member lists at startup
+    
     @classmethod
     def get_required_env_vars(cls) -> List[str]:
         """Get list of required environment variables."""
@@ -0,0 +1,6 @@
+"""
+Engine package for the Discord bot.
+Contains the pure game rules; cogs feed them a random source and render the outcomes.
+"""
+
+# This file makes the engine directory a Python package
@@ -0,0 +1,39 @@
+"""
+Bet Parsing
+Turns what a player typed as a bet (``500``, ``2.5k``, ``max``, ``allin``) into an amount.
+"""
+
+from typing import Optional
+
+# Suffixes accepted after a number
+MULTIPLIERS = {
+    'k': 1000,
+    'm': 1000000,
+    'g': 1000000000,
+    't': 1000000000000
+}
+
+
+def parse_bet(bet_str: str, user_cash: int, max_bet: Optional[int] = None) -> int:
+    """Parse bet string and return amount; 0 means it could not be read."""
+    if not bet_str:
+        return 0
+
+    bet_str = str(bet_str).lower().strip()
+
+    if bet_str in ['max', 'm']:
+        return max_bet or user_cash
+    elif bet_str in ['allin', 'a', 'all']:
+        return user_cash
+
+    for suffix, multiplier in MULTIPLIERS.items():
+        if bet_str.endswith(suffix):
+            try:
+                return int(float(bet_str[:-1]) * multiplier)
+            except ValueError:
+                return 0
+
+    try:
+        return int(float(bet_str))
+    except ValueError:
+        return 0
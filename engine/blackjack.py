@@ -0,0 +1,205 @@
+"""
+Blackjack Rules
+Six-deck blackjack where the dealer stands on 17, dealt from a persistent shoe with a cut card.
+"""
+
+import random
+from typing import Optional
+
+from engine.outcome import Outcome
+
+SUITS = ['♠', '♥', '♦', '♣']
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+DECKS = 6
+DEALER_STANDS_ON = 17
+
+# Share of the shoe dealt before the cut card comes out and it is reshuffled
+PENETRATION = 0.75
+
+# Winnings per unit bet on a won hand; a push returns the stake
+BLACKJACK_PAYOUTS = {'easy': 1.5, 'hard': 2.0}
+
+# Outcome results that pay the mode's multiplier
+WINNING_RESULTS = ('blackjack', 'dealer_bust', 'win')
+
+# A card is one byte, rank * 4 + suit, so a shoe is a bytearray and a value is one index
+CARD_NAMES = tuple(f"{rank}{suit}" for rank in RANKS for suit in SUITS)
+CARD_VALUES = bytes(11 if rank == 'A' else 10 if rank in ('J', 'Q', 'K') else int(rank)
+                    for rank in RANKS for suit in SUITS)
+ACE = 11
+
+
+def card_name(card: int) -> str:
+    return CARD_NAMES[card]
+
+
+class Shoe:
+    """``decks`` decks dealt in order until the cut card, then reshuffled.
+
+    Shoes are meant to live across hands (the cog keeps one per channel);
+    :func:`deal` reshuffles once the previous hand drew the cut card.
+    """
+
+    __slots__ = ('rng', 'cards', 'position', 'cut')
+
+    def __init__(self, rng: random.Random, decks: int = DECKS, penetration: float = PENETRATION):
+        self.rng = rng
+        self.cards = bytearray(range(len(CARD_NAMES))) * decks
+        self.cut = int(len(self.cards) * penetration)
+        self.shuffle()
+
+    def __len__(self) -> int:
+        """Cards left to deal."""
+        return len(self.cards) - self.position
+
+    @property
+    def needs_shuffle(self) -> bool:
+        """The cut card has come out."""
+        return self.position >= self.cut
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+        self.position = 0
+
+    def draw(self) -> int:
+        if self.position == len(self.cards):
+            # Only reachable when many hands share a shoe past the cut card
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
+
+
+class Hand:
+    """Cards held by the player or dealer, with the total kept up to date as cards arrive."""
+
+    __slots__ = ('cards', 'total', 'soft')
+
+    def __init__(self):
+        self.cards = bytearray()
+        self.total = 0
+        # Aces still counted as 11
+        self.soft = 0
+
+    def add(self, card: int) -> int:
+        """Add a card and return the new total, dropping aces to 1 only while it would bust."""
+        self.cards.append(card)
+        value = CARD_VALUES[card]
+        self.total += value
+        if value == ACE:
+            self.soft += 1
+        while self.total > 21 and self.soft:
+            self.total -= 10
+            self.soft -= 1
+        return self.total
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def __getitem__(self, index: int) -> str:
+        return CARD_NAMES[self.cards[index]]
+
+    def __str__(self) -> str:
+        return ' '.join(CARD_NAMES[card] for card in self.cards)
+
+
+class BlackjackOutcome(Outcome):
+    """How a hand ended: ``dealer_blackjack``, ``blackjack``, ``bust``, ``dealer_bust``, ``win``, ``push`` or ``lose``."""
+
+    __slots__ = ('result', 'player_value', 'dealer_value')
+
+    def __init__(self, bet: int, payout: int, result: str, player_value: int, dealer_value: int):
+        super().__init__(bet, payout)
+        self.result = result
+        self.player_value = player_value
+        self.dealer_value = dealer_value
+
+    @property
+    def won(self) -> bool:
+        return self.result in WINNING_RESULTS
+
+    @property
+    def winnings(self) -> int:
+        """Net winnings on a won hand."""
+        return self.payout - self.bet if self.won else 0
+
+
+class BlackjackHand:
+    """One hand from the deal until :attr:`outcome` is set.
+
+    Naturals are settled on the deal; a dealer blackjack beats everything,
+    including a player blackjack. Otherwise the player calls :meth:`hit`
+    until they bust or :meth:`stand`, and the dealer then draws to 17.
+    """
+
+    __slots__ = ('bet', 'mode', 'shoe', 'player', 'dealer', 'outcome')
+
+    def __init__(self, shoe: Shoe, bet: int, mode: str = 'easy'):
+        self.bet = bet
+        self.mode = mode
+        self.shoe = shoe
+        self.player = Hand()
+        self.dealer = Hand()
+        self.player.add(shoe.draw())
+        self.player.add(shoe.draw())
+        self.dealer.add(shoe.draw())
+        self.dealer.add(shoe.draw())
+        self.outcome: Optional[BlackjackOutcome] = None
+        if self.dealer.total == 21:
+            self._finish('dealer_blackjack')
+        elif self.player.total == 21:
+            self._finish('blackjack')
+
+    @property
+    def player_value(self) -> int:
+        return self.player.total
+
+    @property
+    def dealer_value(self) -> int:
+        return self.dealer.total
+
+    def hit(self) -> int:
+        """Draw a card for the player and return their new total; a bust ends the hand."""
+        if self.outcome is not None:
+            raise RuntimeError("The hand is already finished")
+        value = self.player.add(self.shoe.draw())
+        if value > 21:
+            self._finish('bust')
+        return value
+
+    def stand(self) -> BlackjackOutcome:
+        """Play out the dealer's hand and settle."""
+        if self.outcome is not None:
+            return self.outcome
+        dealer = self.dealer
+        while dealer.total < DEALER_STANDS_ON:
+            dealer.add(self.shoe.draw())
+        player_value, dealer_value = self.player.total, dealer.total
+        if dealer_value > 21:
+            return self._finish('dealer_bust')
+        if player_value > dealer_value:
+            return self._finish('win')
+        if player_value == dealer_value:
+            return self._finish('push')
+        return self._finish('lose')
+
+    def _finish(self, result: str) -> BlackjackOutcome:
+        payout = result_payout(self.bet, self.mode, result)
+        self.outcome = BlackjackOutcome(self.bet, payout, result, self.player.total, self.dealer.total)
+        return self.outcome
+
+
+def result_payout(bet: int, mode: str, result: str) -> int:
+    """Amount paid back (stake included) on a hand that ended with ``result``."""
+    if result in WINNING_RESULTS:
+        return int(bet * BLACKJACK_PAYOUTS[mode]) + bet
+    if result == 'push':
+        return bet
+    return 0
+
+
+def deal(shoe: Shoe, bet: int, mode: str = 'easy') -> BlackjackHand:
+    """Deal a hand from ``shoe``, reshuffling first if the last hand drew the cut card."""
+    if shoe.needs_shuffle:
+        shoe.shuffle()
+    return BlackjackHand(shoe, bet, mode)
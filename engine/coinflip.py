@@ -0,0 +1,29 @@
+"""
+Coinflip Rules
+Even-money bet on heads or tails.
+"""
+
+import random
+
+from engine.outcome import Outcome
+
+SIDES = ('heads', 'tails')
+
+# Accepted spellings of each side
+PREDICTIONS = {'heads': 'heads', 'h': 'heads', 'tails': 'tails', 't': 'tails'}
+
+
+class CoinflipOutcome(Outcome):
+    __slots__ = ('prediction', 'result')
+
+    def __init__(self, bet: int, payout: int, prediction: str, result: str):
+        super().__init__(bet, payout)
+        self.prediction = prediction
+        self.result = result
+
+
+def flip(rng: random.Random, bet: int, prediction: str) -> CoinflipOutcome:
+    """Flip once; a correct call pays 1:1."""
+    prediction = PREDICTIONS[prediction.lower()]
+    result = rng.choice(SIDES)
+    return CoinflipOutcome(bet, bet + bet if prediction == result else 0, prediction, result)
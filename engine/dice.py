@@ -0,0 +1,27 @@
+"""
+Dice Rules
+Bet on the face a single die lands on.
+"""
+
+import random
+
+from engine.outcome import Outcome
+
+DICE_SIDES = (4, 6, 8, 10, 12, 20)
+
+
+class DiceOutcome(Outcome):
+    __slots__ = ('sides', 'prediction', 'result')
+
+    def __init__(self, bet: int, payout: int, sides: int, prediction: int, result: int):
+        super().__init__(bet, payout)
+        self.sides = sides
+        self.prediction = prediction
+        self.result = result
+
+
+def roll(rng: random.Random, bet: int, sides: int, prediction: int) -> DiceOutcome:
+    """Roll a ``sides``-sided die; the right face pays ``sides``:1."""
+    result = rng.randint(1, sides)
+    payout = bet * sides + bet if prediction == result else 0
+    return DiceOutcome(bet, payout, sides, prediction, result)
@@ -0,0 +1,28 @@
+"""
+Round Outcomes
+Base result object every game returns, carrying the stake and what goes back to the player.
+"""
+
+
+class Outcome:
+    """What one finished round pays.
+
+    ``payout`` is the gross amount returned to the player including the
+    stake, the value handed to ``Transaction.settle``; 0 is a loss. Game
+    outcomes add whatever their cog needs to render the round.
+    """
+
+    __slots__ = ('bet', 'payout')
+
+    def __init__(self, bet: int, payout: int):
+        self.bet = bet
+        self.payout = payout
+
+    @property
+    def won(self) -> bool:
+        return self.payout > 0
+
+    @property
+    def profit(self) -> int:
+        """Net change to the player's cash."""
+        return self.payout - self.bet
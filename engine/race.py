@@ -0,0 +1,37 @@
+"""
+Race Rules
+Bet on which racer wins; every racer is equally likely.
+"""
+
+import random
+
+from engine.outcome import Outcome
+
+RACE_CONFIG = {
+    'turtle': {'emoji': '🐢', 'count': 3, 'odds': 3},
+    'dog': {'emoji': '🐕', 'count': 5, 'odds': 5},
+    'horse': {'emoji': '🏇', 'count': 8, 'odds': 8},
+    'dinosaur': {'emoji': '🦖', 'count': 12, 'odds': 12}
+}
+
+
+class RaceOutcome(Outcome):
+    __slots__ = ('racer_type', 'prediction', 'winner')
+
+    def __init__(self, bet: int, payout: int, racer_type: str, prediction: int, winner: int):
+        super().__init__(bet, payout)
+        self.racer_type = racer_type
+        self.prediction = prediction
+        self.winner = winner
+
+    @property
+    def odds(self) -> int:
+        return RACE_CONFIG[self.racer_type]['odds']
+
+
+def race(rng: random.Random, bet: int, racer_type: str, prediction: int) -> RaceOutcome:
+    """Run one race; backing the winner pays the race's odds."""
+    config = RACE_CONFIG[racer_type]
+    winner = rng.randint(1, config['count'])
+    payout = bet * config['odds'] + bet if prediction == winner else 0
+    return RaceOutcome(bet, payout, racer_type, prediction, winner)
@@ -0,0 +1,70 @@
+"""
+Roulette Rules
+American wheel with 0 and 00, paying straight, colour, half and dozen bets.
+"""
+
+import random
+from typing import List, Union
+
+from engine.outcome import Outcome
+
+# Roulette wheel (American style with 0 and 00)
+ROULETTE_NUMBERS: List[Union[int, str]] = [*range(0, 37), '00']
+RED_NUMBERS = [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36]
+BLACK_NUMBERS = [2, 4, 6, 8, 10, 11, 13, 15, 17, 20, 22, 24, 26, 28, 29, 31, 33, 35]
+
+
+def roulette_color(result) -> str:
+    if result == 0 or result == '00':
+        return 'green'
+    elif result in RED_NUMBERS:
+        return 'red'
+    return 'black'
+
+
+def roulette_payout_ratio(prediction: str, result) -> int:
+    """Winnings per unit bet for ``prediction`` when the ball lands on ``result``; 0 is a loss."""
+    color = roulette_color(result)
+    if prediction == str(result):
+        return 35  # Single number bet
+    elif prediction == 'red' and color == 'red':
+        return 1
+    elif prediction == 'black' and color == 'black':
+        return 1
+    elif prediction == 'green' and color == 'green':
+        return 17
+    elif prediction in ['1sthalf', '1st'] and isinstance(result, int) and 1 <= result <= 18:
+        return 1
+    elif prediction in ['2ndhalf', '2nd'] and isinstance(result, int) and 19 <= result <= 36:
+        return 1
+    elif prediction in ['1st12'] and isinstance(result, int) and 1 <= result <= 12:
+        return 2
+    elif prediction in ['2nd12'] and isinstance(result, int) and 13 <= result <= 24:
+        return 2
+    elif prediction in ['3rd12'] and isinstance(result, int) and 25 <= result <= 36:
+        return 2
+    return 0
+
+
+class RouletteOutcome(Outcome):
+    __slots__ = ('prediction', 'result', 'color', 'ratio')
+
+    def __init__(self, bet: int, payout: int, prediction: str, result, color: str, ratio: int):
+        super().__init__(bet, payout)
+        self.prediction = prediction
+        self.result = result
+        self.color = color
+        self.ratio = ratio
+
+    @property
+    def winnings(self) -> int:
+        return self.bet * self.ratio
+
+
+def spin(rng: random.Random, bet: int, prediction: str) -> RouletteOutcome:
+    """Spin the wheel once for a bet on ``prediction``."""
+    prediction = prediction.lower().strip()
+    result = rng.choice(ROULETTE_NUMBERS)
+    ratio = roulette_payout_ratio(prediction, result)
+    payout = bet * ratio + bet if ratio else 0
+    return RouletteOutcome(bet, payout, prediction, result, roulette_color(result), ratio)
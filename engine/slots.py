@@ -0,0 +1,102 @@
+"""
+Slot Machine Rules
+Paytables, shared reels and payouts for /slots and the animated /vslots machine.
+"""
+
+import random
+from typing import List, Tuple
+
+from engine.outcome import Outcome
+from utils.sampling import AliasSampler
+
+# Slot symbols and their payouts
+SLOT_SYMBOLS = {
+    '💎': {'weight': 1, 'payout_3': 500, 'payout_2': 25},
+    '🍒': {'weight': 2, 'payout_3': 25, 'payout_2': 10},
+    '🍊': {'weight': 3, 'payout_3': 5, 'payout_2': 3},
+    '🍇': {'weight': 4, 'payout_3': 3, 'payout_2': 2},
+    '🔔': {'weight': 5, 'payout_3': 2, 'payout_2': 1},
+    '⭐': {'weight': 6, 'payout_3': 1, 'payout_2': 1}
+}
+
+# Visual slot machine symbols and their values
+VISUAL_SLOT_SYMBOLS = {
+    '💎': {'value': 500, 'rarity': 1},
+    '🍒': {'value': 100, 'rarity': 3},
+    '🍊': {'value': 50, 'rarity': 5},
+    '🍇': {'value': 25, 'rarity': 8},
+    '🔔': {'value': 15, 'rarity': 12},
+    '⭐': {'value': 10, 'rarity': 15},
+    '🍋': {'value': 5, 'rarity': 20},
+    '7️⃣': {'value': 1000, 'rarity': 1}  # Jackpot symbol
+}
+
+# One reel per machine, shared by every spin
+SLOT_REEL = AliasSampler({symbol: data['weight'] for symbol, data in SLOT_SYMBOLS.items()})
+# Higher rarity = lower weight
+VISUAL_SLOT_REEL = AliasSampler({symbol: 20 - data['rarity'] for symbol, data in VISUAL_SLOT_SYMBOLS.items()})
+
+
+def slots_payout(results: List[str], bet_amount: int) -> Tuple[int, str]:
+    """Amount paid back (stake included) and a description for three /slots reels."""
+    # Check for 3 of a kind first
+    if results[0] == results[1] == results[2]:
+        symbol = results[0]
+        payout_ratio = SLOT_SYMBOLS[symbol]['payout_3']
+        return bet_amount * payout_ratio, f"3x {symbol} - {payout_ratio}:1 payout!"
+    # Check for 2 of a kind
+    if results[0] == results[1] or results[1] == results[2] or results[0] == results[2]:
+        # Find the matching symbol
+        if results[0] == results[1]:
+            symbol = results[0]
+        elif results[1] == results[2]:
+            symbol = results[1]
+        else:
+            symbol = results[0]
+        payout_ratio = SLOT_SYMBOLS[symbol]['payout_2']
+        return bet_amount * payout_ratio, f"2x {symbol} - {payout_ratio}:1 payout!"
+    return 0, ""
+
+
+def visual_slots_payout(symbols: List[str], bet_amount: int) -> Tuple[int, str]:
+    """Amount paid back (stake included) and a description for three /vslots reels."""
+    # Check for three of a kind
+    if symbols[0] == symbols[1] == symbols[2]:
+        symbol = symbols[0]
+        base_value = VISUAL_SLOT_SYMBOLS[symbol]['value']
+        return bet_amount * (base_value // 10), f"🎉 JACKPOT! 3x {symbol}"
+
+    # Check for two of a kind
+    symbol_counts = {}
+    for symbol in symbols:
+        symbol_counts[symbol] = symbol_counts.get(symbol, 0) + 1
+
+    for symbol, count in symbol_counts.items():
+        if count == 2:
+            base_value = VISUAL_SLOT_SYMBOLS[symbol]['value']
+            return bet_amount * (base_value // 20), f"🎊 Two {symbol}s!"
+
+    return 0, "No match"
+
+
+class SlotsOutcome(Outcome):
+    __slots__ = ('symbols', 'description')
+
+    def __init__(self, bet: int, payout: int, symbols: List[str], description: str):
+        super().__init__(bet, payout)
+        self.symbols = symbols
+        self.description = description
+
+
+def spin(rng: random.Random, bet: int) -> SlotsOutcome:
+    """Spin /slots once."""
+    symbols = SLOT_REEL.sample_many(3, rng)
+    payout, description = slots_payout(symbols, bet)
+    return SlotsOutcome(bet, payout, symbols, description)
+
+
+def spin_visual(rng: random.Random, bet: int) -> SlotsOutcome:
+    """Spin /vslots once."""
+    symbols = VISUAL_SLOT_REEL.sample_many(3, rng)
+    payout, description = visual_slots_payout(symbols, bet)
+    return SlotsOutcome(bet, payout, symbols, description)
@@ -0,0 +1,198 @@
+"""
+Blackjack Strategy
+Expected value of hitting and standing, from exact dealer outcome probabilities over the cards left in the shoe.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from engine.blackjack import BLACKJACK_PAYOUTS, CARD_VALUES, DEALER_STANDS_ON, DECKS, BlackjackHand
+
+# Dealer outcomes, in the order solutions are stored: stood on 17-21, then bust
+DEALER_TOTALS = (17, 18, 19, 20, 21)
+BUST = len(DEALER_TOTALS)
+
+# Card byte -> point value with the ace as 1, padded for bytes.translate
+POINTS = bytes(1 if value == 11 else value for value in CARD_VALUES).ljust(256, b'\0')
+
+# Cards of each point value (index 1 = ace ... 10 = tens and faces) in a full shoe
+FULL_SHOE = tuple([0] + [POINTS[:len(CARD_VALUES)].count(value) * DECKS for value in range(1, 11)])
+
+# Fewer unknown cards than this only happens past the cut card with many hands open in one
+# channel, and the shoe reshuffles when it runs out, so such hands are solved as a fresh shoe
+MIN_POOL = 20
+
+Signature = Tuple[int, ...]
+
+
+class StrategyHint:
+    """Expected net return per unit bet of hitting and of standing."""
+
+    __slots__ = ('hit', 'stand')
+
+    def __init__(self, hit: float, stand: float):
+        self.hit = hit
+        self.stand = stand
+
+    @property
+    def best(self) -> str:
+        return 'hit' if self.hit > self.stand else 'stand'
+
+
+def shoe_signature(hand: BlackjackHand) -> Signature:
+    """Count of each point value the player cannot see: the undealt shoe plus the dealer's hole card.
+
+    Index 0 is unused so a count is indexed by its card's point value.
+    """
+    shoe = hand.shoe
+    unseen = shoe.cards[shoe.position:].translate(POINTS)
+    counts = [0] + [unseen.count(value) for value in range(1, 11)]
+    counts[POINTS[hand.dealer.cards[1]]] += 1
+    if sum(counts) < MIN_POOL:
+        return FULL_SHOE
+    return tuple(counts)
+
+
+def dealer_outcomes(upcard: int, signature: Signature) -> List[float]:
+    """Exact chance of each dealer outcome, given the dealer checked and has no blackjack.
+
+    The hole card comes from ``signature`` less the card that would have
+    made a natural; the dealer then draws without replacement until 17.
+    Draw sequences that reach the same total and ace flag with the same
+    cards left are the same subproblem, so each is solved once.
+    """
+    counts = list(signature)
+    left = sum(counts)
+    memo: Dict[tuple, List[float]] = {}
+
+    def draw(total: int, ace: bool) -> List[float]:
+        nonlocal left
+        best = total + 10 if ace and total + 10 <= 21 else total
+        if best >= DEALER_STANDS_ON:
+            result = [0.0] * (BUST + 1)
+            result[BUST if best > 21 else best - DEALER_STANDS_ON] = 1.0
+            return result
+        key = (total, ace, *counts)
+        cached = memo.get(key)
+        if cached is not None:
+            return cached
+        result = [0.0] * (BUST + 1)
+        remaining = left
+        for value in range(1, 11):
+            count = counts[value]
+            if not count:
+                continue
+            counts[value] -= 1
+            left -= 1
+            chance = count / remaining
+            for i, p in enumerate(draw(total + value, ace or value == 1)):
+                result[i] += chance * p
+            counts[value] += 1
+            left += 1
+        memo[key] = result
+        return result
+
+    # The hole card is never the one that would have completed a dealer blackjack
+    natural = {1: 10, 10: 1}.get(upcard)
+    holes = left - (counts[natural] if natural else 0)
+    outcomes = [0.0] * (BUST + 1)
+    for value in range(1, 11):
+        count = counts[value]
+        if not count or value == natural:
+            continue
+        counts[value] -= 1
+        left -= 1
+        chance = count / holes
+        for i, p in enumerate(draw(upcard + value, upcard == 1 or value == 1)):
+            outcomes[i] += chance * p
+        counts[value] += 1
+        left += 1
+    return outcomes
+
+
+def stand_values(outcomes: List[float], payout: float) -> List[float]:
+    """Expected net return of standing on each player total 0-21 against ``outcomes``."""
+    values = []
+    for total in range(22):
+        win = outcomes[BUST] + sum(p for dealer, p in zip(DEALER_TOTALS, outcomes) if dealer < total)
+        push = outcomes[total - DEALER_STANDS_ON] if total >= DEALER_STANDS_ON else 0.0
+        values.append(win * payout - (1.0 - win - push))
+    return values
+
+
+def hit_value(total: int, ace: bool, signature: Signature, stands: List[float]) -> float:
+    """Expected net return of hitting a hard ``total`` and then playing on optimally.
+
+    Later draws come from the same cards as this one; removing the player's
+    own draws moves the result far less than a card's worth of rounding,
+    and keeps every follow-up a lookup in ``stands``.
+    """
+    cards = sum(signature)
+    chances = [(value, signature[value] / cards) for value in range(1, 11) if signature[value]]
+    memo: Dict[tuple, float] = {}
+
+    def hit(total: int, ace: bool) -> float:
+        key = (total, ace)
+        if key in memo:
+            return memo[key]
+        value = 0.0
+        for card, chance in chances:
+            drawn = total + card
+            if drawn > 21:
+                value -= chance
+                continue
+            has_ace = ace or card == 1
+            best = drawn + 10 if has_ace and drawn + 10 <= 21 else drawn
+            value += chance * max(stands[best], hit(drawn, has_ace))
+        memo[key] = value
+        return value
+
+    return hit(total, ace)
+
+
+class StrategySolver:
+    """Hit and stand EVs for open hands, with both solving steps cached.
+
+    Dealer outcomes are cached by upcard and shoe signature, and finished
+    hints by player total, soft flag, upcard, signature and mode, so hints
+    for hands sharing a channel's shoe reuse one dealer solve and a
+    repeated click is a dict hit.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._dealer: 'OrderedDict[tuple, List[float]]' = OrderedDict()
+        self._hints: 'OrderedDict[tuple, StrategyHint]' = OrderedDict()
+        self.solved = 0
+        self.reused = 0
+
+    def hint(self, hand: BlackjackHand) -> StrategyHint:
+        signature = shoe_signature(hand)
+        upcard = POINTS[hand.dealer.cards[0]]
+        total, soft = hand.player.total, hand.player.soft > 0
+        key = (total, soft, upcard, signature, hand.mode)
+        cached = self._hints.get(key)
+        if cached is not None:
+            self._hints.move_to_end(key)
+            self.reused += 1
+            return cached
+
+        outcomes = self._cached(self._dealer, (upcard, signature), lambda: dealer_outcomes(upcard, signature))
+        stands = stand_values(outcomes, BLACKJACK_PAYOUTS[hand.mode])
+        # A soft total counts one ace as 11; the hit table works from the hard total
+        hard = total - 10 if soft else total
+        hint = StrategyHint(hit_value(hard, soft, signature, stands), stands[total])
+        self.solved += 1
+        return self._cached(self._hints, key, lambda: hint)
+
+    def _cached(self, cache: OrderedDict, key: tuple, solve):
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = solve()
+            while len(cache) > self.max_entries:
+                cache.popitem(last=False)
+        cache.move_to_end(key)
+        return value
+
+    def stats(self) -> dict:
+        return {'dealer': len(self._dealer), 'hints': len(self._hints), 'solved': self.solved, 'reused': self.reused}
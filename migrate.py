@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Storage Migration
+Streams an existing user_data.json into the binary snapshot or SQLite backend,
+folding in unflushed journal records, then verifies the result.
+
+Usage:
+    python migrate.py --to binary [--source user_data.json] [--output user_data.snap]
+    python migrate.py --to sqlite [--source user_data.json] [--output user_data.db]
+"""
+
+import argparse
+import asyncio
+import heapq
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+from dotenv import load_dotenv
+
+# BotConfig reads the environment at import time
+load_dotenv()
+
+from config import BotConfig
+from storage.journal import BetJournal
+from storage.profile import NUMERIC_FIELDS, Profile, apply_record
+from storage.snapshot import (SnapshotFormatError, SnapshotReader, atomic_write,
+                              iter_json_entries, write_snapshot)
+
+# Fields get_user_profile fills in when a stored profile lacks them
+REQUIRED_FIELDS = frozenset(NUMERIC_FIELDS + ('last_daily', 'last_work'))
+
+# Where the snapshot writers put the journal sequence the file covers
+META_TAIL = re.compile(rb'"__meta__"\s*:\s*\{[^{}]*"journal_seq"\s*:\s*(\d+)[^{}]*\}\s*\}\s*$')
+
+
+class MigrationStats:
+    """Counts and checksums gathered while streaming the source."""
+
+    def __init__(self):
+        self.source_profiles = 0
+        self.filled = 0
+        self.journal_records = 0
+        self.journal_only = 0
+        self.count = 0
+        self.cash = 0
+
+    def add(self, profile: Profile):
+        self.count += 1
+        self.cash += profile.cash
+
+
+def read_journal_seq(path: str) -> int:
+    """Read ``__meta__`` from the end of a snapshot without parsing the rest."""
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(path) - 4096))
+        match = META_TAIL.search(f.read())
+    return int(match.group(1)) if match else 0
+
+
+def pending_records(journal_path: str, journal_seq: int) -> Tuple[Dict[str, List[dict]], int]:
+    """Group journal records the snapshot does not cover yet by user."""
+    pending = defaultdict(list)
+    last_seq = journal_seq
+    for record in BetJournal(journal_path).replay(journal_seq):
+        pending[record['u']].append(record)
+        last_seq = max(last_seq, record['n'])
+    return pending, last_seq
+
+
+def stream_profiles(source: str, journal_seq: int, pending: Dict[str, List[dict]],
+                    stats: MigrationStats) -> Iterator[Tuple[str, Profile]]:
+    """Yield every profile in ``source`` with defaults filled and journal records applied.
+
+    Users who only appear in the journal are yielded last, built from a
+    default profile the same way the live store would create them.
+    """
+    with open(source, 'r', encoding='utf-8') as f:
+        for user_id, data in iter_json_entries(f):
+            if user_id == '__meta__':
+                if data.get('journal_seq', 0) != journal_seq:
+                    raise SnapshotFormatError(f"{source} has __meta__ before its last entry")
+                continue
+            if not isinstance(data, dict) or not user_id.isdigit():
+                raise SnapshotFormatError(f"{source} has an invalid entry for user {user_id!r}")
+            stats.source_profiles += 1
+            if not REQUIRED_FIELDS <= data.keys():
+                stats.filled += 1
+            profile = Profile.from_dict(data)
+            for record in pending.pop(user_id, ()):
+                apply_record(profile, record)
+                stats.journal_records += 1
+            stats.add(profile)
+            yield user_id, profile
+
+    for user_id, records in pending.items():
+        profile = Profile()
+        for record in records:
+            apply_record(profile, record)
+            stats.journal_records += 1
+        stats.journal_only += 1
+        stats.add(profile)
+        yield user_id, profile
+
+
+def to_binary(profiles: Iterator[Tuple[str, Profile]], output: str, journal_seq: int, run_size: int):
+    """Write a binary snapshot with an external sort over ``run_size``-profile runs."""
+    by_id = lambda item: int(item[0])
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output))) as tmp:
+        runs = []
+        batch = []
+        for item in profiles:
+            batch.append(item)
+            if len(batch) >= run_size:
+                batch.sort(key=by_id)
+                path = os.path.join(tmp, f"run{len(runs)}.snap")
+                with open(path, 'wb') as f:
+                    write_snapshot(f, batch)
+                runs.append(SnapshotReader(path))
+                batch = []
+        batch.sort(key=by_id)
+        try:
+            atomic_write(output, lambda f: write_snapshot(f, heapq.merge(*runs, batch, key=by_id), journal_seq))
+        finally:
+            for run in runs:
+                run.close()
+
+
+def to_sqlite(profiles: Iterator[Tuple[str, Profile]], output: str, journal_seq: int, batch_size: int):
+    """Import into a fresh SQLite database built beside ``output`` and swapped in."""
+    from storage.sqlite_backend import SQLiteBackend
+
+    tmp_path = f"{output}.tmp"
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(tmp_path + suffix):
+            os.remove(tmp_path + suffix)
+    backend = SQLiteBackend(tmp_path)
+    try:
+        batch = []
+        for item in profiles:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                backend.import_profiles(batch)
+                batch = []
+        backend.import_profiles(batch, journal_seq=journal_seq)
+    finally:
+        asyncio.run(backend.close())
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(output + suffix):
+            os.remove(output + suffix)
+    os.replace(tmp_path, output)
+
+
+def checksum(kind: str, output: str) -> Tuple[int, int, int]:
+    """Count users, total cash and the stored journal sequence in the written backend."""
+    if kind == 'binary':
+        snapshot = SnapshotReader(output)
+        try:
+            return len(snapshot), sum(profile.cash for _, profile in snapshot), snapshot.journal_seq
+        finally:
+            snapshot.close()
+    conn = sqlite3.connect(output)
+    try:
+        count, cash = conn.execute("SELECT COUNT(*), COALESCE(SUM(cash), 0) FROM profiles").fetchone()
+        row = conn.execute("SELECT value FROM meta WHERE key = 'journal_seq'").fetchone()
+        return count, cash, row[0] if row else 0
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream user_data.json into another storage backend")
+    parser.add_argument('--to', choices=('binary', 'sqlite'), required=True)
+    parser.add_argument('--source', default=BotConfig.USER_DATA_FILE)
+    parser.add_argument('--output', help="defaults to SNAPSHOT_FILE or SQLITE_FILE")
+    parser.add_argument('--journal', default=BotConfig.JOURNAL_FILE)
+    parser.add_argument('--run-size', type=int, default=250_000,
+                        help="profiles held in memory per sorted run (binary) or insert batch (sqlite)")
+    parser.add_argument('--force', action='store_true', help="replace an existing output file")
+    args = parser.parse_args()
+
+    output = args.output or (BotConfig.SNAPSHOT_FILE if args.to == 'binary' else BotConfig.SQLITE_FILE)
+    if not os.path.exists(args.source):
+        sys.exit(f"{args.source} does not exist")
+    if os.path.abspath(output) == os.path.abspath(args.source):
+        sys.exit("Refusing to write over the source file")
+    if os.path.exists(output) and not args.force:
+        sys.exit(f"{output} already exists; pass --force to replace it")
+
+    start = time.perf_counter()
+    source_seq = read_journal_seq(args.source)
+    pending, journal_seq = pending_records(args.journal, source_seq)
+    stats = MigrationStats()
+    profiles = stream_profiles(args.source, source_seq, pending, stats)
+    try:
+        if args.to == 'binary':
+            to_binary(profiles, output, journal_seq, args.run_size)
+        else:
+            to_sqlite(profiles, output, journal_seq, args.run_size)
+    except SnapshotFormatError as e:
+        sys.exit(f"Migration aborted, {output} was not changed: {e}")
+    elapsed = time.perf_counter() - start
+
+    source_mb = os.path.getsize(args.source) / 1024 / 1024
+    print(f"Read {stats.source_profiles:,} profiles ({source_mb:,.1f} MB) from {args.source}; "
+          f"filled defaults for {stats.filled:,}")
+    print(f"Applied {stats.journal_records:,} journal records after seq {source_seq:,} "
+          f"({stats.journal_only:,} users only in the journal)")
+    print(f"Wrote {stats.count:,} profiles to {output} ({os.path.getsize(output) / 1024 / 1024:,.1f} MB) "
+          f"in {elapsed:,.2f}s: {stats.count / max(elapsed, 1e-9):,.0f} profiles/s, "
+          f"{source_mb / max(elapsed, 1e-9):,.1f} MB/s")
+
+    verify_start = time.perf_counter()
+    count, cash, stored_seq = checksum(args.to, output)
+    problems = []
+    if count != stats.count:
+        problems.append(f"user count {count:,} != {stats.count:,}")
+    if cash != stats.cash:
+        problems.append(f"total cash {cash:,} != {stats.cash:,}")
+    if stored_seq != journal_seq:
+        problems.append(f"journal_seq {stored_seq:,} != {journal_seq:,}")
+    for problem in problems:
+        print(problem)
+    print(f"{'FAILED' if problems else 'OK'}: {count:,} users, ${cash:,} total cash "
+          f"verified in {time.perf_counter() - verify_start:,.2f}s")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Storage package for the Discord bot.
+Contains the shared profile store and its persistence helpers.
+"""
+
+# This file makes the storage directory a Python package
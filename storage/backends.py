@@ -0,0 +1,311 @@
+"""
+Storage Backends
+Pluggable persistence layers the ProfileStore reads profiles from and writes delta records to.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from storage.journal import BetJournal
+from storage.profile import Profile, apply_record, copy_profile, default_profile
+from storage.snapshot import (SnapshotFormatError, SnapshotReader, atomic_write, merged,
+                              write_json_snapshot, write_snapshot)
+
+# Reserved snapshot key holding the journal position the snapshot covers
+META_KEY = '__meta__'
+
+
+class MigrationRequired(RuntimeError):
+    """Raised when a backend would open empty next to a ``user_data.json`` it was never migrated from."""
+
+
+def check_migrated(kind: str, path: str, legacy_path: Optional[str]):
+    """Refuse to start ``kind`` with no data while the legacy JSON file still holds every balance."""
+    if legacy_path and os.path.exists(legacy_path):
+        raise MigrationRequired(
+            f"{path} has no profiles but {legacy_path} exists; run `python migrate.py --to {kind}` "
+            f"first, or move {legacy_path} aside to start with empty balances"
+        )
+
+
+class StorageBackend:
+    """Interface between the ProfileStore and durable storage.
+
+    The store calls :meth:`open` once at startup, fetches profiles on demand
+    with :meth:`load_profile`, and hands every batch of delta records (see
+    :func:`storage.profile.apply_record`) to :meth:`write`. Backends that
+    need periodic compaction report it through :meth:`checkpoint_due`.
+    """
+
+    name = 'base'
+
+    def open(self) -> int:
+        """Prepare storage and return the last record sequence applied."""
+        raise NotImplementedError
+
+    async def load_profile(self, user_id: str) -> Optional[Profile]:
+        """Return a private copy of one stored profile, or None if unknown."""
+        raise NotImplementedError
+
+    async def scan(self) -> List[Tuple[str, Profile]]:
+        """Return every stored ``(user_id, profile)`` pair; treat as read-only."""
+        raise NotImplementedError
+
+    async def write(self, records: List[dict]):
+        """Durably apply a batch of delta records."""
+        raise NotImplementedError
+
+    def checkpoint_due(self, closing: bool = False) -> bool:
+        """Whether the store should call :meth:`checkpoint` now."""
+        return False
+
+    async def checkpoint(self):
+        """Fold recent writes into long-term storage."""
+
+    async def close(self):
+        """Release files, connections and threads."""
+
+
+class JsonBackend(StorageBackend):
+    """``user_data.json`` snapshot plus an append-only :class:`BetJournal`.
+
+    The JSON format has to be parsed whole, so the backend keeps the
+    persisted table in memory and serves copies from it. Records are applied
+    to that table and appended to the journal; every ``compact_interval``
+    seconds or ``compact_records`` records the journal is folded into a new
+    snapshot. Startup loads the snapshot and replays only the newer records.
+
+    Compaction is copy-on-write: the event loop only rotates the journal and
+    keeps a reference to the current table, a worker thread serialises that
+    table, and records arriving meanwhile are applied to copies held in
+    ``_changes`` and merged back once the snapshot is on disk.
+    """
+
+    name = 'json'
+
+    def __init__(self, path: str = 'user_data.json', journal_path: str = 'user_data.journal',
+                 compact_interval: float = 600.0, compact_records: int = 100_000):
+        self.path = path
+        self.journal = BetJournal(journal_path)
+        self.compact_interval = compact_interval
+        self.compact_records = compact_records
+        self.logger = logging.getLogger(__name__)
+
+        self._profiles: Dict[str, Profile] = {}
+        self._changes: Optional[Dict[str, Profile]] = None
+        self._io_lock = asyncio.Lock()
+        self._seq = 0
+        self._journal_records = 0
+        self._last_compaction = time.monotonic()
+
+    def open(self) -> int:
+        snapshot_seq = self._read_snapshot()
+        self._seq = snapshot_seq
+
+        replayed = 0
+        for record in self.journal.replay(snapshot_seq):
+            self._apply(record)
+            replayed += 1
+        self._journal_records = replayed
+        self.logger.info(
+            f"Loaded {self.profile_count} profiles from {self.path} "
+            f"and replayed {replayed} journal records"
+        )
+        return self._seq
+
+    def _read_snapshot(self) -> int:
+        """Load the snapshot and return the journal sequence it covers.
+
+        A missing file means a fresh install. A file that cannot be parsed
+        raises instead of silently starting everyone from scratch.
+        """
+        self._profiles = {}
+        if not os.path.exists(self.path):
+            return 0
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise SnapshotFormatError(
+                f"{self.path} is corrupt ({e}); restore it from a backup or move it "
+                f"aside to start with empty balances"
+            ) from e
+        snapshot_seq = data.pop(META_KEY, {}).get('journal_seq', 0)
+        self._profiles = {uid: Profile.from_dict(p) for uid, p in data.items()}
+        return snapshot_seq
+
+    @property
+    def profile_count(self) -> int:
+        """Number of stored profiles."""
+        added = sum(1 for uid in self._changes or () if uid not in self._profiles)
+        return len(self._profiles) + added
+
+    def _stored(self, user_id: str) -> Optional[Profile]:
+        """Decode a profile not held in ``_profiles``; the JSON table holds all."""
+        return None
+
+    def _apply(self, record: dict):
+        user_id = record['u']
+        if self._changes is None:
+            profile = self._profiles.get(user_id)
+            if profile is None:
+                profile = self._profiles[user_id] = self._stored(user_id) or default_profile()
+        else:
+            # A snapshot is reading _profiles; change a copy instead
+            profile = self._changes.get(user_id)
+            if profile is None:
+                base = self._profiles.get(user_id)
+                profile = base.copy() if base is not None else self._stored(user_id) or default_profile()
+                self._changes[user_id] = profile
+        apply_record(profile, record)
+        self._seq = max(self._seq, record['n'])
+
+    def _current(self, user_id: str) -> Optional[Profile]:
+        if self._changes is not None and user_id in self._changes:
+            return self._changes[user_id]
+        return self._profiles.get(user_id)
+
+    async def load_profile(self, user_id: str) -> Optional[Profile]:
+        profile = self._current(user_id)
+        if profile is not None:
+            return copy_profile(profile)
+        return self._stored(user_id)
+
+    async def scan(self) -> List[Tuple[str, Profile]]:
+        if self._changes is None:
+            return list(self._profiles.items())
+        return list({**self._profiles, **self._changes}.items())
+
+    async def write(self, records: List[dict]):
+        async with self._io_lock:
+            await asyncio.to_thread(self.journal.append, records)
+            for record in records:
+                self._apply(record)
+            self._journal_records += len(records)
+
+    def checkpoint_due(self, closing: bool = False) -> bool:
+        if not self._journal_records or self._changes is not None:
+            return False
+        if closing or self._journal_records >= self.compact_records:
+            return True
+        return time.monotonic() - self._last_compaction >= self.compact_interval
+
+    async def checkpoint(self):
+        # The only work on the loop: set the journal aside and freeze the table
+        async with self._io_lock:
+            self.journal.rotate()
+            view, seq, compacted = self._profiles, self._seq, self._journal_records
+            self._changes = {}
+            self._journal_records = 0
+        written = False
+        try:
+            await asyncio.to_thread(self._write_snapshot, view, seq)
+            written = True
+        except BaseException:
+            self._journal_records += compacted
+            raise
+        finally:
+            self._merge_changes(written)
+        await asyncio.to_thread(self.journal.discard_rotated)
+        self.logger.info(f"Compacted {compacted} journal records into {self.path}")
+        self._last_compaction = time.monotonic()
+
+    def _write_snapshot(self, view: Dict[str, Profile], seq: int):
+        """Serialise a frozen table; runs in a worker thread."""
+        atomic_write(self.path, lambda f: write_json_snapshot(f, view.items(), seq))
+
+    def _merge_changes(self, written: bool):
+        """Fold profiles changed during a snapshot back into the table."""
+        self._profiles.update(self._changes)
+        self._changes = None
+
+
+class BinaryBackend(JsonBackend):
+    """Memory-mapped binary snapshot (see :mod:`storage.snapshot`) plus the journal.
+
+    Opening only maps the snapshot, so startup costs the journal replay
+    alone. ``_profiles`` holds just the users changed since the last
+    compaction; everyone else is decoded from the mapping when asked for.
+    Compaction merges those changes into a new snapshot file.
+    """
+
+    name = 'binary'
+
+    def __init__(self, path: str = 'user_data.snap', journal_path: str = 'user_data.journal',
+                 compact_interval: float = 600.0, compact_records: int = 100_000,
+                 legacy_path: Optional[str] = None):
+        super().__init__(path, journal_path, compact_interval, compact_records)
+        # user_data.json this snapshot replaces; opening without a snapshot while it exists is refused
+        self.legacy_path = legacy_path
+        self._snapshot: Optional[SnapshotReader] = None
+
+    def _read_snapshot(self) -> int:
+        self._profiles = {}
+        if not os.path.exists(self.path):
+            check_migrated(self.name, self.path, self.legacy_path)
+            return 0
+        self._snapshot = SnapshotReader(self.path)
+        return self._snapshot.journal_seq
+
+    @property
+    def profile_count(self) -> int:
+        stored = len(self._snapshot) if self._snapshot is not None else 0
+        changed = {**self._profiles, **(self._changes or {})}
+        return stored + sum(1 for uid in changed if self._stored(uid) is None)
+
+    def _stored(self, user_id: str) -> Optional[Profile]:
+        return self._snapshot.get(user_id) if self._snapshot is not None else None
+
+    async def scan(self) -> List[Tuple[str, Profile]]:
+        stored = await asyncio.to_thread(list, self._snapshot or ())
+        changed = {**self._profiles, **(self._changes or {})}
+        profiles = [(uid, changed.pop(uid, profile)) for uid, profile in stored]
+        profiles.extend(changed.items())
+        return profiles
+
+    def _write_snapshot(self, view: Dict[str, Profile], seq: int):
+        atomic_write(self.path, lambda f: write_snapshot(f, merged(self._snapshot, view), seq))
+
+    def _merge_changes(self, written: bool):
+        if not written:
+            self._profiles.update(self._changes)
+        else:
+            # The frozen changes are in the new file; map it and keep only
+            # what changed while it was being written
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = SnapshotReader(self.path)
+            self._profiles = self._changes
+        self._changes = None
+
+    async def close(self):
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+
+
+def create_backend(kind: str, **options) -> StorageBackend:
+    """Build the backend named by ``kind`` (``json``, ``binary`` or ``sqlite``)."""
+    if kind == 'json':
+        return JsonBackend(
+            options.get('path', 'user_data.json'),
+            journal_path=options.get('journal_path', 'user_data.journal'),
+            compact_interval=options.get('compact_interval', 600.0),
+            compact_records=options.get('compact_records', 100_000)
+        )
+    if kind == 'binary':
+        return BinaryBackend(
+            options.get('snapshot_path', 'user_data.snap'),
+            journal_path=options.get('journal_path', 'user_data.journal'),
+            compact_interval=options.get('compact_interval', 600.0),
+            compact_records=options.get('compact_records', 100_000),
+            legacy_path=options.get('path', 'user_data.json')
+        )
+    if kind == 'sqlite':
+        from storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(options.get('sqlite_path', 'user_data.db'), legacy_path=options.get('path', 'user_data.json'))
+    raise ValueError(f"Unknown storage backend: {kind}")
@@ -0,0 +1,96 @@
+"""
+Profile Cache
+LRU cache of resident profiles bounded by entry count and approximate memory.
+"""
+
+import sys
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from storage.profile import Profile
+
+
+def profile_size(profile: Profile) -> int:
+    """Approximate bytes held by one profile, including nested containers."""
+    size = sys.getsizeof(profile)
+    for name in Profile.__slots__:
+        value = getattr(profile, name)
+        if value is not None:
+            size += sys.getsizeof(value)
+            if isinstance(value, dict):
+                size += sum(sys.getsizeof(v) for v in value.values())
+    return size
+
+
+class ProfileCache:
+    """Least-recently-used map of ``user_id -> profile``.
+
+    ``max_entries`` caps the number of resident profiles and ``max_bytes``
+    (0 disables it) caps their approximate footprint. :meth:`put` returns
+    the entries it pushed out so the caller can write dirty ones back.
+    """
+
+    def __init__(self, max_entries: int = 50_000, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Profile]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, user_id: str) -> Optional[Profile]:
+        """Return a resident profile and mark it most recently used."""
+        profile = self._entries.get(user_id)
+        if profile is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(user_id)
+        return profile
+
+    def put(self, user_id: str, profile: Profile) -> List[Tuple[str, Profile]]:
+        """Insert a profile and return any entries evicted to make room."""
+        if user_id in self._entries:
+            self.bytes -= self._sizes[user_id]
+        self._entries[user_id] = profile
+        self._entries.move_to_end(user_id)
+        size = self._sizes[user_id] = profile_size(profile)
+        self.bytes += size
+
+        evicted = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self.bytes > self.max_bytes)
+        ):
+            old_id, old_profile = self._entries.popitem(last=False)
+            self.bytes -= self._sizes.pop(old_id)
+            self.evictions += 1
+            evicted.append((old_id, old_profile))
+        return evicted
+
+    def peek(self, user_id: str) -> Optional[Profile]:
+        """Return a resident profile without touching LRU order or counters."""
+        return self._entries.get(user_id)
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
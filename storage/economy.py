@@ -0,0 +1,315 @@
+"""
+Economy Statistics
+Running money-supply, house-edge and activity aggregates kept up to date by every settled bet.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from storage.profile import Profile
+from storage.profile_store import ProfileStore
+from storage.ranking import RankKey
+from storage.snapshot import atomic_write
+
+# Bucket holding every balance of zero or below
+NON_POSITIVE = -1
+
+# Percentiles shown by the economy report
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+FORMAT_VERSION = 1
+
+
+def utc_day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).date().isoformat()
+
+
+class CashSketch:
+    """Streaming histogram of balances with relative-error quantiles.
+
+    Positive values fall into logarithmic buckets ``(γ^(k-1), γ^k]`` with
+    ``γ = (1 + accuracy) / (1 - accuracy)``, in the style of DDSketch, so a
+    few thousand buckets cover every balance a player can reach. Each
+    bucket keeps its exact count and sum, which makes removals exact (a
+    balance changing is one removal and one insertion), quantiles land
+    within ``accuracy`` of the true value, and the Gini coefficient only
+    loses the inequality inside single buckets.
+    """
+
+    __slots__ = ('accuracy', '_log_gamma', '_counts', '_sums', 'count', 'total')
+
+    def __init__(self, accuracy: float = 0.01):
+        self.accuracy = accuracy
+        self._log_gamma = math.log((1 + accuracy) / (1 - accuracy))
+        self._counts: Dict[int, int] = {}
+        self._sums: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+
+    @classmethod
+    def from_values(cls, values: Iterable[int], accuracy: float = 0.01) -> 'CashSketch':
+        sketch = cls(accuracy)
+        counts: Counter = Counter()
+        sums: Counter = Counter()
+        for value in values:
+            bucket = sketch._bucket(value)
+            counts[bucket] += 1
+            sums[bucket] += value
+        sketch._counts = dict(counts)
+        sketch._sums = dict(sums)
+        sketch.count = sum(counts.values())
+        sketch.total = sum(sums.values())
+        return sketch
+
+    def _bucket(self, value: int) -> int:
+        if value <= 0:
+            return NON_POSITIVE
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def add(self, value: int):
+        bucket = self._bucket(value)
+        self._counts[bucket] = self._counts.get(bucket, 0) + 1
+        self._sums[bucket] = self._sums.get(bucket, 0) + value
+        self.count += 1
+        self.total += value
+
+    def remove(self, value: int):
+        bucket = self._bucket(value)
+        left = self._counts.get(bucket, 0) - 1
+        if left < 0:
+            return
+        if left:
+            self._counts[bucket] = left
+            self._sums[bucket] -= value
+        else:
+            del self._counts[bucket]
+            del self._sums[bucket]
+        self.count -= 1
+        self.total -= value
+
+    def __len__(self) -> int:
+        """Number of non-empty buckets."""
+        return len(self._counts)
+
+    def _ascending(self) -> List[Tuple[int, int]]:
+        """``(count, sum)`` per bucket from the poorest up."""
+        return [(self._counts[bucket], self._sums[bucket]) for bucket in sorted(self._counts)]
+
+    def quantiles(self, fractions: Iterable[float]) -> List[Optional[float]]:
+        """Approximate value at each fraction (0.5 is the median) in one pass over the buckets."""
+        if not self.count:
+            return [None for _ in fractions]
+        targets = sorted((fraction * (self.count - 1), i) for i, fraction in enumerate(fractions))
+        result: List[Optional[float]] = [None] * len(targets)
+        seen = 0
+        pending = iter(targets)
+        target = next(pending, None)
+        for count, total in self._ascending():
+            seen += count
+            while target is not None and target[0] < seen:
+                # The bucket mean lies inside the bucket, so it is as close as its bounds
+                result[target[1]] = total / count
+                target = next(pending, None)
+        return result
+
+    def gini(self) -> float:
+        """Gini coefficient of the balances, treating each bucket as equal shares."""
+        if self.count == 0 or self.total <= 0:
+            return 0.0
+        area = 0.0
+        below = 0
+        for count, total in self._ascending():
+            share = (2 * below + total) / self.total
+            area += count / self.count * share
+            below += total
+        return 1.0 - area
+
+
+class EconomyStats:
+    """Economy-wide figures for ops, maintained as bets and credits are committed.
+
+    The balance sketch is seeded once from the cash ranking built at
+    startup and then follows the ``cash`` rank-change events, so money in
+    circulation and player count are exact and percentiles and Gini come
+    from :class:`CashSketch`. Every settled bet adds to per-game wagered
+    and paid-out totals and marks the player active for the UTC day.
+    Game totals and daily actives are written to ``path`` every
+    ``save_interval`` seconds and on close; nothing here ever scans
+    profiles after startup.
+    """
+
+    def __init__(self, store: ProfileStore, path: str = 'economy_stats.json', accuracy: float = 0.01,
+                 save_interval: float = 300.0, history_days: int = 30):
+        self.store = store
+        self.path = path
+        self.accuracy = accuracy
+        self.save_interval = save_interval
+        self.history_days = history_days
+        self.logger = logging.getLogger(__name__)
+
+        self.since = time.time()
+        # game -> [bets, wagered, paid out]
+        self.games: Dict[str, List[int]] = {}
+        self.day = utc_day(self.since)
+        self.active: Set[str] = set()
+        self.daily: Dict[str, int] = {}
+
+        self._cash: Optional[CashSketch] = None
+        self._backlog: Optional[List[Tuple[Optional[int], Optional[int]]]] = None
+        self._task: Optional[asyncio.Task] = None
+        store.add_record_listener(self._on_record)
+        store.add_rank_listener(self._on_rank)
+
+    def load(self):
+        """Read saved totals; a missing or unreadable file starts them from zero."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.since = data['since']
+            self.games = {game: list(totals) for game, totals in data['games'].items()}
+            self.day = data['day']
+            self.active = set(data['active'])
+            self.daily = dict(data['daily'])
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.error(f"Ignoring unreadable economy stats {self.path}: {e}")
+            return
+        self._roll(utc_day(time.time()))
+
+    def _to_json(self) -> dict:
+        return {
+            'v': FORMAT_VERSION,
+            'since': self.since,
+            'games': self.games,
+            'day': self.day,
+            'active': list(self.active),
+            'daily': self.daily,
+        }
+
+    def save(self, data: Optional[dict] = None):
+        data = self._to_json() if data is None else data
+        atomic_write(self.path, lambda f: f.write(json.dumps(data, separators=(',', ':')).encode()))
+
+    def _on_record(self, record: dict, profile: Profile):
+        if record['k'] != 'bet':
+            return
+        totals = self.games.get(record['g'])
+        if totals is None:
+            totals = self.games[record['g']] = [0, 0, 0]
+        totals[0] += 1
+        totals[1] += record['b']
+        totals[2] += record['p']
+        day = utc_day(record['t'])
+        if day != self.day:
+            self._roll(day)
+        self.active.add(record['u'])
+
+    def _roll(self, day: str):
+        """Close out the current day if ``day`` is a later one."""
+        if day <= self.day:
+            return
+        self.daily[self.day] = len(self.active)
+        self.active = set()
+        self.day = day
+        for old in sorted(self.daily)[:-self.history_days]:
+            del self.daily[old]
+
+    def _on_rank(self, category: str, user_id: str, old: Optional[RankKey], new: Optional[RankKey]):
+        if category != 'cash':
+            return
+        change = (-old[0] if old is not None else None, -new[0] if new is not None else None)
+        if self._cash is not None:
+            self._apply(self._cash, change)
+        elif self._backlog is not None:
+            self._backlog.append(change)
+
+    @staticmethod
+    def _apply(sketch: CashSketch, change: Tuple[Optional[int], Optional[int]]):
+        old, new = change
+        if old is not None:
+            sketch.remove(old)
+        if new is not None:
+            sketch.add(new)
+
+    async def _seed(self):
+        """Build the balance sketch from the cash ranking, then replay changes made meanwhile."""
+        start = time.perf_counter()
+        rankings = await self.store.get_rankings()
+        # Copied and subscribed in the same step, so no change is missed or counted twice
+        balances = [cash for _, cash in rankings['cash']]
+        self._backlog = []
+        sketch = await asyncio.to_thread(CashSketch.from_values, balances, self.accuracy)
+        del balances
+        for change in self._backlog:
+            self._apply(sketch, change)
+        self._cash, self._backlog = sketch, None
+        self.logger.info(f"Seeded economy stats for {sketch.count} players in {time.perf_counter() - start:.2f}s")
+
+    def start(self):
+        """Start seeding and periodic saves; call once the event loop is running."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        try:
+            await self._seed()
+        except Exception as e:
+            self.logger.error(f"Could not seed economy stats: {e}")
+        while True:
+            await asyncio.sleep(self.save_interval)
+            self._roll(utc_day(time.time()))
+            try:
+                await asyncio.to_thread(self.save, self._to_json())
+            except Exception as e:
+                self.logger.error(f"Failed to save economy stats: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the balance figures are available yet."""
+        return self._cash is not None
+
+    def report(self, now: Optional[float] = None) -> dict:
+        """Current figures; costs one pass over the sketch buckets, never over players."""
+        self._roll(utc_day(time.time() if now is None else now))
+        games = sorted(((game, bets, wagered, wagered - paid) for game, (bets, wagered, paid) in self.games.items()),
+                       key=lambda row: row[3], reverse=True)
+        recent = [self.daily[day] for day in sorted(self.daily)[-7:]]
+        report = {
+            'since': self.since,
+            'games': games,
+            'house_profit': sum(row[3] for row in games),
+            'wagered': sum(row[2] for row in games),
+            'active_today': len(self.active),
+            'active_yesterday': recent[-1] if recent else None,
+            'active_week_avg': sum(recent) / len(recent) if recent else None,
+            'players': None,
+        }
+        sketch = self._cash
+        if sketch is not None:
+            report.update({
+                'players': sketch.count,
+                'circulation': sketch.total,
+                'mean': sketch.total / sketch.count if sketch.count else 0.0,
+                'percentiles': dict(zip(PERCENTILES, sketch.quantiles(p / 100 for p in PERCENTILES))),
+                'gini': sketch.gini(),
+                'accuracy': sketch.accuracy,
+            })
+        return report
@@ -0,0 +1,252 @@
+"""
+Leaderboard History
+Periodic top-N leaderboard snapshots stored as reverse-delta time series, for rank-change arrows and period views.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from storage.membership import GuildIndex
+from storage.profile_store import ProfileStore
+from storage.snapshot import atomic_write
+
+# ``(rank, score)`` of one user in one snapshot
+Entry = Tuple[int, int]
+
+# Look-back of each ``period`` option, in seconds
+PERIODS = {
+    'day': 86_400,
+    'week': 7 * 86_400,
+    'month': 30 * 86_400,
+}
+
+FORMAT_VERSION = 1
+
+
+def format_rank_change(old: Optional[int], new: int) -> str:
+    """Arrow for a move from rank ``old`` to ``new``: ``▲3``, ``▼1``, ``🆕`` or nothing."""
+    if old is None:
+        return "🆕"
+    if old > new:
+        return f"▲{old - new}"
+    if old < new:
+        return f"▼{new - old}"
+    return ""
+
+
+class Series:
+    """Snapshots of one leaderboard (a scope and category).
+
+    Only the newest snapshot is stored in full. Each older one is kept as
+    the undo delta that turns the snapshot after it back into it, mapping
+    changed users to their old entry or None if they were not listed, so
+    unchanged captures cost nothing and dropping expired history is just
+    dropping the oldest deltas.
+    """
+
+    __slots__ = ('rows', 'since', 'captured_at', 'undo')
+
+    def __init__(self, rows: Dict[str, Entry], since: float):
+        self.rows = rows
+        # When ``rows`` was first captured and when it was last confirmed
+        self.since = since
+        self.captured_at = since
+        # ``(since, delta)`` per older snapshot, oldest first
+        self.undo: List[Tuple[float, Dict[str, Optional[Entry]]]] = []
+
+    @property
+    def started(self) -> float:
+        """Time of the oldest snapshot still held."""
+        return self.undo[0][0] if self.undo else self.since
+
+    def record(self, rows: Dict[str, Entry], now: float):
+        """Make ``rows`` the newest snapshot."""
+        delta: Dict[str, Optional[Entry]] = {
+            user_id: entry for user_id, entry in self.rows.items() if rows.get(user_id) != entry
+        }
+        delta.update((user_id, None) for user_id in rows if user_id not in self.rows)
+        if delta:
+            self.undo.append((self.since, delta))
+            self.rows = rows
+            self.since = now
+        self.captured_at = now
+
+    def prune(self, horizon: float):
+        """Drop snapshots not needed to answer queries back to ``horizon``."""
+        drop = 0
+        while drop < len(self.undo):
+            following = self.undo[drop + 1][0] if drop + 1 < len(self.undo) else self.since
+            if following > horizon:
+                break
+            drop += 1
+        del self.undo[:drop]
+
+    def snapshot_index(self, at: float) -> Optional[int]:
+        """Position in ``undo`` of the snapshot current at ``at``; ``len(undo)`` is the newest."""
+        if at >= self.since:
+            return len(self.undo)
+        index = bisect_right(self.undo, at, key=lambda frame: frame[0]) - 1
+        return index if index >= 0 else None
+
+    def state(self, index: int) -> Dict[str, Entry]:
+        """Rebuild the snapshot at ``index`` by undoing the newer ones."""
+        if index == len(self.undo):
+            return self.rows
+        rows = dict(self.rows)
+        for _, delta in reversed(self.undo[index:]):
+            for user_id, entry in delta.items():
+                if entry is None:
+                    rows.pop(user_id, None)
+                else:
+                    rows[user_id] = entry
+        return rows
+
+    def to_json(self) -> dict:
+        return {
+            'since': self.since,
+            'at': self.captured_at,
+            'rows': [[user_id, rank, score] for user_id, (rank, score) in self.rows.items()],
+            'undo': [[since, [[user_id, *entry] if entry else [user_id] for user_id, entry in delta.items()]]
+                     for since, delta in self.undo],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'Series':
+        series = cls({user_id: (rank, score) for user_id, rank, score in data['rows']}, data['since'])
+        series.captured_at = data['at']
+        series.undo = [(since, {item[0]: (item[1], item[2]) if len(item) == 3 else None for item in delta})
+                       for since, delta in data['undo']]
+        return series
+
+
+class LeaderboardHistory:
+    """Captures the top ``depth`` of every leaderboard each ``interval`` seconds.
+
+    One series is kept for the global board and for each guild in the
+    :class:`GuildIndex`, per ranked category. Snapshots older than
+    ``retention`` seconds are dropped, and the whole history is rewritten
+    atomically off the event loop after each capture. Looking up where
+    users stood a day or a week ago undoes a handful of small deltas and
+    is memoised until the next capture, so it never touches profiles.
+    """
+
+    def __init__(self, store: ProfileStore, guild_index: GuildIndex, path: str = 'leaderboard_history.json',
+                 interval: float = 3600.0, retention: float = 31 * 86_400, depth: int = 100):
+        self.store = store
+        self.guild_index = guild_index
+        self.path = path
+        self.interval = interval
+        self.retention = retention
+        self.depth = depth
+        self.logger = logging.getLogger(__name__)
+        self._series: Dict[str, Series] = {}
+        self._baselines: Dict[Tuple[str, int], Dict[str, Entry]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def series_key(guild_id: Optional[int], category: str) -> str:
+        return f"{guild_id or 'global'}:{category}"
+
+    def load(self):
+        """Read saved history; a missing or unreadable file starts it empty."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._series = {key: Series.from_json(series) for key, series in data['series'].items()}
+        except (ValueError, KeyError, TypeError) as e:
+            self.logger.error(f"Ignoring unreadable leaderboard history {self.path}: {e}")
+            return
+        self.logger.info(f"Loaded leaderboard history for {len(self._series)} boards")
+
+    def save(self):
+        data = {'v': FORMAT_VERSION, 'series': {key: series.to_json() for key, series in self._series.items()}}
+        atomic_write(self.path, lambda f: f.write(json.dumps(data, separators=(',', ':')).encode()))
+
+    async def capture(self, now: Optional[float] = None):
+        """Snapshot every board and write the history file."""
+        now = time.time() if now is None else now
+        rankings = await self.store.get_rankings()
+        keys = set()
+        for guild_id in [None, *self.guild_index.guilds()]:
+            members = self.guild_index.members(guild_id) if guild_id is not None else None
+            for category, index in rankings.indexes.items():
+                rows = index.top(self.depth) if members is None else index.top_among(members, self.depth)
+                key = self.series_key(guild_id, category)
+                keys.add(key)
+                state = {user_id: (rank, score) for rank, (user_id, score) in enumerate(rows, 1)}
+                series = self._series.get(key)
+                if series is None:
+                    self._series[key] = Series(state, now)
+                else:
+                    series.record(state, now)
+                    series.prune(now - self.retention)
+            # Large installs have many guilds; let commands run in between
+            await asyncio.sleep(0)
+        for key in self._series.keys() - keys:
+            del self._series[key]
+        self._baselines.clear()
+        await asyncio.to_thread(self.save)
+
+    def baseline(self, guild_id: Optional[int], category: str, seconds: float) -> Optional[Dict[str, Entry]]:
+        """``user_id -> (rank, score)`` as captured ``seconds`` ago, or None if history is that short."""
+        key = self.series_key(guild_id, category)
+        series = self._series.get(key)
+        if series is None:
+            return None
+        index = series.snapshot_index(time.time() - seconds)
+        if index is None:
+            return None
+        rows = self._baselines.get((key, index))
+        if rows is None:
+            rows = self._baselines[(key, index)] = series.state(index)
+        return rows
+
+    def previous_rank(self, guild_id: Optional[int], category: str, user_id: str, seconds: float) -> Optional[int]:
+        """A user's rank ``seconds`` ago if they were in the captured top ``depth``."""
+        rows = self.baseline(guild_id, category, seconds)
+        entry = rows.get(user_id) if rows is not None else None
+        return entry[0] if entry is not None else None
+
+    def start(self):
+        """Start the capture task; call once the event loop is running."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._capture_loop())
+
+    async def _capture_loop(self):
+        last = max((series.captured_at for series in self._series.values()), default=0.0)
+        while True:
+            delay = last + self.interval - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            last = time.time()
+            start = time.perf_counter()
+            try:
+                await self.capture(last)
+            except Exception as e:
+                self.logger.error(f"Leaderboard history capture failed: {e}")
+                continue
+            self.logger.debug(f"Captured {len(self._series)} leaderboards in {time.perf_counter() - start:.2f}s")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            'boards': len(self._series),
+            'snapshots': sum(len(series.undo) + 1 for series in self._series.values()),
+            'entries': sum(len(series.rows) + sum(map(len, (d for _, d in series.undo)))
+                           for series in self._series.values()),
+        }
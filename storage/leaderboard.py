@@ -0,0 +1,223 @@
+"""
+Leaderboard Queries
+Top-K leaderboard pages over the ranking index, cached per guild, category and page.
+"""
+
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from storage.history import PERIODS, LeaderboardHistory, format_rank_change
+from storage.membership import GuildIndex
+from storage.profile_store import ProfileStore
+from storage.ranking import RankKey, split_level_score, split_win_rate_score
+
+# guild, category, page, period
+PageKey = Tuple[Optional[int], str, int, Optional[str]]
+
+
+class LeaderboardPage:
+    """One rendered page: its ``(user_id, score)`` rows and display lines."""
+
+    __slots__ = ('guild_id', 'category', 'page', 'start', 'total', 'rows', 'lines', 'first', 'last',
+                 'expires', 'version', 'period', 'compared')
+
+    def __init__(self, guild_id: Optional[int], category: str, page: int, start: int, total: int,
+                 rows: List[Tuple[str, int]], lines: List[str], expires: float, version: int = 0,
+                 period: Optional[str] = None, compared: bool = False):
+        self.guild_id = guild_id
+        self.category = category
+        self.page = page
+        self.start = start
+        # Ranked users on the whole leaderboard, for page counts
+        self.total = total
+        self.rows = rows
+        self.lines = lines
+        # Key range the page covers, for invalidation
+        self.first: Optional[RankKey] = (-rows[0][1], rows[0][0]) if rows else None
+        self.last: Optional[RankKey] = (-rows[-1][1], rows[-1][0]) if rows else None
+        self.expires = expires
+        # GuildIndex.version when built; a join or leave makes the page stale
+        self.version = version
+        # Look-back the lines carry rank-change arrows for, and whether history reached that far
+        self.period = period
+        self.compared = compared
+
+    def affected_by(self, old: Optional[RankKey], new: Optional[RankKey], full: bool) -> bool:
+        """Whether a key moving from ``old`` to ``new`` changes what the page shows.
+
+        A move entirely above the page or entirely below it leaves every
+        position on the page holding the same user; anything else may not.
+        A missing key (joining or leaving the board) counts as below the
+        page. ``full`` says whether more rows follow the page, since the
+        last page also changes when a user lands below it.
+        """
+        if self.last is None:
+            return True
+        if old is not None and new is not None and old < self.first and new < self.first:
+            return False
+        if full and (old is None or old > self.last) and (new is None or new > self.last):
+            return False
+        return True
+
+
+class LeaderboardEngine:
+    """Builds and caches leaderboard pages for every scope and category.
+
+    Global pages are sliced straight out of the :class:`RankIndex`; server
+    pages pick the guild's best ``page * page_size`` players from the
+    :class:`GuildIndex` with a bounded heap, so neither sorts anything.
+    Rendered pages are cached per ``(guild, category, page)`` for ``ttl``
+    seconds and dropped early only when a rank change actually touches
+    the range of keys a cached page shows, or the guild's membership
+    changes, so repeated ``/leaderboard`` calls after unrelated bets are
+    served from memory. With a :class:`LeaderboardHistory`, pages asked
+    for with a ``period`` mark each row with its rank change since then.
+    """
+
+    def __init__(self, store: ProfileStore, guild_index: GuildIndex,
+                 name_of: Callable[[Optional[int], str], Awaitable[str]],
+                 ttl: float = 30.0, page_size: int = 10,
+                 history: Optional[LeaderboardHistory] = None):
+        self.store = store
+        self.guild_index = guild_index
+        self.history = history
+        self.name_of = name_of
+        self.ttl = ttl
+        self.page_size = page_size
+        self._pages: Dict[PageKey, LeaderboardPage] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # (category, changes) for each page being rendered, collecting rank changes made meanwhile
+        self._rendering: List[Tuple[str, List[tuple]]] = []
+        store.add_rank_listener(self._on_rank_change)
+
+    async def page(self, guild_id: Optional[int], category: str, page: int = 1,
+                   period: Optional[str] = None) -> LeaderboardPage:
+        """Rendered page ``page`` (1-based) of a guild's or the global leaderboard.
+
+        ``period`` is a key of :data:`PERIODS`; rows then show how their
+        rank moved since that long ago.
+        """
+        key = (guild_id, category, page, period)
+        cached = self._pages.get(key)
+        now = time.monotonic()
+        version = self.guild_index.version(guild_id) if guild_id is not None else 0
+        if cached is not None and cached.expires > now and cached.version == version:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        index = (await self.store.get_rankings())[category]
+        start = (page - 1) * self.page_size
+        if guild_id is None:
+            rows = index.top(self.page_size, start)
+            total = len(index)
+        else:
+            members = self.guild_index.members(guild_id)
+            rows = index.top_among(members, self.page_size, start)
+            total = sum(1 for user_id in members if user_id in index)
+        baseline = None
+        if period is not None and self.history is not None:
+            baseline = self.history.baseline(guild_id, category, PERIODS[period])
+        changes: List[tuple] = []
+        rendering = (category, changes)
+        self._rendering.append(rendering)
+        try:
+            lines = await self._render_lines(guild_id, category, start, rows, baseline)
+        finally:
+            self._rendering.remove(rendering)
+        result = LeaderboardPage(guild_id, category, page, start, total, rows, lines, now + self.ttl, version,
+                                 period, baseline is not None)
+        # Rendering awaits name and profile lookups; only a rank change that touches this page's
+        # rows while it did keeps the page out of the cache
+        if not any(self._invalidates(result, *change) for change in changes):
+            self._pages[key] = result
+        return result
+
+    async def _render_lines(self, guild_id: Optional[int], category: str, start: int,
+                            rows: List[Tuple[str, int]], baseline) -> List[str]:
+        lines = []
+        for i, (user_id, score) in enumerate(rows):
+            line = await self._render(guild_id, category, start + i + 1, user_id, score)
+            entry = baseline.get(user_id) if baseline is not None else None
+            # Below the captured depth a missing entry says nothing about the old rank
+            if entry is not None or (baseline is not None and start + i < self.history.depth):
+                change = format_rank_change(entry[0] if entry else None, start + i + 1)
+                if change:
+                    line = f"{line} {change}"
+            lines.append(line)
+        return lines
+
+    async def rank(self, guild_id: Optional[int], category: str, user_id: str) -> Optional[int]:
+        """A user's 1-based rank globally or among a guild's players."""
+        index = (await self.store.get_rankings())[category]
+        if guild_id is None:
+            return index.rank(user_id)
+        return index.rank_among(self.guild_index.members(guild_id), user_id)
+
+    async def score(self, category: str, user_id: str) -> Optional[int]:
+        """A user's current score in a category, or None if not ranked."""
+        return (await self.store.get_rankings())[category].score_of(user_id)
+
+    def page_of(self, rank: int) -> int:
+        """The 1-based page a rank appears on."""
+        return (rank - 1) // self.page_size + 1
+
+    async def describe(self, category: str, user_id: str, score: int) -> str:
+        """Score text shown after a user's name, e.g. ``$1,234`` or ``Level 3 (3,456 XP)``."""
+        if category == 'cash':
+            return f"${score:,}"
+        if category == 'level':
+            level, xp = split_level_score(score)
+            return f"Level {level} ({xp:,} XP)"
+        if category == 'win_rate':
+            percent, games = split_win_rate_score(score)
+            return f"{percent:.1f}% over {games:,} games"
+        if category == 'profit':
+            return f"+${score:,}" if score >= 0 else f"-${-score:,}"
+        if category == 'biggest_win':
+            return f"${score:,} in one bet"
+        # Qualified players' win rates are already in the index
+        rate = (await self.store.get_rankings())['win_rate'].score_of(user_id)
+        if rate is not None:
+            return f"{score:,} wins ({split_win_rate_score(rate)[0]:.1f}%)"
+        profile = await self.store.get_user_profile(user_id)
+        total_games = profile.wins + profile.losses
+        win_rate = (profile.wins / total_games * 100) if total_games > 0 else 0
+        return f"{score:,} wins ({win_rate:.1f}%)"
+
+    async def _render(self, guild_id: Optional[int], category: str, rank: int, user_id: str, score: int) -> str:
+        medal = "🥇" if rank == 1 else "🥈" if rank == 2 else "🥉" if rank == 3 else f"{rank}."
+        return f"{medal} **{await self.name_of(guild_id, user_id)}** - {await self.describe(category, user_id, score)}"
+
+    def _on_rank_change(self, category: str, user_id: str, old: Optional[RankKey], new: Optional[RankKey]):
+        for watched, changes in self._rendering:
+            if watched == category:
+                changes.append((category, user_id, old, new))
+        if not self._pages:
+            return
+        now = time.monotonic()
+        for key, page in list(self._pages.items()):
+            if page.expires <= now:
+                del self._pages[key]
+            elif self._invalidates(page, category, user_id, old, new):
+                del self._pages[key]
+                self.invalidations += 1
+
+    def _invalidates(self, page: LeaderboardPage, category: str, user_id: str,
+                     old: Optional[RankKey], new: Optional[RankKey]) -> bool:
+        """Whether a user's key moving from ``old`` to ``new`` in ``category`` changes ``page``."""
+        if page.category != category or not page.affected_by(old, new, page.start + len(page.rows) < page.total):
+            return False
+        return page.guild_id is None or user_id in self.guild_index.members(page.guild_id)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'pages': len(self._pages),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,136 @@
+"""
+Guild Membership Index
+Maps each guild to the economy players seen in it, so server leaderboards only touch those players.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Set
+
+from storage.snapshot import atomic_write
+
+logger = logging.getLogger(__name__)
+
+
+class GuildIndex:
+    """``guild_id -> {user_id}`` for players known to be in each guild.
+
+    Users are added when they run a command in a guild or join one they
+    already have a profile for, and removed when they leave; the bot drops
+    a whole guild when it is removed from it. The index is kept in memory
+    and written to ``path`` every ``save_interval`` seconds when it changed
+    and again on shutdown. Without the privileged members intent it cannot
+    be rebuilt, so a crash loses at most one interval of changes.
+    """
+
+    def __init__(self, path: str = 'guild_index.json', save_interval: float = 60.0):
+        self.path = path
+        self.save_interval = save_interval
+        self._guilds: Dict[int, Set[str]] = {}
+        self._versions: Dict[int, int] = {}
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def load(self):
+        """Read the saved index; a missing or unreadable file starts it empty."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except ValueError as e:
+            logger.error(f"Ignoring unreadable guild index {self.path}: {e}")
+            return
+        self._guilds = {int(guild_id): set(user_ids) for guild_id, user_ids in data.items()}
+        logger.info(f"Loaded {sum(map(len, self._guilds.values()))} memberships in {len(self._guilds)} guilds")
+
+    def save(self):
+        """Write the index if it changed since it was loaded or last saved."""
+        data = self._encode()
+        if data is not None:
+            self._write(data)
+
+    def _encode(self) -> Optional[bytes]:
+        """The index as JSON if it changed, marking it clean; None when there is nothing to save."""
+        if not self._dirty:
+            return None
+        data = {str(guild_id): sorted(user_ids) for guild_id, user_ids in self._guilds.items() if user_ids}
+        self._dirty = False
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    def _write(self, data: bytes):
+        try:
+            atomic_write(self.path, lambda f: f.write(data))
+        except Exception:
+            self._dirty = True
+            raise
+
+    def start(self):
+        """Start periodic saves; call once the event loop is running."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            # Encoded on the loop so the sets are never read while commands change them
+            data = self._encode()
+            if data is None:
+                continue
+            try:
+                await asyncio.to_thread(self._write, data)
+            except Exception as e:
+                logger.error(f"Failed to save the guild index: {e}")
+
+    async def close(self):
+        """Stop periodic saves and write any remaining changes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.save()
+
+    def add(self, guild_id: int, user_id: str) -> bool:
+        """Record a player in a guild; returns False if they were already there."""
+        members = self._guilds.get(guild_id)
+        if members is None:
+            members = self._guilds[guild_id] = set()
+        elif user_id in members:
+            return False
+        members.add(user_id)
+        self._changed(guild_id)
+        return True
+
+    def discard(self, guild_id: int, user_id: str):
+        members = self._guilds.get(guild_id)
+        if members is not None and user_id in members:
+            members.remove(user_id)
+            self._changed(guild_id)
+
+    def drop_guild(self, guild_id: int):
+        if self._guilds.pop(guild_id, None) is not None:
+            self._changed(guild_id)
+
+    def _changed(self, guild_id: int):
+        self._versions[guild_id] = self._versions.get(guild_id, 0) + 1
+        self._dirty = True
+
+    def version(self, guild_id: int) -> int:
+        """Counter bumped whenever a guild's membership changes, for cache checks."""
+        return self._versions.get(guild_id, 0)
+
+    def guilds(self) -> List[int]:
+        """IDs of guilds with at least one recorded player."""
+        return [guild_id for guild_id, members in self._guilds.items() if members]
+
+    def members(self, guild_id: int) -> Set[str]:
+        """Player IDs recorded for a guild; treat as read-only."""
+        return self._guilds.get(guild_id, set())
@@ -0,0 +1,208 @@
+"""
+Profile Records
+Default profile layout and the delta records every balance change is expressed as.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+# XP needed per level
+XP_PER_LEVEL = 1000
+
+# Profile fields stored as plain numbers, in storage column order
+NUMERIC_FIELDS = ('cash', 'level', 'xp', 'wins', 'losses', 'total_bet', 'total_won', 'biggest_win')
+
+# Sources whose claim time is remembered as ``last_<source>``
+TIMESTAMPED_SOURCES = ('daily', 'work')
+
+# Sparse per-user containers
+NESTED_FIELDS = ('achievements', 'items', 'boosts')
+
+# Last-seen Discord identity, so names render without member caches (None = never seen)
+IDENTITY_FIELDS = ('display_name', 'avatar_hash')
+
+# Largest value any numeric field may hold: the binary snapshot and SQLite both store
+# signed 64-bit integers, so amounts and counters saturate here instead of overflowing
+MAX_AMOUNT = 2 ** 63 - 1
+
+# Starting values for NUMERIC_FIELDS
+DEFAULTS = (1000, 0, 0, 0, 0, 0, 0, 0)
+
+# Every key reachable through ``profile[key]``
+FIELDS = frozenset(NUMERIC_FIELDS + ('last_daily', 'last_work') + NESTED_FIELDS + IDENTITY_FIELDS)
+
+
+def to_epoch(value) -> Optional[int]:
+    """Normalise a stored timestamp (epoch number, digit string or ISO string)."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if value.isdigit():
+        return int(value)
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+class Profile:
+    """One user's economy profile.
+
+    Fields live in ``__slots__`` rather than a per-user dict, claim times are
+    integer epoch seconds (``None`` when never claimed) and the sparse
+    ``achievements``/``items``/``boosts`` dicts are only created when first
+    touched. ``display_name``/``avatar_hash`` hold the Discord identity the
+    user last ran a command with. ``profile['cash']`` style access keeps working for existing
+    call sites.
+    """
+
+    __slots__ = (NUMERIC_FIELDS + ('last_daily', 'last_work') + IDENTITY_FIELDS
+                 + tuple(f"_{f}" for f in NESTED_FIELDS))
+
+    def __init__(self, cash: int = 1000, level: int = 0, xp: int = 0, wins: int = 0,
+                 losses: int = 0, total_bet: int = 0, total_won: int = 0, biggest_win: int = 0,
+                 last_daily: Optional[int] = None, last_work: Optional[int] = None):
+        self.cash = cash
+        self.level = level
+        self.xp = xp
+        self.wins = wins
+        self.losses = losses
+        self.total_bet = total_bet
+        self.total_won = total_won
+        # Largest profit (payout minus bet) from a single bet
+        self.biggest_win = biggest_win
+        self.last_daily = last_daily
+        self.last_work = last_work
+        self.display_name: Optional[str] = None
+        self.avatar_hash: Optional[str] = None
+        self._achievements = None
+        self._items = None
+        self._boosts = None
+
+    @property
+    def achievements(self) -> dict:
+        if self._achievements is None:
+            self._achievements = {}
+        return self._achievements
+
+    @property
+    def items(self) -> dict:
+        if self._items is None:
+            self._items = {}
+        return self._items
+
+    @property
+    def boosts(self) -> dict:
+        if self._boosts is None:
+            self._boosts = {}
+        return self._boosts
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Profile':
+        """Build a profile from a stored dict, filling in missing fields."""
+        profile = cls(*(data.get(f, d) for f, d in zip(NUMERIC_FIELDS, DEFAULTS)))
+        profile.last_daily = to_epoch(data.get('last_daily'))
+        profile.last_work = to_epoch(data.get('last_work'))
+        profile.display_name = data.get('display_name')
+        profile.avatar_hash = data.get('avatar_hash')
+        for field in NESTED_FIELDS:
+            if data.get(field):
+                setattr(profile, f"_{field}", dict(data[field]))
+        return profile
+
+    def to_dict(self) -> dict:
+        """Plain dict for snapshots; untouched nested containers are left out."""
+        data = {f: getattr(self, f) for f in NUMERIC_FIELDS}
+        data['last_daily'] = self.last_daily
+        data['last_work'] = self.last_work
+        for field in IDENTITY_FIELDS:
+            if getattr(self, field) is not None:
+                data[field] = getattr(self, field)
+        for field in NESTED_FIELDS:
+            nested = getattr(self, f"_{field}")
+            if nested:
+                data[field] = dict(nested)
+        return data
+
+    def copy(self) -> 'Profile':
+        """Copy the profile so the original can keep being mutated independently."""
+        copied = Profile(*(getattr(self, f) for f in NUMERIC_FIELDS), self.last_daily, self.last_work)
+        copied.display_name = self.display_name
+        copied.avatar_hash = self.avatar_hash
+        for field in NESTED_FIELDS:
+            nested = getattr(self, f"_{field}")
+            if nested:
+                setattr(copied, f"_{field}", dict(nested))
+        return copied
+
+    # Mapping compatibility for ``profile['cash']`` call sites
+    def __getitem__(self, key: str):
+        if key not in FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value):
+        if key not in FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELDS
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in FIELDS else default
+
+    def keys(self):
+        return iter(FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Profile(cash={self.cash}, level={self.level}, xp={self.xp})"
+
+
+def default_profile() -> Profile:
+    """Return a fresh profile with the starting balance and empty stats."""
+    return Profile()
+
+
+def copy_profile(profile: Profile) -> Profile:
+    """Copy a profile so the original can keep being mutated independently."""
+    return profile.copy()
+
+
+def apply_record(profile: Profile, record: dict) -> bool:
+    """Apply one delta record to a profile.
+
+    Records look like ``{'k': 'bet', 'u': user_id, 'g': game, 'b': bet,
+    'p': payout, 'x': xp, 't': timestamp, 'n': seq}`` or
+    ``{'k': 'credit', 'u': user_id, 'g': source, 'a': amount, 't': timestamp}``
+    with an optional ``'s': 1`` to stamp ``last_<source>`` with the epoch second,
+    or ``{'k': 'seen', 'u': user_id, 'd': display_name, 'h': avatar_hash, 't': timestamp}``.
+
+    Used for live updates and for replay so the two can never drift apart.
+    Totals saturate at :data:`MAX_AMOUNT`. Returns True when the record
+    caused a level up.
+    """
+    kind = record['k']
+    if kind == 'bet':
+        bet, payout = record['b'], record['p']
+        profile.cash = min(profile.cash + payout - bet, MAX_AMOUNT)
+        profile.total_bet = min(profile.total_bet + bet, MAX_AMOUNT)
+        if payout > 0:
+            profile.total_won = min(profile.total_won + payout, MAX_AMOUNT)
+            profile.wins += 1
+            if payout - bet > profile.biggest_win:
+                profile.biggest_win = payout - bet
+        else:
+            profile.losses += 1
+        if record['x']:
+            profile.xp = min(profile.xp + record['x'], MAX_AMOUNT)
+            new_level = profile.xp // XP_PER_LEVEL
+            if new_level > profile.level:
+                profile.level = new_level
+                return True
+    elif kind == 'credit':
+        profile.cash = min(profile.cash + record['a'], MAX_AMOUNT)
+        if record.get('s') and record['g'] in TIMESTAMPED_SOURCES:
+            setattr(profile, f"last_{record['g']}", int(record['t']))
+    elif kind == 'seen':
+        profile.display_name = record['d']
+        profile.avatar_hash = record['h']
+    return False
@@ -0,0 +1,295 @@
+"""
+Profile Store
+Shared store for gambling profiles, used by every cog as the single source of truth.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from storage.backends import StorageBackend
+from storage.cache import ProfileCache
+from storage.profile import MAX_AMOUNT, Profile, apply_record, default_profile
+from storage.ranking import MIN_GAMES, RankKey, Rankings
+
+
+class ProfileStore:
+    """Single source of truth for user profiles.
+
+    One instance is attached to the bot as ``bot.profile_store``; cogs read
+    profiles through :meth:`get_user_profile` and change balances only via
+    :meth:`settle_bet` and :meth:`credit`.
+
+    Profiles are loaded on demand from the :class:`StorageBackend` into a
+    :class:`ProfileCache`, so users who have not played recently are not
+    resident. Every change becomes a small delta record that is applied to
+    the cached profile and buffered; a background task hands buffered
+    records to the backend every ``flush_interval`` seconds, or sooner once
+    ``flush_threshold`` users are dirty. Dirty profiles evicted from the
+    cache are held until their records are written so a reload can never
+    see stale data. :meth:`close` forces a final flush on shutdown.
+
+    :class:`Rankings` over every stored user are built from one backend
+    scan at startup and then updated by each committed record, so rank
+    and top-N queries never need a full scan. ``rank_min_games`` is the
+    number of settled bets a user needs for the win-rate and profit boards.
+    """
+
+    def __init__(self, backend: StorageBackend, flush_interval: float = 5.0,
+                 flush_threshold: int = 100, cache_size: int = 50_000,
+                 cache_bytes: int = 0, rank_min_games: int = MIN_GAMES):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.cache = ProfileCache(cache_size, cache_bytes)
+        self.logger = logging.getLogger(__name__)
+
+        self._seq = 0
+        self._pending: List[dict] = []
+        self._dirty: Set[str] = set()
+        self._writeback: Dict[str, Profile] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._checkpoint_task: Optional[asyncio.Task] = None
+
+        self.rank_min_games = rank_min_games
+        self._rankings = Rankings(rank_min_games)
+        self._rankings_ready = asyncio.Event()
+        self._rankings_task: Optional[asyncio.Task] = None
+        self._unranked: Set[str] = set()
+        self._rank_listeners: List[Callable[[str, str, Optional[RankKey], Optional[RankKey]], None]] = []
+        self._record_listeners: List[Callable[[dict, Profile], None]] = []
+
+    def load(self):
+        """Open the backend; profiles themselves are loaded on first use."""
+        self._seq = self.backend.open()
+
+    async def get_user_profile(self, user_id: str) -> Profile:
+        """Get or create the profile for a user, loading it if not resident."""
+        profile = self.cache.get(user_id)
+        if profile is not None:
+            return profile
+
+        profile = self._writeback.get(user_id)
+        if profile is None:
+            loading = self._loading.get(user_id)
+            if loading is not None:
+                return await asyncio.shield(loading)
+            loading = self._loading[user_id] = asyncio.get_running_loop().create_future()
+            try:
+                profile = await self.backend.load_profile(user_id) or default_profile()
+            except Exception as e:
+                loading.set_exception(e)
+                loading.exception()  # waiters re-raise it; nobody else needs to
+                raise
+            finally:
+                del self._loading[user_id]
+            loading.set_result(profile)
+        self._cache(user_id, profile)
+        return profile
+
+    def _cache(self, user_id: str, profile: Profile):
+        """Insert into the cache, parking dirty evictions until written."""
+        for old_id, old_profile in self.cache.put(user_id, profile):
+            if old_id in self._dirty:
+                self._writeback[old_id] = old_profile
+                self._wakeup.set()
+
+    async def settle_bet(self, user_id: str, game: str, bet: int, payout: int, xp: int = 0) -> Profile:
+        """Record a finished bet and return the updated profile.
+
+        ``payout`` is the gross amount returned to the player including the
+        stake (0 on a loss). Amounts above :data:`MAX_AMOUNT` are capped
+        so every backend can store the record.
+        """
+        return await self._commit({
+            'k': 'bet', 'u': user_id, 'g': game,
+            'b': min(bet, MAX_AMOUNT), 'p': min(payout, MAX_AMOUNT), 'x': min(xp, MAX_AMOUNT), 't': time.time()
+        })
+
+    async def credit(self, user_id: str, source: str, amount: int,
+                     claimed_at: Optional[datetime] = None) -> Profile:
+        """Add non-gambling income such as ``daily`` or ``work`` rewards.
+
+        When ``claimed_at`` is given it is stored as ``last_<source>``.
+        Returns the updated profile.
+        """
+        record = {'k': 'credit', 'u': user_id, 'g': source, 'a': min(amount, MAX_AMOUNT), 't': time.time()}
+        if claimed_at is not None:
+            record['t'] = claimed_at.timestamp()
+            record['s'] = 1
+        return await self._commit(record)
+
+    async def remember_identity(self, user_id: str, display_name: str, avatar_hash: Optional[str]):
+        """Store the name and avatar a player was last seen with, if either changed.
+
+        Only users who already have a stored profile are updated, so
+        commands like ``/help`` never create one.
+        """
+        if not self._rankings_ready.is_set() or user_id not in self._rankings['cash']:
+            return
+        profile = await self.get_user_profile(user_id)
+        if profile.display_name == display_name and profile.avatar_hash == avatar_hash:
+            return
+        await self._commit({'k': 'seen', 'u': user_id, 'd': display_name, 'h': avatar_hash, 't': time.time()})
+
+    async def _commit(self, record: dict) -> Profile:
+        """Apply a record to the resident profile and queue it for the backend."""
+        profile = await self.get_user_profile(record['u'])
+        self._seq += 1
+        record['n'] = self._seq
+        apply_record(profile, record)
+        for listener in self._record_listeners:
+            listener(record, profile)
+        if self._rankings_ready.is_set():
+            for category, old, new in self._rankings.update(record['u'], profile):
+                for listener in self._rank_listeners:
+                    listener(category, record['u'], old, new)
+        else:
+            self._unranked.add(record['u'])
+        self._pending.append(record)
+        self._mark_dirty(record['u'])
+        return profile
+
+    def _mark_dirty(self, user_id: str):
+        """Record that a user has changes waiting for the next flush."""
+        self._dirty.add(user_id)
+        if len(self._dirty) >= self.flush_threshold:
+            self._wakeup.set()
+
+    @property
+    def dirty_count(self) -> int:
+        """Number of users with changes not yet handed to the backend."""
+        return len(self._dirty)
+
+    def cache_stats(self) -> dict:
+        """Cache counters plus write-back state, for sizing the cache."""
+        stats = self.cache.stats()
+        stats['dirty'] = len(self._dirty)
+        stats['writeback'] = len(self._writeback)
+        return stats
+
+    async def scan(self) -> List[Tuple[str, Profile]]:
+        """Return every stored ``(user_id, profile)`` pair after flushing.
+
+        This reads the whole backend and is meant for rare full-table work;
+        the returned profiles must be treated as read-only.
+        """
+        await self.flush()
+        return await self.backend.scan()
+
+    async def get_rankings(self) -> Rankings:
+        """Return the ranking indexes, waiting for the startup build if needed."""
+        if not self._rankings_ready.is_set():
+            if self._rankings_task is None or self._rankings_task.done():
+                self._rankings_task = asyncio.create_task(self._build_rankings())
+            await asyncio.shield(self._rankings_task)
+            if not self._rankings_ready.is_set():
+                raise RuntimeError("The ranking index could not be built; see the log")
+        return self._rankings
+
+    def add_rank_listener(self, listener: Callable[[str, str, Optional[RankKey], Optional[RankKey]], None]):
+        """Call ``listener(category, user_id, old_key, new_key)`` whenever a rank key changes.
+
+        Either key is None when the user is joining or leaving that board.
+        """
+        self._rank_listeners.append(listener)
+
+    def add_record_listener(self, listener: Callable[[dict, Profile], None]):
+        """Call ``listener(record, profile)`` with every committed record and the updated profile."""
+        self._record_listeners.append(listener)
+
+    async def _build_rankings(self):
+        """Rank every stored user once, then catch up on changes made meanwhile."""
+        start = time.perf_counter()
+        try:
+            profiles = await self.backend.scan()
+            rankings = await asyncio.to_thread(Rankings.from_profiles, profiles, self.rank_min_games)
+            del profiles
+            # Users committed during the build may be missing or stale in it
+            while self._unranked:
+                user_id = self._unranked.pop()
+                rankings.update(user_id, await self.get_user_profile(user_id))
+        except Exception as e:
+            self.logger.error(f"Failed to build the ranking index: {e}")
+            return
+        self._rankings = rankings
+        self._rankings_ready.set()
+        self.logger.info(f"Ranked {len(rankings)} profiles in {time.perf_counter() - start:.2f}s")
+
+    def start(self):
+        """Start the background flush and ranking tasks; call once the event loop is running."""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        if self._rankings_task is None:
+            self._rankings_task = asyncio.create_task(self._build_rankings())
+
+    async def _flush_loop(self):
+        """Flush pending records on an interval or when the threshold is hit, until :meth:`close`."""
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self, closing: bool = False):
+        """Write pending records, then checkpoint if the backend asks for it.
+
+        Checkpoints run as a background task so flushes keep going while a
+        snapshot is written; on close the store waits for it instead.
+        """
+        async with self._flush_lock:
+            await self._flush_locked()
+        if closing:
+            if self._checkpoint_task is not None:
+                await self._checkpoint_task
+            if self.backend.checkpoint_due(closing):
+                await self._checkpoint()
+        elif self._checkpoint_task is None or self._checkpoint_task.done():
+            if self.backend.checkpoint_due():
+                self._checkpoint_task = asyncio.create_task(self._checkpoint())
+
+    async def _checkpoint(self):
+        try:
+            await self.backend.checkpoint()
+        except Exception as e:
+            self.logger.error(f"Checkpoint of the {self.backend.name} backend failed: {e}")
+
+    async def _flush_locked(self):
+        if not self._pending:
+            return
+        records, self._pending = self._pending, []
+        dirty, self._dirty = self._dirty, set()
+        try:
+            await self.backend.write(records)
+        except Exception as e:
+            self.logger.error(f"Failed to write {len(records)} records to the {self.backend.name} backend: {e}")
+            self._pending[:0] = records
+            self._dirty |= dirty
+            return
+        # Parked evictions are now safe to drop unless they changed again
+        for user_id in dirty:
+            if user_id not in self._dirty:
+                self._writeback.pop(user_id, None)
+        self.logger.debug(f"Wrote {len(records)} records for {len(dirty)} users")
+
+    async def close(self):
+        """Stop the flush task, write remaining changes and close the backend."""
+        if self._flush_task is not None:
+            # Cancelling is not reliable here: wait_for can swallow a cancel
+            # that lands as _wakeup fires, leaving the loop running forever
+            self._closing = True
+            self._wakeup.set()
+            await self._flush_task
+            self._flush_task = None
+        if self._rankings_task is not None:
+            self._rankings_task.cancel()
+        await self.flush(closing=True)
+        await self.backend.close()
@@ -0,0 +1,298 @@
+"""
+Ranking Index
+Order-statistic indexes that keep every stored user ranked by cash, level, wins, win rate, profit and biggest win.
+"""
+
+import heapq
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from storage.profile import Profile
+
+# ``(-score, user_id)``: ascending key order is the leaderboard order
+RankKey = Tuple[int, str]
+
+# Level ties are broken by XP; both fit in one integer so keys stay flat
+LEVEL_SHIFT = 64
+
+# Win rates are ranked in hundredths of a percent, ties broken by games played
+WIN_RATE_SCALE = 10_000
+WIN_RATE_SHIFT = 32
+
+# Games a player needs before the win-rate and profit boards rank them
+MIN_GAMES = 10
+
+# Score of each category every user is ranked in; higher ranks first
+RANKED_SCORES: Dict[str, Callable[[Profile], int]] = {
+    'cash': lambda profile: profile.cash,
+    'level': lambda profile: (profile.level << LEVEL_SHIFT) + profile.xp,
+    'wins': lambda profile: profile.wins,
+}
+
+
+def ranked_scores(min_games: int = MIN_GAMES) -> Dict[str, Callable[[Profile], Optional[int]]]:
+    """Score functions for every category, including the eligibility-gated ones.
+
+    A score of None keeps the user off that board: win rate and net
+    profit need ``min_games`` settled bets so one lucky game does not top
+    them, and biggest win needs a winning bet.
+    """
+    min_games = max(min_games, 1)
+
+    def win_rate(profile: Profile) -> Optional[int]:
+        games = profile.wins + profile.losses
+        if games < min_games:
+            return None
+        return ((profile.wins * WIN_RATE_SCALE // games) << WIN_RATE_SHIFT) + games
+
+    def profit(profile: Profile) -> Optional[int]:
+        if profile.wins + profile.losses < min_games:
+            return None
+        return profile.total_won - profile.total_bet
+
+    return {
+        **RANKED_SCORES,
+        'win_rate': win_rate,
+        'profit': profit,
+        'biggest_win': lambda profile: profile.biggest_win or None,
+    }
+
+
+def split_level_score(score: int) -> Tuple[int, int]:
+    """Turn a ``level`` score back into ``(level, xp)``."""
+    return score >> LEVEL_SHIFT, score & ((1 << LEVEL_SHIFT) - 1)
+
+
+def split_win_rate_score(score: int) -> Tuple[float, int]:
+    """Turn a ``win_rate`` score back into ``(percent, games)``."""
+    return (score >> WIN_RATE_SHIFT) * 100 / WIN_RATE_SCALE, score & ((1 << WIN_RATE_SHIFT) - 1)
+
+
+class RankIndex:
+    """Users ordered by score, highest first, with logarithmic rank queries.
+
+    Keys are ``(-score, user_id)`` so ties rank by user ID; users whose
+    score is None are left out. Keys live in a
+    list of sorted blocks of roughly ``load`` keys; a Fenwick tree over
+    the block lengths turns "which position is this key at" and "which key
+    is at this position" into O(log n) walks instead of a full sort.
+    """
+
+    def __init__(self, score: Callable[[Profile], Optional[int]], load: int = 512):
+        self.score = score
+        self.load = load
+        self._keys: Dict[str, RankKey] = {}
+        self._blocks: List[List[RankKey]] = []
+        self._maxes: List[RankKey] = []
+        self._tree: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._keys
+
+    def build(self, profiles: Iterable[Tuple[str, Profile]]):
+        """Replace the contents with ``profiles`` in one O(n log n) pass."""
+        self._keys = {}
+        for user_id, profile in profiles:
+            score = self.score(profile)
+            if score is not None:
+                self._keys[user_id] = (-score, user_id)
+        ordered = sorted(self._keys.values())
+        self._blocks = [ordered[i:i + self.load] for i in range(0, len(ordered), self.load)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._rebuild_tree()
+
+    def update(self, user_id: str, profile: Profile) -> bool:
+        """Re-rank one user after a change; returns False if their key is unchanged."""
+        score = self.score(profile)
+        if score is None:
+            if user_id not in self._keys:
+                return False
+            self.discard(user_id)
+            return True
+        key = (-score, user_id)
+        old = self._keys.get(user_id)
+        if old == key:
+            return False
+        if old is not None:
+            self._remove(old)
+        self._insert(key)
+        self._keys[user_id] = key
+        return True
+
+    def discard(self, user_id: str):
+        """Drop a user from the index if present."""
+        key = self._keys.pop(user_id, None)
+        if key is not None:
+            self._remove(key)
+
+    def score_of(self, user_id: str) -> Optional[int]:
+        key = self._keys.get(user_id)
+        return -key[0] if key is not None else None
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based rank of a user, or None if they are not ranked."""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        block = bisect_left(self._maxes, key)
+        return self._prefix(block) + bisect_left(self._blocks[block], key) + 1
+
+    def top(self, count: int, start: int = 0) -> List[Tuple[str, int]]:
+        """``(user_id, score)`` for ranks ``start + 1`` to ``start + count``."""
+        result = []
+        for key in self._iter_from(start):
+            if len(result) >= count:
+                break
+            result.append((key[1], -key[0]))
+        return result
+
+    def key_of(self, user_id: str) -> Optional[RankKey]:
+        """The user's ``(-score, user_id)`` sort key, or None if not ranked."""
+        return self._keys.get(user_id)
+
+    def top_among(self, user_ids: Iterable[str], count: int, start: int = 0) -> List[Tuple[str, int]]:
+        """Like :meth:`top` but ranking only ``user_ids`` (one guild's players, say).
+
+        A bounded heap keeps the best ``start + count`` keys, so this costs
+        O(k log(start + count)) in the size of the subset.
+        """
+        keys = heapq.nsmallest(start + count, (self._keys[u] for u in user_ids if u in self._keys))
+        return [(user_id, -score) for score, user_id in keys[start:]]
+
+    def rank_among(self, user_ids: Iterable[str], user_id: str) -> Optional[int]:
+        """1-based rank of ``user_id`` within ``user_ids``, or None if not ranked."""
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return 1 + sum(1 for u in user_ids if u in self._keys and self._keys[u] < key)
+
+    def __iter__(self) -> Iterator[Tuple[str, int]]:
+        """Every ``(user_id, score)`` from the top down."""
+        for key in self._iter_from(0):
+            yield key[1], -key[0]
+
+    def _iter_from(self, start: int) -> Iterator[RankKey]:
+        if start >= len(self._keys):
+            return
+        block, offset = self._locate(start)
+        for block_keys in self._blocks[block:]:
+            yield from block_keys[offset:]
+            offset = 0
+
+    def _insert(self, key: RankKey):
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            self._rebuild_tree()
+            return
+        block = bisect_left(self._maxes, key)
+        if block == len(self._blocks):
+            block -= 1
+        keys = self._blocks[block]
+        insort(keys, key)
+        self._maxes[block] = keys[-1]
+        if len(keys) > 2 * self.load:
+            self._blocks[block:block + 1] = [keys[:self.load], keys[self.load:]]
+            self._maxes[block:block + 1] = [keys[self.load - 1], keys[-1]]
+            self._rebuild_tree()
+        else:
+            self._add(block, 1)
+
+    def _remove(self, key: RankKey):
+        block = bisect_left(self._maxes, key)
+        keys = self._blocks[block]
+        del keys[bisect_left(keys, key)]
+        if not keys:
+            del self._blocks[block]
+            del self._maxes[block]
+            self._rebuild_tree()
+            return
+        self._maxes[block] = keys[-1]
+        if len(keys) < self.load // 4 and len(self._blocks) > 1:
+            # Fold small blocks into a neighbour so the block count tracks n / load
+            if block == len(self._blocks) - 1:
+                block -= 1
+            merged = self._blocks[block] + self._blocks[block + 1]
+            if len(merged) > 2 * self.load:
+                half = len(merged) // 2
+                self._blocks[block:block + 2] = [merged[:half], merged[half:]]
+                self._maxes[block:block + 2] = [merged[half - 1], merged[-1]]
+            else:
+                self._blocks[block:block + 2] = [merged]
+                self._maxes[block:block + 2] = [merged[-1]]
+            self._rebuild_tree()
+        else:
+            self._add(block, -1)
+
+    # Fenwick tree over block lengths, 1-indexed internally
+
+    def _rebuild_tree(self):
+        tree = [0] + [len(block) for block in self._blocks]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _add(self, block: int, delta: int):
+        i = block + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, block: int) -> int:
+        """Number of keys in blocks before ``block``."""
+        total = 0
+        i = block
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        """Block index and offset of the key at 0-based ``position``."""
+        block = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = block + step
+            if nxt < len(self._tree) and self._tree[nxt] <= position:
+                block = nxt
+                position -= self._tree[nxt]
+            step >>= 1
+        return block, position
+
+
+class Rankings:
+    """One :class:`RankIndex` per category in :func:`ranked_scores`."""
+
+    def __init__(self, min_games: int = MIN_GAMES):
+        self.min_games = min_games
+        self.indexes = {category: RankIndex(score) for category, score in ranked_scores(min_games).items()}
+
+    def __getitem__(self, category: str) -> RankIndex:
+        return self.indexes[category]
+
+    def __len__(self) -> int:
+        return len(self.indexes['cash'])
+
+    @classmethod
+    def from_profiles(cls, profiles: List[Tuple[str, Profile]], min_games: int = MIN_GAMES) -> 'Rankings':
+        rankings = cls(min_games)
+        for index in rankings.indexes.values():
+            index.build(profiles)
+        return rankings
+
+    def update(self, user_id: str, profile: Profile) -> List[Tuple[str, Optional[RankKey], Optional[RankKey]]]:
+        """Re-rank a user everywhere; returns ``(category, old_key, new_key)`` for each change.
+
+        A key of None means the user was not (or is no longer) on that board.
+        """
+        changes = []
+        for category, index in self.indexes.items():
+            old = index.key_of(user_id)
+            if index.update(user_id, profile):
+                changes.append((category, old, index.key_of(user_id)))
+        return changes
@@ -0,0 +1,391 @@
+"""
+Binary Snapshot
+Memory-mapped snapshot format with lazily decoded profiles, plus the atomic writers both snapshot formats share.
+
+Layout (little endian):
+
+* header: magic, version, record count, journal sequence the snapshot covers
+* records: one fixed-width record per user, sorted by numeric user ID, holding
+  the numeric fields, both claim timestamps (0 = never) and the offset and
+  length of the user's entry in the blob area (length 0 = no nested data)
+* blob area: compact JSON of the non-empty ``achievements``/``items``/``boosts``
+  and the last-seen ``display_name``/``avatar_hash``
+
+Lookups binary-search the records in place, so opening a snapshot only maps
+the file and a profile is decoded the first time it is asked for.
+
+Usage:
+    python -m storage.snapshot convert user_data.json user_data.snap
+    python -m storage.snapshot verify user_data.json user_data.snap
+    python -m storage.snapshot export user_data.snap user_data.json
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple, TypeVar
+
+from storage.profile import IDENTITY_FIELDS, NESTED_FIELDS, NUMERIC_FIELDS, Profile
+
+MAGIC = b'GBSNAP\x00\x00'
+VERSION = 2
+
+# magic, version, reserved, record count, journal seq
+HEADER = struct.Struct('<8sIIQQ')
+
+# user id, NUMERIC_FIELDS, last_daily, last_work, blob offset, blob length
+RECORD = struct.Struct(f'<Q{len(NUMERIC_FIELDS)}qqqQI')
+
+# Record layout and numeric field count of each readable version; version 1 predates ``biggest_win``
+RECORDS = {1: (struct.Struct('<Q7qqqQI'), 7), VERSION: (RECORD, len(NUMERIC_FIELDS))}
+
+USER_ID = struct.Struct('<Q')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+T = TypeVar('T')
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a snapshot file exists but cannot be read."""
+
+
+class _Keys:
+    """Sequence view of the sorted user IDs so :mod:`bisect` can search them."""
+
+    def __init__(self, buffer, count: int, record_size: int):
+        self._buffer = buffer
+        self._count = count
+        self._record_size = record_size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> int:
+        return USER_ID.unpack_from(self._buffer, HEADER.size + index * self._record_size)[0]
+
+
+class SnapshotReader:
+    """Read-only, memory-mapped view of a binary snapshot."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise SnapshotFormatError(f"{path} is empty")
+        if len(self._map) < HEADER.size:
+            self.close()
+            raise SnapshotFormatError(f"{path} is truncated")
+        magic, version, _, count, journal_seq = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version not in RECORDS:
+            self.close()
+            raise SnapshotFormatError(f"{path} is not a version {'/'.join(map(str, RECORDS))} binary snapshot")
+        self.journal_seq = journal_seq
+        self._count = count
+        # Older versions store fewer numeric fields; the rest keep their defaults
+        self._record, self._numeric = RECORDS[version]
+        self._blobs = HEADER.size + count * self._record.size
+        if len(self._map) < self._blobs:
+            self.close()
+            raise SnapshotFormatError(f"{path} is truncated")
+        self._keys = _Keys(self._map, count, self._record.size)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, user_id: str) -> Optional[Profile]:
+        """Decode one user's profile, or return None if it is not stored."""
+        try:
+            key = int(user_id)
+        except ValueError:
+            return None
+        index = bisect.bisect_left(self._keys, key)
+        if index == self._count or self._keys[index] != key:
+            return None
+        return self._decode(index)[1]
+
+    def _decode(self, index: int) -> Tuple[str, Profile]:
+        fields = self._record.unpack_from(self._map, HEADER.size + index * self._record.size)
+        end = 1 + self._numeric
+        profile = Profile(*fields[1:end])
+        profile.last_daily = fields[end] or None
+        profile.last_work = fields[end + 1] or None
+        offset, length = fields[end + 2], fields[end + 3]
+        if length:
+            start = self._blobs + offset
+            nested = json.loads(self._map[start:start + length])
+            for field in NESTED_FIELDS:
+                if nested.get(field):
+                    setattr(profile, f"_{field}", nested[field])
+            for field in IDENTITY_FIELDS:
+                setattr(profile, field, nested.get(field))
+        return str(fields[0]), profile
+
+    def __iter__(self) -> Iterator[Tuple[str, Profile]]:
+        """Decode every profile in user ID order."""
+        for index in range(self._count):
+            yield self._decode(index)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def atomic_write(path: str, write: Callable[[BinaryIO], T]) -> T:
+    """Write ``path`` through ``write(f)`` so readers only ever see a complete file.
+
+    The data goes to ``<path>.tmp``, is fsynced and then renamed over
+    ``path``; the directory is fsynced too so the rename survives a crash.
+    An interrupted write leaves the previous file untouched.
+    """
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            result = write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    return result
+
+
+def write_snapshot(f: BinaryIO, profiles: Iterable[Tuple[str, Profile]], journal_seq: int = 0) -> int:
+    """Write ``profiles`` (sorted by numeric user ID) as a binary snapshot to ``f``.
+
+    Records are written as they arrive and the blob area is appended at the
+    end, so the input can be a generator. Returns the number of records.
+    """
+    blobs = []
+    blob_size = 0
+    count = 0
+    previous = -1
+    f.write(HEADER.pack(MAGIC, VERSION, 0, 0, journal_seq))
+    for user_id, profile in profiles:
+        key = int(user_id)
+        if key <= previous:
+            raise ValueError(f"Snapshot input is not sorted by user ID at {user_id}")
+        previous = key
+
+        nested = {
+            field: getattr(profile, f"_{field}")
+            for field in NESTED_FIELDS if getattr(profile, f"_{field}")
+        }
+        nested.update((field, getattr(profile, field)) for field in IDENTITY_FIELDS
+                      if getattr(profile, field) is not None)
+        offset = length = 0
+        if nested:
+            blob = json.dumps(nested, separators=(',', ':')).encode()
+            offset, length = blob_size, len(blob)
+            blobs.append(blob)
+            blob_size += length
+
+        try:
+            f.write(RECORD.pack(
+                key, *(getattr(profile, field) for field in NUMERIC_FIELDS),
+                profile.last_daily or 0, profile.last_work or 0, offset, length
+            ))
+        except struct.error as e:
+            values = ', '.join(f"{field}={getattr(profile, field)}" for field in NUMERIC_FIELDS)
+            raise ValueError(f"Profile {user_id} does not fit a snapshot record ({values}): {e}") from e
+        count += 1
+    f.writelines(blobs)
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, VERSION, 0, count, journal_seq))
+    return count
+
+
+def write_json_snapshot(f: BinaryIO, profiles: Iterable[Tuple[str, Profile]], journal_seq: int = 0) -> int:
+    """Stream ``profiles`` to ``f`` as a compact ``user_data.json`` snapshot.
+
+    Entries are encoded in batches rather than building one large dict, so
+    the writer's peak memory stays small. Returns the number of profiles.
+    """
+    count = 0
+    batch = []
+    f.write(b'{')
+    for user_id, profile in profiles:
+        batch.append(f"{json.dumps(user_id)}:{json.dumps(profile.to_dict(), separators=(',', ':'))},")
+        count += 1
+        if len(batch) >= 10_000:
+            f.write(''.join(batch).encode())
+            batch = []
+    batch.append(f'"__meta__":{{"journal_seq":{journal_seq}}}}}')
+    f.write(''.join(batch).encode())
+    return count
+
+
+def merged(snapshot: Optional[SnapshotReader], overlay: Dict[str, Profile]) -> Iterator[Tuple[str, Profile]]:
+    """Yield a snapshot's profiles with ``overlay`` replacing or adding users, in order."""
+    pending = sorted(overlay.items(), key=lambda item: int(item[0]))
+    i = 0
+    for user_id, profile in snapshot or ():
+        key = int(user_id)
+        while i < len(pending) and int(pending[i][0]) < key:
+            yield pending[i]
+            i += 1
+        if i < len(pending) and int(pending[i][0]) == key:
+            yield pending[i]
+            i += 1
+        else:
+            yield user_id, profile
+    yield from pending[i:]
+
+
+def iter_json_entries(f: TextIO, chunk_size: int = 1 << 20,
+                      max_entry: int = 16 << 20) -> Iterator[Tuple[str, object]]:
+    """Yield the top-level ``key, value`` pairs of a JSON object read from ``f``.
+
+    The file is read ``chunk_size`` characters at a time and each value is
+    decoded on its own, so only one entry is ever held in memory. An entry
+    larger than ``max_entry`` characters is treated as corrupt.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = '', 0, False
+
+    def more() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer, pos = buffer[pos:] + chunk, 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer):
+                return buffer[pos]
+            if not more():
+                raise SnapshotFormatError("Unexpected end of JSON snapshot")
+
+    def expect(chars: str) -> str:
+        nonlocal pos
+        char = peek()
+        if char not in chars:
+            raise SnapshotFormatError(f"Expected {' or '.join(map(repr, chars))} but found {char!r}")
+        pos += 1
+        return char
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if len(buffer) - pos > max_entry or not more():
+                    raise SnapshotFormatError(f"Corrupt JSON snapshot: {e}") from None
+                continue
+            # A number ending exactly at the chunk boundary may continue in the next one
+            if end == len(buffer) and more():
+                continue
+            pos = end
+            return result
+
+    expect('{')
+    if peek() == '}':
+        return
+    while True:
+        key = value()
+        if not isinstance(key, str):
+            raise SnapshotFormatError(f"Expected a string key but found {key!r}")
+        expect(':')
+        yield key, value()
+        if expect(',}') == '}':
+            return
+
+
+def load_json_profiles(path: str) -> Tuple[Dict[str, Profile], int]:
+    """Read a ``user_data.json`` snapshot into profiles plus its journal sequence."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    journal_seq = data.pop('__meta__', {}).get('journal_seq', 0)
+    return {uid: Profile.from_dict(p) for uid, p in data.items()}, journal_seq
+
+
+def convert(json_path: str, snapshot_path: str):
+    """Convert a JSON snapshot into a binary snapshot."""
+    start = time.perf_counter()
+    profiles, journal_seq = load_json_profiles(json_path)
+    ordered = sorted(profiles.items(), key=lambda item: int(item[0]))
+    count = atomic_write(snapshot_path, lambda f: write_snapshot(f, ordered, journal_seq))
+    print(f"Wrote {count:,} profiles to {snapshot_path} "
+          f"({os.path.getsize(snapshot_path) / 1024 / 1024:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+
+def verify(json_path: str, snapshot_path: str) -> bool:
+    """Check that a binary snapshot holds exactly the profiles in a JSON snapshot."""
+    profiles, journal_seq = load_json_profiles(json_path)
+    snapshot = SnapshotReader(snapshot_path)
+    problems = []
+    if snapshot.journal_seq != journal_seq:
+        problems.append(f"journal_seq {snapshot.journal_seq} != {journal_seq}")
+    seen = 0
+    for user_id, profile in snapshot:
+        seen += 1
+        expected = profiles.get(user_id)
+        if expected is None:
+            problems.append(f"{user_id}: not in {json_path}")
+        elif expected.to_dict() != profile.to_dict():
+            problems.append(f"{user_id}: {profile.to_dict()} != {expected.to_dict()}")
+    if seen != len(profiles):
+        problems.append(f"{seen:,} profiles in {snapshot_path}, {len(profiles):,} in {json_path}")
+    snapshot.close()
+
+    for problem in problems[:20]:
+        print(problem)
+    print(f"{'FAILED' if problems else 'OK'}: {seen:,} profiles checked, {len(problems)} problems")
+    return not problems
+
+
+def export(snapshot_path: str, json_path: str):
+    """Write a binary snapshot back out as a JSON snapshot."""
+    snapshot = SnapshotReader(snapshot_path)
+    count = atomic_write(json_path, lambda f: write_json_snapshot(f, snapshot, snapshot.journal_seq))
+    snapshot.close()
+    print(f"Wrote {count:,} profiles to {json_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert and verify binary profile snapshots")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for name, first, second in (('convert', 'json_path', 'snapshot_path'),
+                                ('verify', 'json_path', 'snapshot_path'),
+                                ('export', 'snapshot_path', 'json_path')):
+        command = commands.add_parser(name)
+        command.add_argument(first)
+        command.add_argument(second)
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        convert(args.json_path, args.snapshot_path)
+    elif args.command == 'verify':
+        sys.exit(0 if verify(args.json_path, args.snapshot_path) else 1)
+    else:
+        export(args.snapshot_path, args.json_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+SQLite Storage Backend
+WAL-mode SQLite persistence with every query run on one dedicated worker thread.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from storage.backends import StorageBackend, check_migrated
+from storage.profile import (IDENTITY_FIELDS, MAX_AMOUNT, NESTED_FIELDS, NUMERIC_FIELDS, TIMESTAMPED_SOURCES,
+                             XP_PER_LEVEL, Profile, to_epoch)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    cash INTEGER NOT NULL DEFAULT 1000,
+    level INTEGER NOT NULL DEFAULT 0,
+    xp INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    total_bet INTEGER NOT NULL DEFAULT 0,
+    total_won INTEGER NOT NULL DEFAULT 0,
+    biggest_win INTEGER NOT NULL DEFAULT 0,
+    last_daily INTEGER,
+    last_work INTEGER,
+    display_name TEXT,
+    avatar_hash TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+""" + "".join(f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    user_id TEXT NOT NULL REFERENCES profiles(user_id),
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (user_id, key)
+) WITHOUT ROWID;
+""" for table in NESTED_FIELDS)
+
+ENSURE_SQL = "INSERT OR IGNORE INTO profiles (user_id) VALUES (?)"
+
+# Sums saturate at MAX_AMOUNT like apply_record: adding at most MAX_AMOUNT - column never
+# leaves SQLite's 64-bit integers, where an overflow would silently turn the column REAL
+BET_SQL = f"""
+UPDATE profiles SET
+    cash = cash + MIN(?, {MAX_AMOUNT} - cash),
+    total_bet = total_bet + MIN(?, {MAX_AMOUNT} - total_bet),
+    total_won = total_won + MIN(?, {MAX_AMOUNT} - total_won),
+    biggest_win = MAX(biggest_win, ?),
+    wins = wins + ?,
+    losses = losses + ?,
+    level = MAX(level, (xp + MIN(?, {MAX_AMOUNT} - xp)) / {XP_PER_LEVEL}),
+    xp = xp + MIN(?, {MAX_AMOUNT} - xp)
+WHERE user_id = ?
+"""
+
+# Record fields holding amounts, by record kind
+AMOUNT_FIELDS = {'bet': ('b', 'p', 'x'), 'credit': ('a',), 'seen': ()}
+
+SEEN_SQL = "UPDATE profiles SET display_name = ?, avatar_hash = ? WHERE user_id = ?"
+
+STAMP_SQL = {
+    source: f"UPDATE profiles SET last_{source} = ? WHERE user_id = ?"
+    for source in TIMESTAMPED_SOURCES
+}
+
+PROFILE_COLUMNS = ('user_id',) + NUMERIC_FIELDS + ('last_daily', 'last_work') + IDENTITY_FIELDS
+
+# Columns added after the first release, created on open for older databases
+ADDED_COLUMNS = {
+    'biggest_win': "INTEGER NOT NULL DEFAULT 0",
+    'display_name': "TEXT",
+    'avatar_hash': "TEXT",
+}
+
+
+def _bounded(value: int) -> int:
+    """Clamp a coalesced delta into SQLite's integer range."""
+    return max(-MAX_AMOUNT, min(value, MAX_AMOUNT))
+
+
+def _row_to_profile(row: tuple) -> Profile:
+    """Build a profile from a ``PROFILE_COLUMNS`` row.
+
+    Databases created before timestamps became epoch integers hold ISO
+    strings in ``last_daily``/``last_work``; both forms are accepted.
+    """
+    end = 1 + len(NUMERIC_FIELDS)
+    profile = Profile(*row[1:end])
+    profile.last_daily = to_epoch(row[end])
+    profile.last_work = to_epoch(row[end + 1])
+    profile.display_name, profile.avatar_hash = row[end + 2:end + 4]
+    return profile
+
+
+class SQLiteBackend(StorageBackend):
+    """One row per user plus child tables for achievements, items and boosts.
+
+    The connection lives on a single-thread executor so SQLite never runs on
+    the event loop. Each batch of records is coalesced per user and applied
+    as relative ``UPDATE ... SET cash = cash + ?`` statements in one
+    transaction, together with the sequence number of the last record.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = 'user_data.db', legacy_path: Optional[str] = None):
+        self.path = path
+        # user_data.json this database replaces; opening it empty while that file exists is refused
+        self.legacy_path = legacy_path
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite')
+        self._conn: sqlite3.Connection = self._executor.submit(self._connect).result()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        existing = {row[1] for row in conn.execute("PRAGMA table_info(profiles)")}
+        for column, definition in ADDED_COLUMNS.items():
+            if column not in existing:
+                conn.execute(f"ALTER TABLE profiles ADD COLUMN {column} {definition}")
+        return conn
+
+    async def _run(self, fn, *args):
+        """Run ``fn`` on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    def open(self) -> int:
+        return self._executor.submit(self._last_seq).result()
+
+    def _last_seq(self) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'journal_seq'").fetchone()
+        count = self._conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+        if not count:
+            check_migrated(self.name, self.path, self.legacy_path)
+        self.logger.info(f"Opened {self.path} with {count} profiles")
+        return row[0] if row else 0
+
+    async def load_profile(self, user_id: str) -> Optional[Profile]:
+        return await self._run(self._load_profile_sync, user_id)
+
+    def _load_profile_sync(self, user_id: str) -> Optional[Profile]:
+        row = self._conn.execute(
+            f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        profile = _row_to_profile(row)
+        for table in NESTED_FIELDS:
+            for key, value in self._conn.execute(f"SELECT key, value FROM {table} WHERE user_id = ?", (user_id,)):
+                getattr(profile, table)[key] = json.loads(value)
+        return profile
+
+    async def scan(self) -> List[Tuple[str, Profile]]:
+        return await self._run(self._scan_sync)
+
+    def _scan_sync(self) -> List[Tuple[str, Profile]]:
+        profiles = {}
+        for row in self._conn.execute(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM profiles"):
+            profiles[row[0]] = _row_to_profile(row)
+        for table in NESTED_FIELDS:
+            for user_id, key, value in self._conn.execute(f"SELECT user_id, key, value FROM {table}"):
+                getattr(profiles[user_id], table)[key] = json.loads(value)
+        return list(profiles.items())
+
+    async def write(self, records: List[dict]):
+        await self._run(self._write_sync, records)
+
+    def _write_sync(self, records: List[dict]):
+        # Coalesce the batch into one delta per user
+        deltas: Dict[str, list] = {}
+        stamps: Dict[Tuple[str, str], int] = {}
+        identities: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for record in records:
+            if not self._storable(record):
+                continue
+            delta = deltas.get(record['u'])
+            if delta is None:
+                # cash, total_bet, total_won, wins, losses, xp, biggest_win
+                delta = deltas[record['u']] = [0, 0, 0, 0, 0, 0, 0]
+            if record['k'] == 'bet':
+                bet, payout = record['b'], record['p']
+                delta[0] += payout - bet
+                delta[1] += bet
+                if payout > 0:
+                    delta[2] += payout
+                    delta[3] += 1
+                    delta[6] = max(delta[6], payout - bet)
+                else:
+                    delta[4] += 1
+                delta[5] += record['x']
+            elif record['k'] == 'credit':
+                delta[0] += record['a']
+                if record.get('s') and record['g'] in STAMP_SQL:
+                    stamps[(record['g'], record['u'])] = int(record['t'])
+            elif record['k'] == 'seen':
+                identities[record['u']] = (record['d'], record['h'])
+
+        with self._conn:
+            self._conn.executemany(ENSURE_SQL, ((uid,) for uid in deltas))
+            self._conn.executemany(BET_SQL, (
+                tuple(_bounded(value) for value in (d[0], d[1], d[2], d[6], d[3], d[4], d[5], d[5])) + (uid,)
+                for uid, d in deltas.items()
+            ))
+            for (source, uid), stamp in stamps.items():
+                self._conn.execute(STAMP_SQL[source], (stamp, uid))
+            self._conn.executemany(SEEN_SQL, ((name, avatar, uid) for uid, (name, avatar) in identities.items()))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('journal_seq', ?)",
+                (records[-1]['n'],)
+            )
+
+    def _storable(self, record: dict) -> bool:
+        """Whether a record's amounts fit SQLite's integers.
+
+        A bad record is logged and skipped, so it cannot make the whole
+        batch fail and keep every other user's writes from landing.
+        """
+        for field in AMOUNT_FIELDS.get(record['k'], ()):
+            value = record[field]
+            if not isinstance(value, int) or not -MAX_AMOUNT <= value <= MAX_AMOUNT:
+                self.logger.error(f"Skipping record {record.get('n')} for user {record['u']}: "
+                                  f"{field}={value!r} does not fit a 64-bit integer")
+                return False
+        return True
+
+    def import_profiles(self, profiles: Iterable[Tuple[str, dict]], journal_seq: Optional[int] = None):
+        """Bulk insert or replace full profiles (dicts or Profiles); used for migrations and benchmarks.
+
+        Pass ``journal_seq`` to record the journal sequence the imported data covers.
+        """
+        self._executor.submit(self._import_sync, profiles, journal_seq).result()
+
+    def _import_sync(self, profiles: Iterable[Tuple[str, dict]], journal_seq: Optional[int]):
+        placeholders = ', '.join('?' * len(PROFILE_COLUMNS))
+        with self._conn:
+            if journal_seq is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('journal_seq', ?)", (journal_seq,)
+                )
+            for user_id, profile in profiles:
+                if isinstance(profile, Profile):
+                    profile = profile.to_dict()
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO profiles ({', '.join(PROFILE_COLUMNS)}) VALUES ({placeholders})",
+                    (user_id,) + tuple(profile.get(f, 0) for f in NUMERIC_FIELDS)
+                    + (to_epoch(profile.get('last_daily')), to_epoch(profile.get('last_work')))
+                    + tuple(profile.get(f) for f in IDENTITY_FIELDS)
+                )
+                for table in NESTED_FIELDS:
+                    for key, value in (profile.get(table) or {}).items():
+                        self._conn.execute(
+                            f"INSERT OR REPLACE INTO {table} (user_id, key, value) VALUES (?, ?, ?)",
+                            (user_id, key, json.dumps(value))
+                        )
+
+    async def close(self):
+        await self._run(self._conn.close)
+        self._executor.shutdown(wait=True)
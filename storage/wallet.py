@@ -0,0 +1,162 @@
+"""
+Wallet
+Per-user transactions that check funds, reserve stakes and settle them through the ProfileStore.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional
+
+from storage.profile import Profile
+from storage.profile_store import ProfileStore
+
+
+class InsufficientFunds(Exception):
+    """Raised when a stake is larger than the user's available balance."""
+
+    def __init__(self, user_id: str, amount: int, available: int):
+        super().__init__(f"User {user_id} cannot stake {amount} with {available} available")
+        self.user_id = user_id
+        self.amount = amount
+        self.available = available
+
+
+class Hold:
+    """A stake reserved against a user's balance until it is settled or released.
+
+    A hold normally lives inside one :class:`Transaction`, but games that span
+    several interactions (blackjack) detach it with :meth:`Transaction.hold`
+    and hand it back to a later transaction to settle.
+    """
+
+    __slots__ = ('wallet', 'user_id', 'amount', 'active')
+
+    def __init__(self, wallet: 'Wallet', user_id: str, amount: int):
+        self.wallet = wallet
+        self.user_id = user_id
+        self.amount = amount
+        self.active = True
+
+    def release(self):
+        """Return the stake to the available balance; safe to call twice."""
+        if self.active:
+            self.active = False
+            self.wallet._release(self.user_id, self.amount)
+
+
+class Transaction:
+    """One user's locked unit of work, yielded by :meth:`Wallet.transaction`.
+
+    Call :meth:`reserve` once the bet is known, then :meth:`settle` with the
+    outcome. Leaving the block without settling, or through an exception,
+    rolls the reservation back so nothing is charged.
+    """
+
+    def __init__(self, wallet: 'Wallet', user_id: str, profile: Profile, hold: Optional[Hold] = None):
+        self.wallet = wallet
+        self.user_id = user_id
+        self.profile = profile
+        self._hold = hold if hold is not None and hold.active else None
+        self._detached = False
+
+    @property
+    def available(self) -> int:
+        """Cash not tied up in reserved stakes, including this transaction's."""
+        return self.profile.cash - self.wallet.held(self.user_id)
+
+    @property
+    def stake(self) -> int:
+        """The reserved stake, or 0 if nothing is reserved."""
+        return self._hold.amount if self._hold is not None else 0
+
+    def reserve(self, amount: int):
+        """Check funds and set ``amount`` aside as this transaction's stake."""
+        if self._hold is not None:
+            raise RuntimeError("A stake is already reserved in this transaction")
+        if amount <= 0 or amount > self.available:
+            raise InsufficientFunds(self.user_id, amount, self.available)
+        self._hold = self.wallet._reserve(self.user_id, amount)
+
+    def hold(self) -> Hold:
+        """Detach the reserved stake so it outlives this transaction."""
+        if self._hold is None:
+            raise RuntimeError("No stake is reserved in this transaction")
+        self._detached = True
+        return self._hold
+
+    async def settle(self, game: str, payout: int, xp: int = 0) -> Profile:
+        """Commit the reserved stake as a finished bet paying ``payout`` (gross)."""
+        if self._hold is None or not self._hold.active:
+            raise RuntimeError("No stake is reserved in this transaction")
+        hold, self._hold = self._hold, None
+        hold.release()
+        self.profile = await self.wallet.store.settle_bet(self.user_id, game, hold.amount, payout, xp)
+        return self.profile
+
+    async def credit(self, source: str, amount: int, claimed_at: Optional[datetime] = None) -> Profile:
+        """Add non-gambling income inside the transaction."""
+        self.profile = await self.wallet.store.credit(self.user_id, source, amount, claimed_at)
+        return self.profile
+
+    def rollback(self):
+        """Release the reserved stake unless it was settled or detached."""
+        if self._hold is not None and not self._detached:
+            self._hold.release()
+        self._hold = None
+
+
+class Wallet:
+    """Serialises balance changes per user on top of the :class:`ProfileStore`.
+
+    Each user has their own lock, created on demand and dropped when nobody
+    is waiting on it, so commands from different users never contend.
+    Reserved stakes are tracked per user and subtracted from the available
+    balance until they are settled or released.
+    """
+
+    def __init__(self, store: ProfileStore):
+        self.store = store
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+        self._held: Dict[str, int] = {}
+
+    def held(self, user_id: str) -> int:
+        """Total stake currently reserved for a user."""
+        return self._held.get(user_id, 0)
+
+    def _reserve(self, user_id: str, amount: int) -> Hold:
+        self._held[user_id] = self._held.get(user_id, 0) + amount
+        return Hold(self, user_id, amount)
+
+    def _release(self, user_id: str, amount: int):
+        remaining = self._held.get(user_id, 0) - amount
+        if remaining > 0:
+            self._held[user_id] = remaining
+        else:
+            self._held.pop(user_id, None)
+
+    @asynccontextmanager
+    async def transaction(self, user_id: str, hold: Optional[Hold] = None) -> AsyncIterator[Transaction]:
+        """Lock ``user_id`` and yield a :class:`Transaction` for their profile.
+
+        Pass a detached ``hold`` to settle a stake reserved by an earlier
+        transaction.
+        """
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        self._users[user_id] = self._users.get(user_id, 0) + 1
+        try:
+            async with lock:
+                profile = await self.store.get_user_profile(user_id)
+                transaction = Transaction(self, user_id, profile, hold)
+                try:
+                    yield transaction
+                finally:
+                    transaction.rollback()
+        finally:
+            self._users[user_id] -= 1
+            if not self._users[user_id]:
+                del self._users[user_id]
+                del self._locks[user_id]
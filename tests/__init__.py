@@ -0,0 +1,6 @@
+"""
+Tests for the Discord bot.
+Covers the storage layer, rankings, wallet and samplers without a Discord connection.
+"""
+
+# This file makes the tests directory a Python package
@@ -0,0 +1,62 @@
+"""
+Economy Tests
+CashSketch quantiles stay within the sketch's relative accuracy and removals undo insertions exactly.
+"""
+
+import random
+import unittest
+
+from storage.economy import CashSketch
+
+
+def exact_quantile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def exact_gini(values) -> float:
+    ordered = sorted(values)
+    total = sum(ordered)
+    weighted = sum((2 * i - len(ordered) + 1) * value for i, value in enumerate(ordered))
+    return weighted / (len(ordered) * total)
+
+
+class CashSketchTests(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(9)
+        # Heavy-tailed like real balances, with a few players at or below zero
+        self.values = [int(rng.paretovariate(1.2) * 500) for _ in range(20_000)] + [0, -300, 0]
+
+    def test_quantiles(self):
+        sketch = CashSketch.from_values(self.values, accuracy=0.01)
+        fractions = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+        for fraction, estimate in zip(fractions, sketch.quantiles(fractions)):
+            exact = exact_quantile(self.values, fraction)
+            self.assertLessEqual(abs(estimate - exact), 0.01 * exact + 1e-9, f"quantile {fraction}")
+
+    def test_gini(self):
+        sketch = CashSketch.from_values(self.values, accuracy=0.01)
+        self.assertAlmostEqual(sketch.gini(), exact_gini(self.values), delta=0.01)
+
+    def test_add_remove(self):
+        built = CashSketch.from_values(self.values)
+        streamed = CashSketch()
+        for value in self.values + [10, 20, 30]:
+            streamed.add(value)
+        for value in (10, 20, 30):
+            streamed.remove(value)
+        self.assertEqual((streamed.count, streamed.total), (built.count, built.total))
+        self.assertEqual(streamed._ascending(), built._ascending())
+
+        # Removing a balance that was never added is ignored
+        streamed.remove(123_456_789)
+        self.assertEqual(streamed.count, built.count)
+
+    def test_empty(self):
+        sketch = CashSketch()
+        self.assertEqual(sketch.quantiles([0.5]), [None])
+        self.assertEqual(sketch.gini(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
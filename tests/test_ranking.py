@@ -0,0 +1,100 @@
+"""
+Ranking Tests
+RankIndex answers rank, top and subset queries exactly as a full sort would, through inserts, moves and removals.
+"""
+
+import random
+import unittest
+from typing import Dict, List, Tuple
+
+from storage.profile import Profile
+from storage.ranking import RANKED_SCORES, RankIndex, Rankings, ranked_scores
+
+
+def reference(cash: Dict[str, int]) -> List[Tuple[str, int]]:
+    """Every ``(user_id, score)`` ordered the way the index promises: score down, then user ID."""
+    return sorted(cash.items(), key=lambda item: (-item[1], item[0]))
+
+
+class RankIndexTests(unittest.TestCase):
+    def setUp(self):
+        # A tiny block size so blocks split and empty many times over
+        self.index = RankIndex(RANKED_SCORES['cash'], load=4)
+        self.cash: Dict[str, int] = {}
+        self.rng = random.Random(11)
+
+    def set_cash(self, user_id: str, cash: int):
+        self.cash[user_id] = cash
+        self.index.update(user_id, Profile(cash=cash))
+
+    def assert_matches(self):
+        expected = reference(self.cash)
+        self.assertEqual(list(self.index), expected)
+        self.assertEqual(len(self.index), len(expected))
+        for position, (user_id, score) in enumerate(expected, 1):
+            self.assertEqual(self.index.rank(user_id), position)
+            self.assertEqual(self.index.score_of(user_id), score)
+        for start in (0, 1, 7, len(expected) - 3, len(expected) + 5):
+            self.assertEqual(self.index.top(10, start), expected[max(start, 0):start + 10])
+
+    def test_random_updates(self):
+        for step in range(2000):
+            user_id = str(self.rng.randrange(150))
+            if user_id in self.cash and self.rng.random() < 0.2:
+                del self.cash[user_id]
+                self.index.discard(user_id)
+            else:
+                # Few distinct scores, so ties must fall back to user ID order
+                self.set_cash(user_id, self.rng.randrange(-50, 50) * 100)
+            if step % 100 == 0:
+                self.assert_matches()
+        self.assert_matches()
+
+    def test_build_matches_updates(self):
+        for user_id in map(str, range(300)):
+            self.set_cash(user_id, self.rng.randrange(10_000))
+        built = RankIndex(RANKED_SCORES['cash'], load=4)
+        built.build((user_id, Profile(cash=cash)) for user_id, cash in self.cash.items())
+        self.assertEqual(list(built), list(self.index))
+        self.assert_matches()
+
+    def test_subset_queries(self):
+        for user_id in map(str, range(200)):
+            self.set_cash(user_id, self.rng.randrange(1_000))
+        members = {str(u) for u in self.rng.sample(range(250), 60)}
+        expected = [(u, s) for u, s in reference(self.cash) if u in members]
+        self.assertEqual(self.index.top_among(members, 10), expected[:10])
+        self.assertEqual(self.index.top_among(members, 10, 20), expected[20:30])
+        for position, (user_id, _) in enumerate(expected, 1):
+            self.assertEqual(self.index.rank_among(members, user_id), position)
+        self.assertIsNone(self.index.rank_among(members, '999'))
+
+
+class RankingsTests(unittest.TestCase):
+    def test_gated_categories(self):
+        rankings = Rankings(min_games=3)
+        newcomer = Profile(wins=1, losses=1, total_won=500, total_bet=100, biggest_win=400)
+        rankings.update('1', newcomer)
+        self.assertIn('1', rankings['cash'])
+        self.assertNotIn('1', rankings['win_rate'])
+        self.assertNotIn('1', rankings['profit'])
+        self.assertEqual(rankings['biggest_win'].score_of('1'), 400)
+
+        regular = Profile(wins=2, losses=1, total_won=500, total_bet=100)
+        changes = {category for category, _, _ in rankings.update('1', regular)}
+        self.assertIn('win_rate', changes)
+        self.assertEqual(rankings['profit'].score_of('1'), 400)
+        self.assertNotIn('1', rankings['biggest_win'])
+
+    def test_from_profiles(self):
+        rng = random.Random(3)
+        profiles = [(str(u), Profile(cash=rng.randrange(5000), wins=rng.randrange(20), losses=rng.randrange(20)))
+                    for u in range(100)]
+        rankings = Rankings.from_profiles(profiles)
+        for category, score in ranked_scores().items():
+            scored = {user_id: score(profile) for user_id, profile in profiles if score(profile) is not None}
+            self.assertEqual(list(rankings[category]), reference(scored))
+
+
+if __name__ == '__main__':
+    unittest.main()
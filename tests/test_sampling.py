@@ -0,0 +1,70 @@
+"""
+Sampling Tests
+Alias samplers draw each item in proportion to its weight and match the reels they replaced.
+"""
+
+import random
+import unittest
+from collections import Counter
+
+from engine.slots import SLOT_REEL, SLOT_SYMBOLS, VISUAL_SLOT_REEL, VISUAL_SLOT_SYMBOLS
+from utils.sampling import AliasSampler
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DRAWS = 200_000
+
+
+class AliasSamplerTests(unittest.TestCase):
+    def assert_distribution(self, sampler: AliasSampler, counts: Counter, draws: int):
+        for item in sampler.items:
+            p = sampler.probability(item)
+            # Five standard deviations: a correct table fails about once in two million runs
+            tolerance = 5 * (p * (1 - p) / draws) ** 0.5
+            self.assertAlmostEqual(counts[item] / draws, p, delta=tolerance, msg=f"item {item!r}")
+
+    def test_sample(self):
+        sampler = AliasSampler({'a': 1, 'b': 2, 'c': 7, 'd': 0.5})
+        rng = random.Random(5)
+        self.assert_distribution(sampler, Counter(sampler.sample(rng) for _ in range(DRAWS)), DRAWS)
+
+    def test_sample_many(self):
+        sampler = AliasSampler({'a': 1, 'b': 2, 'c': 7, 'd': 0.5})
+        self.assert_distribution(sampler, Counter(sampler.sample_many(DRAWS, random.Random(5))), DRAWS)
+
+    def test_reels_match_paytables(self):
+        for reel, weights in ((SLOT_REEL, {s: d['weight'] for s, d in SLOT_SYMBOLS.items()}),
+                              (VISUAL_SLOT_REEL, {s: 20 - d['rarity'] for s, d in VISUAL_SLOT_SYMBOLS.items()})):
+            total = sum(weights.values())
+            for symbol, weight in weights.items():
+                self.assertAlmostEqual(reel.probability(symbol), weight / total)
+
+    def test_table_covers_weights(self):
+        sampler = AliasSampler({'a': 3, 'b': 1, 'c': 1, 'd': 5})
+        # Each slot is worth 1/n; its cut-off goes to the item, the rest to the alias
+        mass = Counter()
+        for item, cutoff, alias in sampler.table():
+            mass[item] += cutoff / len(sampler)
+            mass[alias] += (1 - cutoff) / len(sampler)
+        for item in sampler.items:
+            self.assertAlmostEqual(mass[item], sampler.probability(item))
+
+    def test_invalid_weights(self):
+        with self.assertRaises(ValueError):
+            AliasSampler({'a': 0})
+        with self.assertRaises(ValueError):
+            AliasSampler({'a': 1, 'b': -1})
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_sample_indices(self):
+        sampler = AliasSampler({'a': 1, 'b': 2, 'c': 7, 'd': 0.5})
+        indices = sampler.sample_indices(np.random.default_rng(5), DRAWS)
+        counts = Counter({sampler.items[i]: int(n) for i, n in enumerate(np.bincount(indices))})
+        self.assert_distribution(sampler, counts, DRAWS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Snapshot Tests
+Binary and JSON snapshots round-trip every profile field, and version 1 binary snapshots still load.
+"""
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from storage.profile import MAX_AMOUNT, Profile
+from storage.snapshot import (HEADER, MAGIC, RECORDS, SnapshotFormatError, SnapshotReader, atomic_write,
+                              load_json_profiles, write_json_snapshot, write_snapshot)
+
+
+def sample_profiles():
+    rich = Profile(cash=MAX_AMOUNT, level=12, xp=345, wins=60, losses=40, total_bet=9_000,
+                   total_won=12_000, biggest_win=2_500, last_daily=1_700_000_000, last_work=1_700_003_600)
+    rich.display_name = 'Lucky'
+    rich.avatar_hash = 'a1b2c3'
+    rich.items['shield'] = 2
+    broke = Profile(cash=-5)
+    return [('7', Profile()), ('42', rich), ('1000000000000000001', broke)]
+
+
+class SnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, 'user_data.snap')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_binary_round_trip(self):
+        profiles = sample_profiles()
+        atomic_write(self.path, lambda f: write_snapshot(f, profiles, journal_seq=99))
+        reader = SnapshotReader(self.path)
+        try:
+            self.assertEqual(reader.journal_seq, 99)
+            self.assertEqual(len(reader), len(profiles))
+            self.assertEqual([(u, p.to_dict()) for u, p in reader], [(u, p.to_dict()) for u, p in profiles])
+            self.assertEqual(reader.get('42').to_dict(), profiles[1][1].to_dict())
+            self.assertIsNone(reader.get('43'))
+            self.assertIsNone(reader.get('not-a-number'))
+        finally:
+            reader.close()
+
+    def test_unsorted_input(self):
+        profiles = list(reversed(sample_profiles()))
+        with self.assertRaises(ValueError):
+            atomic_write(self.path, lambda f: write_snapshot(f, profiles))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_version_1(self):
+        # Version 1 records stop before biggest_win, which then keeps its default
+        record, numeric = RECORDS[1]
+        blob = json.dumps({'display_name': 'Old'}).encode()
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, 1, 0, 2, 5))
+            f.write(record.pack(7, 500, 1, 20, 3, 4, 700, 900, 1_600_000_000, 0, 0, 0))
+            f.write(record.pack(8, 1500, 2, 30, 5, 6, 800, 1200, 0, 0, 0, len(blob)))
+            f.write(blob)
+        self.assertEqual(numeric, 7)
+        reader = SnapshotReader(self.path)
+        try:
+            self.assertEqual(reader.journal_seq, 5)
+            first = reader.get('7')
+            self.assertEqual((first.cash, first.total_won, first.biggest_win), (500, 900, 0))
+            self.assertEqual(first.last_daily, 1_600_000_000)
+            self.assertIsNone(first.last_work)
+            second = reader.get('8')
+            self.assertEqual(second.display_name, 'Old')
+            self.assertEqual(second.losses, 6)
+        finally:
+            reader.close()
+
+    def test_unreadable_files(self):
+        with open(self.path, 'wb'):
+            pass
+        with self.assertRaises(SnapshotFormatError):
+            SnapshotReader(self.path)
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(b'NOTSNAP\x00', 2, 0, 0, 0))
+        with self.assertRaises(SnapshotFormatError):
+            SnapshotReader(self.path)
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, 2, 0, 3, 0) + struct.pack('<Q', 1))
+        with self.assertRaises(SnapshotFormatError):
+            SnapshotReader(self.path)
+
+    def test_json_round_trip(self):
+        profiles = sample_profiles()
+        path = os.path.join(self._dir.name, 'user_data.json')
+        atomic_write(path, lambda f: write_json_snapshot(f, profiles, journal_seq=12))
+        loaded, journal_seq = load_json_profiles(path)
+        self.assertEqual(journal_seq, 12)
+        self.assertEqual({u: p.to_dict() for u, p in loaded.items()}, {u: p.to_dict() for u, p in profiles})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Wallet Tests
+Reserved stakes hold back funds, settle once, and roll back when a transaction ends early.
+"""
+
+import os
+import tempfile
+import unittest
+
+from storage.backends import create_backend
+from storage.profile_store import ProfileStore
+from storage.wallet import InsufficientFunds, Wallet
+
+
+class WalletTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        path = os.path.join(self._dir.name, 'user_data.json')
+        self.store = ProfileStore(create_backend('json', path=path, journal_path=path + '.journal'))
+        self.store.load()
+        self.store.start()
+        self.wallet = Wallet(self.store)
+
+    async def asyncTearDown(self):
+        await self.store.close()
+        self._dir.cleanup()
+
+    async def cash(self) -> int:
+        return (await self.store.get_user_profile('1')).cash
+
+    async def test_settle(self):
+        async with self.wallet.transaction('1') as tx:
+            tx.reserve(100)
+            self.assertEqual(tx.available, 900)
+            await tx.settle('dice', 300, xp=10)
+        self.assertEqual(await self.cash(), 1200)
+        self.assertEqual(self.wallet.held('1'), 0)
+
+    async def test_unsettled_stake_rolls_back(self):
+        async with self.wallet.transaction('1') as tx:
+            tx.reserve(100)
+            self.assertEqual(self.wallet.held('1'), 100)
+        self.assertEqual(self.wallet.held('1'), 0)
+        self.assertEqual(await self.cash(), 1000)
+
+    async def test_exception_rolls_back(self):
+        with self.assertRaises(ValueError):
+            async with self.wallet.transaction('1') as tx:
+                tx.reserve(100)
+                raise ValueError("game crashed")
+        self.assertEqual(self.wallet.held('1'), 0)
+        self.assertEqual(await self.cash(), 1000)
+
+    async def test_insufficient_funds(self):
+        async with self.wallet.transaction('1') as tx:
+            with self.assertRaises(InsufficientFunds):
+                tx.reserve(1001)
+            with self.assertRaises(InsufficientFunds):
+                tx.reserve(0)
+            self.assertEqual(tx.stake, 0)
+
+    async def test_detached_hold(self):
+        async with self.wallet.transaction('1') as tx:
+            tx.reserve(400)
+            hold = tx.hold()
+        # A detached stake stays reserved across transactions
+        self.assertEqual(self.wallet.held('1'), 400)
+        async with self.wallet.transaction('1') as tx:
+            self.assertEqual(tx.available, 600)
+            with self.assertRaises(InsufficientFunds):
+                tx.reserve(700)
+
+        async with self.wallet.transaction('1', hold) as tx:
+            self.assertEqual(tx.stake, 400)
+            await tx.settle('blackjack', 0)
+        self.assertEqual(self.wallet.held('1'), 0)
+        self.assertEqual(await self.cash(), 600)
+
+        # A settled hold cannot be settled again
+        async with self.wallet.transaction('1', hold) as tx:
+            self.assertEqual(tx.stake, 0)
+            with self.assertRaises(RuntimeError):
+                await tx.settle('blackjack', 800)
+        self.assertEqual(await self.cash(), 600)
+
+    async def test_released_hold(self):
+        async with self.wallet.transaction('1') as tx:
+            tx.reserve(250)
+            hold = tx.hold()
+        hold.release()
+        hold.release()
+        self.assertEqual(self.wallet.held('1'), 0)
+        self.assertEqual(await self.cash(), 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
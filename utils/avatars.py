@@ -0,0 +1,167 @@
+"""
+Avatar Cache
+Size-bounded memory and disk LRU of Discord avatar images keyed by avatar hash.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import aiohttp
+
+CDN = "https://cdn.discordapp.com"
+
+
+def avatar_url(user_id: str, avatar_hash: Optional[str], size: int = 64) -> str:
+    """PNG URL of a user's avatar, or of their default avatar when they have none."""
+    if avatar_hash is None:
+        return f"{CDN}/embed/avatars/{default_avatar_index(user_id)}.png"
+    return f"{CDN}/avatars/{user_id}/{avatar_hash}.png?size={size}"
+
+
+def default_avatar_index(user_id: str) -> int:
+    return (int(user_id) >> 22) % 6
+
+
+class AvatarCache:
+    """Avatar PNG bytes shared by every rendered card.
+
+    Images are keyed by avatar hash (a hash names one immutable image, so
+    entries never go stale) and held in an in-memory LRU of at most
+    ``memory_bytes``, backed by ``directory`` on disk capped at
+    ``disk_bytes`` and evicted by last use. Misses download from the
+    Discord CDN once, however many cards are waiting for the same avatar.
+    """
+
+    def __init__(self, directory: str = 'avatar_cache', memory_bytes: int = 16 << 20,
+                 disk_bytes: int = 256 << 20, size: int = 64):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.size = size
+        self.logger = logging.getLogger(__name__)
+        self._memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: Optional[int] = None
+        # Disk writes run on worker threads; the byte count and eviction scan must not interleave
+        self._disk_lock = threading.Lock()
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+
+    @staticmethod
+    def key(user_id: str, avatar_hash: Optional[str]) -> str:
+        return avatar_hash or f"default-{default_avatar_index(user_id)}"
+
+    async def get(self, user_id: str, avatar_hash: Optional[str]) -> Optional[bytes]:
+        """The user's avatar as PNG bytes, or None if it could not be fetched."""
+        key = self.key(user_id, avatar_hash)
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return data
+        loading = self._loading.get(key)
+        if loading is not None:
+            return await asyncio.shield(loading)
+        loading = self._loading[key] = asyncio.get_running_loop().create_future()
+        try:
+            data = await self._load(key, user_id, avatar_hash)
+        except Exception as e:
+            self.logger.warning(f"Could not fetch avatar {key}: {e}")
+            data = None
+        finally:
+            del self._loading[key]
+        loading.set_result(data)
+        if data is not None:
+            self._remember(key, data)
+        return data
+
+    async def _load(self, key: str, user_id: str, avatar_hash: Optional[str]) -> bytes:
+        data = await asyncio.to_thread(self._read_disk, key)
+        if data is not None:
+            self.disk_hits += 1
+            return data
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        async with self._session.get(avatar_url(user_id, avatar_hash, self.size)) as response:
+            response.raise_for_status()
+            data = await response.read()
+        self.downloads += 1
+        await asyncio.to_thread(self._write_disk, key, data)
+        return data
+
+    def _remember(self, key: str, data: bytes):
+        self._memory[key] = data
+        self._memory_used += len(data)
+        while self._memory_used > self.memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_used -= len(old)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.png")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        # The modification time doubles as the last-use time for eviction
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass  # evicted by a concurrent write since it was read
+        return data
+
+    def _write_disk(self, key: str, data: bytes):
+        path = self._path(key)
+        with self._disk_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            if self._disk_used is None:
+                self._disk_used = sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+            try:
+                replaced = os.path.getsize(path)
+            except FileNotFoundError:
+                replaced = 0
+            with open(path, 'wb') as f:
+                f.write(data)
+            self._disk_used += len(data) - replaced
+            if self._disk_used > self.disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used files until the directory is back under 90% of its cap.
+
+        Called with ``_disk_lock`` held.
+        """
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.is_file()),
+                         key=lambda entry: entry.stat().st_mtime)
+        used = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if used <= self.disk_bytes * 0.9:
+                break
+            used -= entry.stat().st_size
+            os.remove(entry.path)
+        self._disk_used = used
+
+    def stats(self) -> dict:
+        return {
+            'memory_entries': len(self._memory),
+            'memory_bytes': self._memory_used,
+            'disk_bytes': self._disk_used,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'downloads': self.downloads,
+        }
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
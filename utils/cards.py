@@ -0,0 +1,124 @@
+"""
+Leaderboard Cards
+Renders leaderboard pages as PNG cards with avatars on a worker pool, reusing a card until its rows change.
+"""
+
+import asyncio
+import io
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Hashable, List, Optional, Sequence, Tuple
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Pillow is optional; leaderboards fall back to text embeds
+    Image = ImageDraw = ImageFont = None
+
+from utils.avatars import AvatarCache
+
+CARDS_AVAILABLE = Image is not None
+
+WIDTH = 800
+HEADER = 72
+ROW = 64
+AVATAR = 48
+BACKGROUND = (43, 45, 49)
+STRIPE = (49, 51, 56)
+TEXT = (242, 243, 245)
+MUTED = (181, 186, 193)
+MEDALS = {1: (245, 196, 66), 2: (192, 198, 204), 3: (205, 127, 50)}
+
+# ``(rank, name, value, avatar_hash)``; the avatar hash only matters for change detection
+CardRow = Tuple[int, str, str, Optional[str]]
+
+
+def _font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has only the fixed bitmap font
+        return ImageFont.load_default()
+
+
+def render_card(title: str, rows: Sequence[CardRow], avatars: Sequence[Optional[bytes]]) -> bytes:
+    """Draw one card and return it as PNG bytes; pure, so it can run on any worker."""
+    height = HEADER + ROW * max(len(rows), 1) + 16
+    card = Image.new('RGB', (WIDTH, height), BACKGROUND)
+    draw = ImageDraw.Draw(card)
+    title_font, name_font, small_font = _font(30), _font(22), _font(16)
+    draw.text((24, HEADER // 2), title, font=title_font, fill=TEXT, anchor='lm')
+
+    mask = Image.new('L', (AVATAR, AVATAR), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, AVATAR - 1, AVATAR - 1), fill=255)
+    for i, ((rank, name, value, _), avatar) in enumerate(zip(rows, avatars)):
+        top = HEADER + i * ROW
+        middle = top + ROW // 2
+        if i % 2 == 0:
+            draw.rectangle((0, top, WIDTH, top + ROW - 1), fill=STRIPE)
+
+        medal = MEDALS.get(rank)
+        if medal:
+            draw.ellipse((20, middle - 18, 56, middle + 18), fill=medal)
+        draw.text((38, middle), str(rank), font=small_font if rank < 1000 else _font(12),
+                  fill=BACKGROUND if medal else MUTED, anchor='mm')
+
+        if avatar is not None:
+            try:
+                image = Image.open(io.BytesIO(avatar)).convert('RGB').resize((AVATAR, AVATAR))
+                card.paste(image, (72, middle - AVATAR // 2), mask)
+            except OSError:
+                avatar = None
+        if avatar is None:
+            draw.ellipse((72, middle - AVATAR // 2, 72 + AVATAR, middle + AVATAR // 2), fill=MUTED)
+
+        draw.text((136, middle), name[:32], font=name_font, fill=TEXT, anchor='lm')
+        draw.text((WIDTH - 24, middle), value, font=name_font, fill=MEDALS[1] if medal else TEXT, anchor='rm')
+
+    out = io.BytesIO()
+    card.save(out, 'PNG', optimize=False)
+    return out.getvalue()
+
+
+class CardRenderer:
+    """Renders cards on a small thread pool and remembers the last card per page.
+
+    Pillow never runs on the event loop. A card is only redrawn when the
+    rows it shows (ranks, names, values or avatars) differ from the ones
+    it was drawn from, so re-requesting an unchanged top N is a dict hit.
+    """
+
+    def __init__(self, avatars: AvatarCache, workers: int = 2, max_cards: int = 256):
+        if not CARDS_AVAILABLE:
+            raise RuntimeError("Leaderboard cards need Pillow; install the cards extra (pip install .[cards]) or leave cards disabled")
+        self.avatars = avatars
+        self.max_cards = max_cards
+        self.logger = logging.getLogger(__name__)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cards')
+        self._cards: 'OrderedDict[Hashable, Tuple[tuple, bytes]]' = OrderedDict()
+        self.rendered = 0
+        self.reused = 0
+
+    async def card(self, key: Hashable, title: str, rows: List[CardRow], user_ids: List[str]) -> bytes:
+        """PNG card for ``rows``; ``key`` identifies the page so an unchanged one is reused."""
+        signature = (title, tuple(rows))
+        cached = self._cards.get(key)
+        if cached is not None and cached[0] == signature:
+            self._cards.move_to_end(key)
+            self.reused += 1
+            return cached[1]
+
+        avatars = await asyncio.gather(*(self.avatars.get(user_id, row[3]) for user_id, row in zip(user_ids, rows)))
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(self._executor, render_card, title, rows, avatars)
+        self.rendered += 1
+        self._cards[key] = (signature, png)
+        self._cards.move_to_end(key)
+        while len(self._cards) > self.max_cards:
+            self._cards.popitem(last=False)
+        return png
+
+    def stats(self) -> dict:
+        return {'cards': len(self._cards), 'rendered': self.rendered, 'reused': self.reused}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
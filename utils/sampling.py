@@ -0,0 +1,95 @@
+"""
+Weighted Sampling
+Alias-method samplers built once per paytable so a weighted draw is O(1) however many symbols a reel has.
+"""
+
+import random
+from typing import Generic, List, Mapping, Optional, Sequence, TypeVar
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; only batch simulations need it
+    np = None
+
+T = TypeVar('T')
+
+
+class AliasSampler(Generic[T]):
+    """Draws items with probability proportional to their weight.
+
+    The table is built with Vose's alias method in O(n): every slot holds
+    one item, a cut-off and an alias, so a draw is one random float, one
+    index and one comparison instead of building and indexing a list with
+    one entry per unit of weight. Samplers are immutable and safe to share
+    between cogs.
+    """
+
+    __slots__ = ('items', 'weights', '_cutoffs', '_aliases', '_alias_indices', '_size', '_arrays')
+
+    def __init__(self, weights: Mapping[T, float]):
+        items = [item for item, weight in weights.items() if weight > 0]
+        if not items:
+            raise ValueError("An alias sampler needs at least one positive weight")
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Weights must not be negative")
+        self.items: List[T] = items
+        self.weights = {item: weights[item] for item in items}
+        self._size = len(items)
+
+        total = sum(self.weights.values())
+        scaled = [self.weights[item] * self._size / total for item in items]
+        cutoffs = [1.0] * self._size
+        aliases = list(range(self._size))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            cutoffs[less] = scaled[less]
+            aliases[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            (small if scaled[more] < 1.0 else large).append(more)
+        # Whatever is left is 1.0 up to rounding and keeps its own slot
+
+        self._cutoffs = cutoffs
+        self._aliases = [items[i] for i in aliases]
+        self._alias_indices = aliases
+        self._arrays = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def probability(self, item: T) -> float:
+        """Chance of drawing ``item`` on one draw."""
+        return self.weights.get(item, 0) / sum(self.weights.values())
+
+    def sample(self, rng: Optional[random.Random] = None) -> T:
+        """Draw one item."""
+        u = (rng or random).random() * self._size
+        i = int(u)
+        return self.items[i] if u - i < self._cutoffs[i] else self._aliases[i]
+
+    def sample_many(self, count: int, rng: Optional[random.Random] = None) -> List[T]:
+        """Draw ``count`` independent items in one call, such as every reel of a spin."""
+        draw = (rng or random).random
+        size, items, cutoffs, aliases = self._size, self.items, self._cutoffs, self._aliases
+        result = []
+        for _ in range(count):
+            u = draw() * size
+            i = int(u)
+            result.append(items[i] if u - i < cutoffs[i] else aliases[i])
+        return result
+
+    def sample_indices(self, generator, size):
+        """Indices into ``items`` for ``size`` draws from a NumPy ``Generator``, for batch simulation."""
+        if np is None:
+            raise RuntimeError("Batch sampling needs NumPy: pip install .[bench]")
+        if self._arrays is None:
+            self._arrays = (np.array(self._cutoffs), np.array(self._alias_indices, dtype=np.intp))
+        cutoffs, aliases = self._arrays
+        u = generator.random(size) * self._size
+        slots = u.astype(np.intp)
+        return np.where(u - slots < cutoffs[slots], slots, aliases[slots])
+
+    def table(self) -> Sequence[tuple]:
+        """``(item, cutoff, alias)`` per slot, for inspection and batch samplers."""
+        return list(zip(self.items, self._cutoffs, self._aliases))